@@ -0,0 +1,157 @@
+"""
+asyncio-native HackerRank client
+
+Mirrors the requests-based helpers in new_agent (make_session,
+get_candidates_page, get_all_candidates, invite_to_test) as coroutines on
+an httpx.AsyncClient, so the MCP server's async handlers can await
+HackerRank downloads on the event loop instead of holding a pool thread
+for them. Requests go through resilience.send_async, sharing the sync
+client's retries, circuit breaker, API_MAX_IN_FLIGHT cap and metrics.
+"""
+
+import asyncio
+import logging
+
+import httpx
+
+import new_agent
+import resilience
+from resilience import HackerRankAPIError
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================================================
+# AUTH SESSION
+# ===========================================================
+
+def make_async_client(pool_maxsize=None, max_retries=None, timeout=30.0):
+    """httpx.AsyncClient with make_session's auth headers, pool size and connect retries."""
+    pool_maxsize = pool_maxsize or new_agent.HTTP_POOL_MAXSIZE
+    max_retries = new_agent.HTTP_MAX_RETRIES if max_retries is None else max_retries
+
+    # h11 rejects trailing whitespace, so an unset token sends a bare "Bearer"
+    headers = {name: value.strip() for name, value in new_agent.auth_headers().items()}
+    return httpx.AsyncClient(
+        headers=headers,
+        limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+        transport=httpx.AsyncHTTPTransport(retries=max_retries),
+        timeout=timeout,
+    )
+
+
+# ===========================================================
+# API HELPERS
+# ===========================================================
+
+async def get_candidates_page(client, test_id, offset=0):
+    """Fetches ONE PAGE of full candidate objects."""
+    url = f"{new_agent.BASE_URL}/tests/{test_id}/candidates"
+    params = {"offset": offset, "limit": new_agent.LIMIT}
+
+    res = await resilience.send_async(client, "get", "GET /tests/{id}/candidates", url, params=params)
+    if res.status_code != 200:
+        logger.error(f"Failed to fetch candidates page: {res.status_code} - {res.text}")
+        raise HackerRankAPIError(f"Failed: {res.text}", res.status_code, "GET /tests/{id}/candidates")
+
+    return res.json()
+
+
+async def get_all_candidates(client, test_id, max_concurrency=None, compact=None):
+    """Fetch all pages of full candidate objects.
+
+    The same list new_agent.get_all_candidates returns: with
+    max_concurrency > 1 (default: FETCH_WORKERS) the remaining pages are
+    requested concurrently, using `total` from the first page or probing
+    ahead when it is missing, and reassembled in offset order. With
+    compact=True (default: COMPACT_CANDIDATES) pages are projected into
+    CandidateRecord objects.
+    """
+    if max_concurrency is None:
+        max_concurrency = new_agent.FETCH_WORKERS
+    if compact is None:
+        compact = new_agent.COMPACT_CANDIDATES
+    project = new_agent.compact_candidates if compact else list
+    limit = new_agent.LIMIT
+
+    first = await get_candidates_page(client, test_id, 0)
+    all_candidates = project(first.get("data", []))
+
+    if not first.get("next"):
+        return all_candidates
+
+    offset = limit
+
+    if max_concurrency <= 1:
+        while True:
+            data = await get_candidates_page(client, test_id, offset)
+            all_candidates.extend(project(data.get("data", [])))
+            if not data.get("next"):
+                return all_candidates
+            offset += limit
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(page_offset):
+        async with semaphore:
+            return await get_candidates_page(client, test_id, page_offset)
+
+    async def consume(offsets):
+        # Returns True once the last page has been reached; pages requested
+        # beyond it are cancelled
+        tasks = [asyncio.ensure_future(fetch(o)) for o in offsets]
+        try:
+            for task in tasks:
+                data = await task
+                all_candidates.extend(project(data.get("data", [])))
+                if not data.get("next"):
+                    return True
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return False
+
+    total = first.get("total")
+    if isinstance(total, int) and total > offset:
+        offsets = list(range(offset, total, limit))
+        if await consume(offsets):
+            return all_candidates
+        offset = offsets[-1] + limit
+
+    while True:
+        offsets = [offset + i * limit for i in range(max_concurrency)]
+        if await consume(offsets):
+            return all_candidates
+        offset = offsets[-1] + limit
+
+
+async def invite_to_test(client, test_id, candidate):
+    """Invite candidate to next test.
+
+    Returns the HTTP response, or None when the candidate has no email.
+    """
+    email = candidate.get("email")
+    name = candidate.get("full_name") or candidate.get("name") or "Candidate"
+
+    if not email:
+        logger.warning(f"Skipping candidate with no email: {candidate}")
+        return
+
+    url = f"{new_agent.BASE_URL}/tests/{test_id}/invites"
+
+    payload = {
+        "email": email,
+        "name": name,
+        "send_email": True
+    }
+
+    # Not retried, like the sync helper: a repeated POST could invite twice
+    res = await resilience.send_async(client, "post", "POST /tests/{id}/invites", url,
+                                      retry_statuses=(), json=payload)
+    if res.status_code not in (200, 201):
+        logger.error(f"Failed to invite {email}: {res.text}")
+    else:
+        logger.info(f"Invited {email} to Test {test_id}")
+
+    return res
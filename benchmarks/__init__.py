@@ -0,0 +1,7 @@
+"""
+Benchmarks for the screening pipeline
+
+`fake_server` serves a local imitation of the HackerRank v3 API and
+`bench` runs scenario benchmarks against it, saving and comparing
+baselines. Run with `python -m benchmarks.bench`.
+"""
@@ -0,0 +1,446 @@
+"""
+Screening pipeline benchmarks
+
+Runs scenario benchmarks against a local FakeHackerRankServer and reports
+pages/s, invites/s, p50/p99 MCP tool latency and peak RSS. Each scenario
+runs in its own Python process so its peak RSS is its own, --repeat times
+(default 3); every metric reported is the median over those runs, so one
+noisy run does not decide a comparison.
+
+    python -m benchmarks.bench                        # run all, compare to the baseline
+    python -m benchmarks.bench fetch_parallel invite  # run some scenarios
+    python -m benchmarks.bench --save-baseline        # record results as the new baseline
+
+Metric names carry their direction: `*_per_sec` are throughputs (higher is
+better), `*_ms`, `*_kb` and `seconds` are costs (lower is better); anything
+else is informational and not compared. A metric more than --tolerance
+worse than the baseline is a regression and the run exits with status 1.
+Baselines are machine specific and not committed (benchmarks/baselines/ is
+gitignored): save one on the machine you compare on.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import logging
+import platform
+import subprocess
+from contextlib import contextmanager, ExitStack
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_server import FakeHackerRankServer, make_candidates
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baselines", "baseline.json")
+
+# Fraction a metric may be worse than its baseline before it is a regression
+REGRESSION_TOLERANCE = 0.25
+
+# Runs per scenario; metrics are the median over them
+REPEAT = 3
+
+# Scenario sizes
+FETCH_CANDIDATES = 5000
+FETCH_WORKERS = 8
+FILTER_CANDIDATES = 200_000
+INVITE_CANDIDATES = 1000
+INVITE_CONCURRENCY = 8
+PIPELINE_TEST_A_CANDIDATES = 2000
+PIPELINE_TEST_B_CANDIDATES = 200
+TOOL_CANDIDATES = 2000
+TOOL_CALLS = 50
+
+# Per-request latency of the fake server (seconds)
+SERVER_LATENCY = 0.005
+
+
+# ===========================================================
+# HELPERS
+# ===========================================================
+
+@contextmanager
+def patched(module, **attrs):
+    """Temporarily set module-level configuration attributes."""
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield module
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+@contextmanager
+def fake_api(**server_options):
+    """Start a FakeHackerRankServer and point new_agent at it."""
+    import new_agent
+    import resilience
+
+    server_options.setdefault("latency", SERVER_LATENCY)
+    with ExitStack() as stack:
+        server = stack.enter_context(FakeHackerRankServer(**server_options))
+        stack.enter_context(patched(new_agent, BASE_URL=server.base_url))
+        stack.enter_context(patched(resilience, API_RETRY_BASE_SECONDS=0.01))
+        resilience.reset()
+        yield server
+        new_agent.reset_shared_session()
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of `samples` (pct in 0..100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def page_count(candidates, page_size):
+    return max(1, -(-candidates // page_size))
+
+
+# ===========================================================
+# SCENARIOS
+# ===========================================================
+
+SCENARIOS = {}
+
+
+def scenario(fn):
+    """Register a benchmark; it returns a dict of metrics."""
+    SCENARIOS[fn.__name__] = fn
+    return fn
+
+
+def _fetch(max_workers, **server_options):
+    import new_agent
+    import resilience
+
+    with fake_api(candidate_count=FETCH_CANDIDATES, **server_options) as server:
+        session = new_agent.make_session()
+        start = time.perf_counter()
+        candidates = new_agent.get_all_candidates(session, 1, max_workers=max_workers)
+        elapsed = time.perf_counter() - start
+        session.close()
+        retries = sum(e["retries"] for e in resilience.api_health()["endpoints"].values())
+
+    pages = page_count(len(candidates), new_agent.LIMIT)
+    return {
+        "pages_per_sec": pages / elapsed,
+        "seconds": elapsed,
+        "pages": pages,
+        "requests": server.requests,
+        "retries": retries,
+    }
+
+
+@scenario
+def fetch_serial():
+    """get_all_candidates walking pages one at a time."""
+    return _fetch(max_workers=1)
+
+
+@scenario
+def fetch_parallel():
+    """get_all_candidates on a FETCH_WORKERS thread pool."""
+    return _fetch(max_workers=FETCH_WORKERS)
+
+
+@scenario
+def fetch_flaky():
+    """Parallel fetch with 2% of requests failing with 503 and being retried."""
+    return _fetch(max_workers=FETCH_WORKERS, error_rate=0.02)
+
+
+@scenario
+def filter_passed_scenario():
+    """filter_passed over a large in-memory candidate list."""
+    import new_agent
+
+    candidates = make_candidates(1, FILTER_CANDIDATES)
+    start = time.perf_counter()
+    passed = new_agent.filter_passed(candidates, 70)
+    elapsed = time.perf_counter() - start
+    return {
+        "candidates_per_sec": len(candidates) / elapsed,
+        "seconds": elapsed,
+        "passed": len(passed),
+    }
+
+
+@scenario
+def invite():
+    """invite_to_test through the bulk invite engine, unthrottled."""
+    import new_agent
+    from invite_engine import bulk_invite
+
+    candidates = make_candidates(2, INVITE_CANDIDATES)
+    with fake_api() as server:
+        session = new_agent.make_session(pool_maxsize=INVITE_CONCURRENCY)
+        start = time.perf_counter()
+        report = bulk_invite(lambda c: new_agent.invite_to_test(session, 2, c), candidates,
+                             concurrency=INVITE_CONCURRENCY, rate=0)
+        elapsed = time.perf_counter() - start
+        session.close()
+
+    return {
+        "invites_per_sec": report["invited"] / elapsed,
+        "seconds": elapsed,
+        "invited": report["invited"],
+        "failed": report["failed"],
+        "server_invites": server.invites,
+    }
+
+
+@scenario
+def pipeline():
+    """run_pipeline end to end; Test B's roster overlaps the first Test A attempts."""
+    import new_agent
+    import invite_engine
+
+    with ExitStack() as stack:
+        server = stack.enter_context(fake_api(candidate_count=PIPELINE_TEST_A_CANDIDATES))
+        server.candidates[2] = make_candidates(2, PIPELINE_TEST_B_CANDIDATES)
+        stack.enter_context(patched(new_agent, TEST_A_ID=1, TEST_B_ID=2))
+        stack.enter_context(patched(invite_engine, INVITE_RATE_PER_SEC=0,
+                                    INVITE_CONCURRENCY=INVITE_CONCURRENCY))
+        start = time.perf_counter()
+        counts = new_agent.run_pipeline(journal_path="")
+        elapsed = time.perf_counter() - start
+
+    pages = (page_count(counts.get("test_a", 0), new_agent.LIMIT)
+             + page_count(counts.get("test_b", 0), new_agent.LIMIT))
+    return {
+        "pages_per_sec": pages / elapsed,
+        "invites_per_sec": counts.get("invite_invited", 0) / elapsed,
+        "seconds": elapsed,
+        "invited": counts.get("invite_invited", 0),
+        "skipped_on_roster": counts.get("skipped_on_roster", 0),
+    }
+
+
+@scenario
+def mcp_tools():
+    """Latency of cold (uncached) MCP read tools against the fake API."""
+    import mcp_server
+
+    if not mcp_server.MCP_AVAILABLE:
+        return {"skipped": "mcp not installed"}
+
+    latencies = {"get_test_candidates": [], "get_candidate_scores": []}
+    with ExitStack() as stack:
+        stack.enter_context(fake_api(candidate_count=TOOL_CANDIDATES))
+        stack.enter_context(patched(mcp_server, USE_MOCK_DATA=False))
+        calls = {
+            "get_test_candidates": lambda: mcp_server.get_test_candidates(1, 70.0),
+            "get_candidate_scores": lambda: mcp_server.get_candidate_scores(1),
+        }
+        for _ in range(TOOL_CALLS):
+            for name, call in calls.items():
+                mcp_server.CANDIDATE_CACHE.clear()
+                start = time.perf_counter()
+                result = call()
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                if "error" in result:
+                    raise RuntimeError(f"{name} failed: {result['error']}")
+        mcp_server.CANDIDATE_CACHE.clear()
+
+    metrics = {}
+    for name, samples in latencies.items():
+        metrics[f"{name}_p50_ms"] = percentile(samples, 50)
+        metrics[f"{name}_p99_ms"] = percentile(samples, 99)
+    return metrics
+
+
+def run_scenario(name):
+    """Run one scenario in this process and add its peak RSS."""
+    metrics = SCENARIOS[name]()
+    metrics["peak_rss_kb"] = peak_rss_kb()
+    return metrics
+
+
+def run_isolated(name):
+    """Run one scenario in a fresh interpreter and return its metrics."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench", "--child", name],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Scenario {name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def median_metrics(runs):
+    """Per-metric median over several runs of a scenario (non-numeric: first run's value)."""
+    merged = {}
+    for metric, value in runs[0].items():
+        values = [run.get(metric) for run in runs]
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            merged[metric] = statistics.median_low(values)
+        elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            merged[metric] = statistics.median(values)
+        else:
+            merged[metric] = value
+    return merged
+
+
+def run_repeated(name, repeat=REPEAT):
+    """Median metrics of `repeat` isolated runs of one scenario."""
+    return median_metrics([run_isolated(name) for _ in range(max(1, repeat))])
+
+
+# ===========================================================
+# BASELINES
+# ===========================================================
+
+def metric_direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if not compared."""
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith(("_ms", "_kb")) or metric == "seconds":
+        return -1
+    return 0
+
+
+def compare_results(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Compare results to a baseline.
+
+    Returns one row per comparable metric present in both:
+    {"scenario", "metric", "value", "baseline", "change", "regression"},
+    where `change` is the relative change in the metric's good direction
+    (negative = worse).
+    """
+    rows = []
+    for name, metrics in results.items():
+        base_metrics = baseline.get(name, {})
+        for metric, value in metrics.items():
+            direction = metric_direction(metric)
+            base = base_metrics.get(metric)
+            if not direction or not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = direction * (value - base) / base
+            rows.append({
+                "scenario": name,
+                "metric": metric,
+                "value": value,
+                "baseline": base,
+                "change": change,
+                "regression": change < -tolerance,
+            })
+    return rows
+
+
+def load_baseline(path=None):
+    """Scenario results from a saved baseline, or None if there is none."""
+    path = path or BASELINE_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(results, path=None):
+    """Write results (merged over an existing baseline) with the environment they ran in."""
+    path = path or BASELINE_PATH
+    merged = dict(load_baseline(path) or {})
+    merged.update(results)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "results": merged,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# ===========================================================
+# MAIN
+# ===========================================================
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def print_results(results, rows):
+    compared = {(r["scenario"], r["metric"]): r for r in rows}
+    for name, metrics in results.items():
+        print(f"\n{name}")
+        for metric, value in metrics.items():
+            line = f"  {metric:<32} {format_value(value):>14}"
+            row = compared.get((name, metric))
+            if row is not None:
+                flag = "  REGRESSION" if row["regression"] else ""
+                line += f"   baseline {format_value(row['baseline']):>14}  {row['change']:+.0%}{flag}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the screening pipeline against a local fake HackerRank API")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Save these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Fraction a metric may be worse than baseline (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="Runs per scenario; metrics are their median (default: %(default)s)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child)))
+        return 0
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = {name: run_repeated(name, args.repeat) for name in (args.scenarios or SCENARIOS)}
+
+    baseline = load_baseline(args.baseline)
+    rows = compare_results(results, baseline, args.tolerance) if baseline else []
+    print_results(results, rows)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    regressions = [r for r in rows if r["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed more than {args.tolerance:.0%} against {args.baseline}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Local fake HackerRank v3 server for benchmarks
+
+Serves GET /tests/{id}/candidates (offset/limit paging with `total` and
+`next`) and POST /tests/{id}/invites over real HTTP on localhost, with
+configurable per-request latency, error rate, page size and candidate
+count, so benchmarks exercise the same sockets, pooling and retries as a
+live run. Tests also use it (the `fake_hackerrank_server` fixture), forcing
+statuses per path through `status_overrides` and `transient_failures`.
+"""
+
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def make_candidates(test_id, count, seed=0):
+    """Deterministic candidate list for a test."""
+    rng = random.Random(f"{seed}:{test_id}")
+    return [
+        {
+            "id": test_id * 10_000_000 + i,
+            "email": f"candidate{i}@example.com",
+            "full_name": f"Candidate {i}",
+            "percentage_score": round(rng.uniform(0, 100), 1),
+            "status": 2,
+            "completed_at": "2024-01-15T10:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+class FakeHackerRankServer:
+    """Threaded localhost HTTP server imitating the HackerRank v3 API.
+
+    Args:
+        candidate_count: Candidates served for every test id (unless set
+            explicitly in `candidates`)
+        latency: Seconds each request takes before responding
+        error_rate: Fraction of requests answered with 503
+        page_size: Largest page the server returns, whatever `limit` asks for
+        seed: Seed for candidate scores and injected errors
+
+    Set `status_overrides[path]` to answer every request to a path with that
+    status, or append statuses to `transient_failures[path]` to fail the next
+    requests to it once each. `request_log` records (method, path) per request.
+    """
+
+    def __init__(self, candidate_count=1000, latency=0.0, error_rate=0.0, page_size=50, seed=0):
+        self.candidate_count = candidate_count
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.seed = seed
+        self.candidates = {}
+        self.invites = 0
+        self.requests = 0
+        self.errors = 0
+        self.status_overrides = {}
+        self.transient_failures = {}
+        self.request_log = []
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def candidates_for(self, test_id):
+        with self.lock:
+            if test_id not in self.candidates:
+                self.candidates[test_id] = make_candidates(test_id, self.candidate_count, self.seed)
+            return self.candidates[test_id]
+
+    def _injected_status(self, method, path):
+        """Status to fail this request with, or None to serve it."""
+        with self.lock:
+            self.requests += 1
+            self.request_log.append((method, path))
+            if path in self.status_overrides:
+                return self.status_overrides[path]
+            if self.transient_failures.get(path):
+                return self.transient_failures[path].pop(0)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                return 503
+        return None
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY
+            # each keep-alive response waits out a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self):
+                parts = urlparse(self.path).path.strip("/").split("/")
+                if len(parts) == 3 and parts[0] == "tests" and parts[1].isdigit():
+                    return int(parts[1]), parts[2]
+                return None, None
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                status = server._injected_status("GET", urlparse(self.path).path)
+                if status is not None:
+                    return self._send(status, {"error": "injected"})
+                test_id, resource = self._route()
+                if resource != "candidates":
+                    return self._send(404, {"error": "not found"})
+                query = parse_qs(urlparse(self.path).query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = min(int(query.get("limit", ["50"])[0]), server.page_size)
+                candidates = server.candidates_for(test_id)
+                self._send(200, {
+                    "data": candidates[offset:offset + limit],
+                    "total": len(candidates),
+                    "next": "more" if offset + limit < len(candidates) else None,
+                })
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if server.latency:
+                    time.sleep(server.latency)
+                status = server._injected_status("POST", urlparse(self.path).path)
+                if status is not None:
+                    return self._send(status, {"error": "injected"})
+                test_id, resource = self._route()
+                if resource != "invites":
+                    return self._send(404, {"error": "not found"})
+                with server.lock:
+                    server.invites += 1
+                self._send(201, {"email": body.get("email"), "test_id": test_id})
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
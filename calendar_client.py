@@ -0,0 +1,172 @@
+"""
+Google Calendar client for interview invites
+
+One client per process: the Google libraries are imported, the token is
+loaded and the calendar v3 service is built (discovery included) once, then
+reused by every call. Credentials stay in memory and are only refreshed
+(and written back to the token file) once they have expired.
+
+Events are inserted through the Calendar batch HTTP API, up to
+CALENDAR_BATCH_SIZE inserts per round-trip, so inviting 50 candidates
+costs one request instead of 50.
+"""
+
+import os
+import pickle
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+SCOPES = ["https://www.googleapis.com/auth/calendar"]
+
+GOOGLE_CALENDAR_TOKEN_PATH = os.getenv("GOOGLE_CALENDAR_TOKEN_PATH", "token.pickle")
+GOOGLE_CALENDAR_CREDENTIALS_PATH = os.getenv("GOOGLE_CALENDAR_CREDENTIALS_PATH", "credentials.json")
+GOOGLE_CALENDAR_TIMEZONE = os.getenv("GOOGLE_CALENDAR_TIMEZONE", "UTC")
+
+# Inserts per batch request (the Calendar API accepts at most 50)
+CALENDAR_BATCH_SIZE = min(int(os.getenv("CALENDAR_BATCH_SIZE", "50")), 50)
+
+
+def build_meet_event(title, description, start, end, email, name, request_id, timezone=None):
+    """Calendar event body with a Google Meet conference for one attendee."""
+    timezone = timezone or GOOGLE_CALENDAR_TIMEZONE
+    return {
+        "summary": title,
+        "description": description,
+        "start": {"dateTime": start, "timeZone": timezone},
+        "end": {"dateTime": end, "timeZone": timezone},
+        "attendees": [{"email": email, "displayName": name}],
+        "conferenceData": {
+            "createRequest": {
+                "requestId": request_id,
+                "conferenceSolutionKey": {"type": "hangoutsMeet"},
+            }
+        },
+        "reminders": {
+            "useDefault": False,
+            "overrides": [
+                {"method": "email", "minutes": 24 * 60},  # 1 day before
+                {"method": "popup", "minutes": 15},  # 15 minutes before
+            ],
+        },
+    }
+
+
+def meet_link(event):
+    """Google Meet URL of a created event, or None."""
+    entry_points = (event.get("conferenceData") or {}).get("entryPoints") or []
+    return entry_points[0].get("uri") if entry_points else None
+
+
+class CalendarClient:
+    """Reusable Google Calendar service with in-memory credentials.
+
+    Raises ImportError when the Google API libraries are not installed and
+    FileNotFoundError when there is neither a token nor client credentials.
+    """
+
+    def __init__(self, token_path=None, credentials_path=None):
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build
+
+        self.token_path = token_path or GOOGLE_CALENDAR_TOKEN_PATH
+        self.credentials_path = credentials_path or GOOGLE_CALENDAR_CREDENTIALS_PATH
+        self._request = Request
+        self.lock = threading.Lock()
+        self.creds = self._load_credentials()
+        self.service = build("calendar", "v3", credentials=self.creds, cache_discovery=False)
+
+    def _load_credentials(self):
+        creds = None
+        if os.path.exists(self.token_path):
+            with open(self.token_path, "rb") as token:
+                creds = pickle.load(token)
+
+        if creds and creds.valid:
+            return creds
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(self._request())
+        else:
+            if not os.path.exists(self.credentials_path):
+                raise FileNotFoundError(
+                    f"Google Calendar credentials not found at {self.credentials_path}. "
+                    "Please set up Google Calendar API credentials. See documentation."
+                )
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
+            creds = flow.run_local_server(port=0)
+        self._save_credentials(creds)
+        return creds
+
+    def _save_credentials(self, creds):
+        with open(self.token_path, "wb") as token:
+            pickle.dump(creds, token)
+
+    def _ensure_fresh(self):
+        # Caller holds self.lock
+        if not self.creds.valid and self.creds.refresh_token:
+            logger.info("Refreshing Google Calendar credentials")
+            self.creds.refresh(self._request())
+            self._save_credentials(self.creds)
+
+    def insert_events(self, events, send_updates="all"):
+        """Insert events with Meet links in batches.
+
+        Returns one (created_event, error) pair per event, in input order;
+        exactly one of the two is None. An event the batch response never
+        answered gets a RuntimeError.
+        """
+        results = [(None, None)] * len(events)
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            results[index] = (None, exception) if exception is not None else (response, None)
+
+        # The service's HTTP transport is not thread-safe: one batch at a time
+        with self.lock:
+            self._ensure_fresh()
+            for start in range(0, len(events), CALENDAR_BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index in range(start, min(start + CALENDAR_BATCH_SIZE, len(events))):
+                    batch.add(
+                        self.service.events().insert(
+                            calendarId="primary",
+                            body=events[index],
+                            conferenceDataVersion=1,
+                            sendUpdates=send_updates,
+                        ),
+                        request_id=str(index),
+                    )
+                try:
+                    batch.execute()
+                except Exception as e:
+                    for index in range(start, min(start + CALENDAR_BATCH_SIZE, len(events))):
+                        if results[index] == (None, None):
+                            results[index] = (None, e)
+        return [(None, RuntimeError("no batch response")) if result == (None, None) else result
+                for result in results]
+
+
+_calendar_client = None
+_calendar_client_lock = threading.Lock()
+
+
+def get_calendar_client():
+    """Process-wide CalendarClient, built on first use."""
+    global _calendar_client
+    with _calendar_client_lock:
+        if _calendar_client is None:
+            _calendar_client = CalendarClient()
+        return _calendar_client
+
+
+def reset_calendar_client():
+    """Drop the shared client; the next get_calendar_client() builds a new one."""
+    global _calendar_client
+    with _calendar_client_lock:
+        _calendar_client = None
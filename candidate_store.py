@@ -0,0 +1,270 @@
+"""
+Persistent on-disk candidate store
+
+Keeps every candidate attempt of a test in a local SQLite file so MCP tools
+can answer from disk instead of re-downloading the whole test. Syncs are
+incremental: a re-sync starts from the last page seen (the offset
+high-water mark) or from the page of the oldest attempt that had not
+completed yet, whichever comes first, and upserts only what changed. Open
+attempts are only re-checked within CANDIDATE_STORE_RECHECK_PAGES pages of
+the high-water mark, so attempts that never complete (invited, abandoned)
+do not pull every delta sync back to the first page; a full sync
+re-checks everything.
+
+Each test's ScoreAggregate is built from disk on first use and then kept
+current by the upserts themselves, so statistics do not re-read the test;
+only an upsert that removes the current min or max score makes the next
+read rebuild it from the stored scores.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+import new_agent
+from score_aggregates import ScoreAggregate
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+# Path of the SQLite file; the store is disabled when unset
+CANDIDATE_STORE_PATH = os.getenv("CANDIDATE_STORE_PATH", "")
+
+# Seconds a synced test is served from the store before a delta sync
+CANDIDATE_STORE_MAX_AGE = float(os.getenv("CANDIDATE_STORE_MAX_AGE", "300"))
+
+# Pages back from the high-water mark in which open attempts are re-checked
+CANDIDATE_STORE_RECHECK_PAGES = int(os.getenv("CANDIDATE_STORE_RECHECK_PAGES", "10"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    test_id      INTEGER NOT NULL,
+    key          TEXT    NOT NULL,
+    position     INTEGER NOT NULL,
+    email        TEXT,
+    completed_at TEXT,
+    payload      TEXT    NOT NULL,
+    PRIMARY KEY (test_id, key)
+);
+CREATE INDEX IF NOT EXISTS candidates_position ON candidates (test_id, position);
+CREATE TABLE IF NOT EXISTS sync_state (
+    test_id    INTEGER PRIMARY KEY,
+    high_water INTEGER NOT NULL,
+    synced_at  REAL    NOT NULL
+);
+"""
+
+
+def candidate_key(candidate, position):
+    """Stable identity of an attempt: its id, else (email, list position), else position.
+
+    An email alone is not an identity: one candidate can have several
+    id-less attempts of a test.
+    """
+    if candidate.get("id") is not None:
+        return f"id:{candidate['id']}"
+    if candidate.get("email"):
+        return f"email:{candidate['email']}:{position}"
+    return f"pos:{position}"
+
+
+class CandidateStore:
+    """SQLite-backed store of candidate attempts, one row per attempt."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.aggregates = {}   # test_id -> ScoreAggregate, once first read
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # -------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------
+
+    def candidates(self, test_id):
+        """All stored candidates of a test, in API order."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT payload FROM candidates WHERE test_id = ? ORDER BY position",
+                (test_id,)
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def scores(self, test_id):
+        """Every stored attempt's score, read as extract_score would, in API order.
+
+        Only the two score fields are read out of each payload (by SQLite),
+        so no candidate objects are built.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT json_extract(payload, '$.percentage_score'), json_extract(payload, '$.score') "
+                "FROM candidates WHERE test_id = ? ORDER BY position",
+                (test_id,)
+            ).fetchall()
+        return [percentage if isinstance(percentage, (int, float))
+                else score if isinstance(score, (int, float)) else 0
+                for percentage, score in rows]
+
+    def aggregate(self, test_id):
+        """Running ScoreAggregate of a test, built from the stored scores on first
+        use and rebuilt when an update left its min or max approximate."""
+        with self.lock:
+            aggregate = self.aggregates.get(test_id)
+            if aggregate is None or aggregate.dirty:
+                aggregate = self.aggregates[test_id] = ScoreAggregate.from_scores(self.scores(test_id))
+            return aggregate
+
+    def peek_aggregate(self, test_id):
+        """The test's aggregate if one has been built (no sync), else None."""
+        with self.lock:
+            if test_id not in self.aggregates:
+                return None
+            return self.aggregate(test_id)
+
+    def count(self, test_id):
+        with self.lock:
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM candidates WHERE test_id = ?", (test_id,)
+            ).fetchone()
+        return count
+
+    def sync_state(self, test_id):
+        """(high_water offset, synced_at) for a test, or None if never synced."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT high_water, synced_at FROM sync_state WHERE test_id = ?", (test_id,)
+            ).fetchone()
+
+    def age(self, test_id):
+        """Seconds since the last sync, or None if never synced."""
+        state = self.sync_state(test_id)
+        return None if state is None else time.time() - state[1]
+
+    # -------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------
+
+    def resume_offset(self, test_id):
+        """Page offset a delta sync should start from.
+
+        The high-water page, or the page of the oldest open attempt within
+        CANDIDATE_STORE_RECHECK_PAGES pages before it.
+        """
+        state = self.sync_state(test_id)
+        if state is None:
+            return 0
+        offset = state[0]
+        window_start = max(0, offset - CANDIDATE_STORE_RECHECK_PAGES * new_agent.LIMIT)
+        with self.lock:
+            (oldest_open,) = self.conn.execute(
+                "SELECT MIN(position) FROM candidates "
+                "WHERE test_id = ? AND completed_at IS NULL AND position >= ?",
+                (test_id, window_start)
+            ).fetchone()
+        if oldest_open is not None:
+            offset = min(offset, oldest_open - oldest_open % new_agent.LIMIT)
+        return offset
+
+    def sync(self, session, test_id, full=False):
+        """Fetch new or changed attempts and upsert them.
+
+        Returns the number of rows inserted or updated.
+        """
+        start = offset = 0 if full else self.resume_offset(test_id)
+        changed = 0
+        last_offset = offset
+
+        while True:
+            data = new_agent.get_candidates_page(session, test_id, offset)
+            batch = data.get("data", [])
+            changed += self._upsert(test_id, offset, batch)
+            last_offset = offset
+
+            if not data.get("next"):
+                break
+
+            offset += new_agent.LIMIT
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (test_id, high_water, synced_at) VALUES (?, ?, ?)",
+                (test_id, last_offset, time.time())
+            )
+            self.conn.commit()
+
+        logger.info(f"Synced test {test_id} from offset {start}: {changed} changed")
+        return changed
+
+    def _upsert(self, test_id, offset, batch):
+        changed = 0
+        with self.lock:
+            for i, candidate in enumerate(batch):
+                position = offset + i
+                key = candidate_key(candidate, position)
+                payload = json.dumps(candidate, sort_keys=True)
+                row = self.conn.execute(
+                    "SELECT payload, position FROM candidates WHERE test_id = ? AND key = ?",
+                    (test_id, key)
+                ).fetchone()
+                if row == (payload, position):
+                    continue
+                aggregate = self.aggregates.get(test_id)
+                if aggregate is not None:
+                    new_score = new_agent.extract_score(candidate)
+                    if row is None:
+                        aggregate.add(new_score)
+                    else:
+                        aggregate.replace(new_agent.extract_score(json.loads(row[0])), new_score)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO candidates "
+                    "(test_id, key, position, email, completed_at, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                    (test_id, key, position, candidate.get("email"),
+                     candidate.get("completed_at"), payload)
+                )
+                changed += 1
+            self.conn.commit()
+        return changed
+
+    def refresh(self, session, test_id, max_age=None):
+        """Delta-sync a test if it was never synced or is older than `max_age` seconds."""
+        max_age = CANDIDATE_STORE_MAX_AGE if max_age is None else max_age
+        age = self.age(test_id)
+        if age is None or age > max_age:
+            self.sync(session, test_id)
+
+    def get_candidates(self, session, test_id, max_age=None):
+        """Candidates of a test, delta-syncing first if older than `max_age` seconds."""
+        self.refresh(session, test_id, max_age)
+        return self.candidates(test_id)
+
+    def get_aggregate(self, session, test_id, max_age=None):
+        """ScoreAggregate of a test, delta-syncing first if stale."""
+        self.refresh(session, test_id, max_age)
+        return self.aggregate(test_id)
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """Process-wide store at CANDIDATE_STORE_PATH, or None when unconfigured."""
+    global _default_store
+    if not CANDIDATE_STORE_PATH:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = CandidateStore(CANDIDATE_STORE_PATH)
+        return _default_store
@@ -0,0 +1,345 @@
+"""
+Email delivery over SMTP
+
+Candidate emails are sent through a small pool of persistent SMTP
+connections instead of one connect/login/quit per message. Each
+connection is reused for up to SMTP_MAX_MESSAGES_PER_CONNECTION messages,
+reopened transparently if the server drops it, and the pool size is also
+the cap on concurrent sends. Every recipient gets a result entry.
+
+SMTPSink is a local SMTP server that accepts and records messages, for
+tests and for trying the delivery path without a real mail provider:
+
+    python email_delivery.py sink --port 1025
+"""
+
+import os
+import sys
+import queue
+import logging
+import smtplib
+import threading
+import socketserver
+from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"    # STARTTLS
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "false").lower() == "true"   # implicit TLS (port 465)
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+EMAIL_FROM = os.getenv("EMAIL_FROM", "")
+
+# Persistent connections (= max concurrent sends) and messages per connection
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+
+# Errors that mean the connection is gone and the message can be resent on a new one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+
+def smtp_configured():
+    """True when SMTP_HOST is set, i.e. emails are really delivered."""
+    return bool(SMTP_HOST)
+
+
+# ===========================================================
+# MESSAGES
+# ===========================================================
+
+def build_message(recipient, subject, body, sender=None):
+    sender = sender or EMAIL_FROM or SMTP_USERNAME
+    if not sender:
+        raise ValueError("No sender address: set EMAIL_FROM (or SMTP_USERNAME)")
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+# ===========================================================
+# CONNECTION POOL
+# ===========================================================
+
+class SMTPPool:
+    """Bounded pool of persistent, logged-in SMTP connections.
+
+    Connections are opened lazily, up to `size`; callers block until one is
+    free, so `size` also caps concurrent sends.
+    """
+
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=None,
+                 use_ssl=None, size=None, max_messages=None, timeout=None):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.username = SMTP_USERNAME if username is None else username
+        self.password = SMTP_PASSWORD if password is None else password
+        self.use_tls = SMTP_USE_TLS if use_tls is None else use_tls
+        self.use_ssl = SMTP_USE_SSL if use_ssl is None else use_ssl
+        self.size = size or SMTP_POOL_SIZE
+        self.max_messages = max_messages or SMTP_MAX_MESSAGES_PER_CONNECTION
+        self.timeout = timeout or SMTP_TIMEOUT
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.connections_opened = 0
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            conn.ehlo()
+            if self.use_tls and conn.has_extn("starttls"):
+                conn.starttls()
+                conn.ehlo()
+        if self.username:
+            conn.login(self.username, self.password)
+        conn.messages_sent = 0
+        with self.lock:
+            self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _acquire(self):
+        self.slots.acquire()
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except BaseException:
+                self.slots.release()
+                raise
+
+    def _release(self, conn):
+        if conn is not None:
+            if conn.messages_sent >= self.max_messages:
+                self._close(conn)
+            else:
+                self.idle.put(conn)
+        self.slots.release()
+
+    def send(self, message):
+        """Send one message on a pooled connection, reconnecting once if it was dropped."""
+        conn = self._acquire()
+        try:
+            try:
+                conn.send_message(message)
+            except RECONNECT_ERRORS:
+                conn.close()
+                conn = None
+                conn = self._connect()
+                conn.send_message(message)
+            conn.messages_sent += 1
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The server refused this message; the connection itself is fine
+            try:
+                conn.rset()
+            except Exception:
+                conn.close()
+                conn = None
+            raise
+        except BaseException:
+            if conn is not None:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Quit every idle connection."""
+        while True:
+            try:
+                self._close(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def send_bulk(pool, messages, concurrency=None):
+    """Send many messages concurrently over the pool.
+
+    Args:
+        pool: SMTPPool to send through
+        messages: List of EmailMessage objects
+        concurrency: Concurrent sends (default and maximum: the pool size)
+
+    Returns:
+        One {"email", "status": "sent" | "failed", "error"?} per message, in order
+    """
+    concurrency = min(concurrency or pool.size, pool.size)
+
+    def send_one(message):
+        result = {"email": message["To"], "status": "sent"}
+        try:
+            pool.send(message)
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        return result
+
+    if concurrency <= 1 or len(messages) <= 1:
+        return [send_one(m) for m in messages]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send_one, messages))
+
+
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_pool():
+    """Process-wide SMTPPool for the configured server."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPPool()
+        return _smtp_pool
+
+
+def reset_smtp_pool():
+    """Close the shared pool; the next get_smtp_pool() builds a new one."""
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is not None:
+            _smtp_pool.close()
+        _smtp_pool = None
+
+
+# ===========================================================
+# DEBUGGING SINK
+# ===========================================================
+
+class SMTPSink:
+    """Local SMTP server that accepts messages and keeps them in `messages`.
+
+    Speaks enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP,
+    QUIT), without TLS or AUTH. Recipients in `refuse` are rejected with
+    550. `messages` holds (sender, recipients, raw message bytes) tuples
+    and `connections` counts accepted connections.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, refuse=()):
+        self.messages = []
+        self.connections = 0
+        self.refuse = set(refuse)
+        self.lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                with sink.lock:
+                    sink.connections += 1
+                self.reply("220 localhost SMTP sink")
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode("utf-8", "replace").strip()
+                    verb = command[:4].upper()
+                    if verb == "EHLO":
+                        self.reply("250-localhost")
+                        self.reply("250-8BITMIME")
+                        self.reply("250 SMTPUTF8")
+                    elif verb == "HELO":
+                        self.reply("250 localhost")
+                    elif verb == "MAIL":
+                        sender, recipients = command.split(":", 1)[1].strip(), []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        address = command.split(":", 1)[1].strip().strip("<>")
+                        if address in sink.refuse:
+                            self.reply("550 Mailbox unavailable")
+                        else:
+                            recipients.append(address)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        lines = []
+                        while True:
+                            data = self.rfile.readline()
+                            if not data or data == b".\r\n":
+                                break
+                            lines.append(data[1:] if data.startswith(b"..") else data)
+                        with sink.lock:
+                            sink.messages.append((sender, recipients, b"".join(lines)))
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "RSET":
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "NOOP":
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "sink":
+        print("Usage: python email_delivery.py sink [--port PORT]")
+        sys.exit(1)
+    port = int(sys.argv[sys.argv.index("--port") + 1]) if "--port" in sys.argv else 1025
+    logging.basicConfig(level=logging.INFO)
+    with SMTPSink(port=port) as sink:
+        logger.info(f"SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+        seen = 0
+        try:
+            while True:
+                sink.thread.join(1)
+                for sender, recipients, _ in sink.messages[seen:]:
+                    logger.info(f"Received message from {sender} to {', '.join(recipients)}")
+                seen = len(sink.messages)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,256 @@
+"""
+Multi-funnel screening
+
+Runs many (Test A -> Test B) screening funnels in one process, driven by a
+JSON config file:
+
+    {
+      "concurrency": 4,
+      "invite_rate_per_sec": 5,
+      "invite_concurrency": 4,
+      "funnels": [
+        {"name": "backend", "test_a_id": 356098, "test_b_id": 2263157,
+         "test_a_pass_score": 70, "test_b_pass_score": 80}
+      ]
+    }
+
+Funnels run concurrently and share one invite budget: a single token
+bucket paces invites across all funnels and a semaphore caps how many are
+in flight at once. Each test is fetched at most once per run however many
+funnels read it, and funnels that feed the same Test B share its roster,
+so a candidate is never invited twice. The result is one consolidated
+report.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import new_agent
+from invite_engine import INVITE_CONCURRENCY, INVITE_RATE_PER_SEC, TokenBucket, bulk_invite
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+FUNNEL_CONFIG_PATH = os.getenv("FUNNEL_CONFIG_PATH", "funnels.json")
+
+# Funnels screened at the same time
+FUNNEL_CONCURRENCY = int(os.getenv("FUNNEL_CONCURRENCY", "4"))
+
+
+def load_funnels(path=None):
+    """Read and validate a funnel config file.
+
+    Returns the config dict with every funnel normalised (name and pass
+    scores filled in). Raises ValueError on a malformed config.
+    """
+    with open(path or FUNNEL_CONFIG_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    return normalize_config(config)
+
+
+def normalize_config(config):
+    """Validate a funnel config dict (or bare list of funnels) and fill in defaults."""
+    if isinstance(config, list):
+        config = {"funnels": config}
+    funnels = config.get("funnels")
+    if not isinstance(funnels, list) or not funnels:
+        raise ValueError("Funnel config needs a non-empty 'funnels' list")
+
+    normalized = []
+    for i, funnel in enumerate(funnels):
+        missing = [key for key in ("test_a_id", "test_b_id") if funnel.get(key) is None]
+        if missing:
+            raise ValueError(f"Funnel {i} is missing {', '.join(missing)}")
+        test_a_id = int(funnel["test_a_id"])
+        test_b_id = int(funnel["test_b_id"])
+        normalized.append({
+            "name": funnel.get("name") or f"{test_a_id}->{test_b_id}",
+            "test_a_id": test_a_id,
+            "test_b_id": test_b_id,
+            "test_a_pass_score": float(funnel.get("test_a_pass_score", new_agent.TEST_A_PASS_SCORE)),
+            "test_b_pass_score": float(funnel.get("test_b_pass_score", new_agent.TEST_B_PASS_SCORE)),
+        })
+
+    return {
+        "concurrency": int(config.get("concurrency") or FUNNEL_CONCURRENCY),
+        "invite_rate_per_sec": float(config.get("invite_rate_per_sec", INVITE_RATE_PER_SEC)),
+        "invite_concurrency": int(config.get("invite_concurrency") or INVITE_CONCURRENCY),
+        "funnels": normalized,
+    }
+
+
+# ===========================================================
+# SHARED STATE
+# ===========================================================
+
+class SharedFetches:
+    """Fetch each test at most once per run, however many funnels read it.
+
+    The first funnel to ask for a test fetches it; concurrent and later
+    readers wait for and reuse that result (or its error).
+    """
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.lock = threading.Lock()
+        self.results = {}          # test_id -> Future
+        self.reads = Counter()
+
+    def get(self, test_id):
+        with self.lock:
+            self.reads[test_id] += 1
+            future = self.results.get(test_id)
+            owner = future is None
+            if owner:
+                future = self.results[test_id] = Future()
+        if owner:
+            try:
+                future.set_result(self.fetch(test_id))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def stats(self):
+        with self.lock:
+            reads = sum(self.reads.values())
+            return {"tests_fetched": len(self.results), "fetches_shared": reads - len(self.results)}
+
+
+class RosterClaims:
+    """Per-test rosters shared by every funnel inviting to that test."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rosters = {}
+
+    def seed(self, test_id, candidates):
+        """Start a test's roster from its fetched candidates (first caller wins)."""
+        emails = new_agent.roster_emails(candidates)
+        with self.lock:
+            self.rosters.setdefault(test_id, emails)
+
+    def claim(self, test_id, email):
+        """True if this caller may invite `email`; each email is claimed once per test."""
+        key = new_agent.normalize_email(email)
+        if key is None:
+            return True
+        with self.lock:
+            roster = self.rosters.setdefault(test_id, set())
+            if key in roster:
+                return False
+            roster.add(key)
+            return True
+
+
+# ===========================================================
+# RUN
+# ===========================================================
+
+def run_funnel(funnel, fetches, claims, invite, bucket, gate, invite_concurrency):
+    """Screen one funnel: filter Test A, invite new passers to Test B, list Test B passers."""
+    test_a_id, test_b_id = funnel["test_a_id"], funnel["test_b_id"]
+
+    candidates_a = fetches.get(test_a_id)
+    passed_a = new_agent.filter_passed(candidates_a, funnel["test_a_pass_score"])
+    candidates_b = fetches.get(test_b_id)
+    passed_b = new_agent.filter_passed(candidates_b, funnel["test_b_pass_score"])
+
+    claims.seed(test_b_id, candidates_b)
+    to_invite, already_on_roster = [], []
+    for c in passed_a:
+        (to_invite if claims.claim(test_b_id, c.get("email")) else already_on_roster).append(c)
+
+    def gated_invite(candidate):
+        with gate:
+            return invite(test_b_id, candidate)
+
+    report = bulk_invite(gated_invite, to_invite, concurrency=invite_concurrency, bucket=bucket)
+    recruiter_ready = new_agent.recruiter_ready(passed_b, candidates_a)
+
+    logger.info(
+        f"Funnel {funnel['name']}: {len(passed_a)}/{len(candidates_a)} passed Test A, "
+        f"{report['invited']} invited, {len(recruiter_ready)} recruiter-ready"
+    )
+    return {
+        **funnel,
+        "test_a_candidates": len(candidates_a),
+        "passed_a": len(passed_a),
+        "test_b_candidates": len(candidates_b),
+        "passed_b": len(passed_b),
+        "invited": report["invited"],
+        "invite_failed": report["failed"],
+        "invite_skipped": report["skipped"],
+        "throttled": report["throttled"],
+        "already_on_roster": [c.get("email") for c in already_on_roster],
+        "invite_results": report["results"],
+        "recruiter_ready_count": len(recruiter_ready),
+        "recruiter_ready_candidates": recruiter_ready,
+    }
+
+
+def run_funnels(config, fetch=None, invite=None, session=None):
+    """Run every funnel in `config` concurrently and return a consolidated report.
+
+    Args:
+        config: Config dict as returned by load_funnels / normalize_config
+        fetch: Callable test_id -> candidate list (default: live API)
+        invite: Callable (test_id, candidate) -> HTTP response (default: live API)
+        session: Session for the default fetch and invite (default: shared session)
+    """
+    config = normalize_config(config)
+    if fetch is None or invite is None:
+        session = session or new_agent.get_shared_session()
+    fetch = fetch or (lambda test_id: new_agent.get_all_candidates(session, test_id))
+    invite = invite or (lambda test_id, c: new_agent.invite_to_test(session, test_id, c))
+
+    fetches = SharedFetches(fetch)
+    claims = RosterClaims()
+    bucket = TokenBucket(config["invite_rate_per_sec"])
+    gate = threading.BoundedSemaphore(config["invite_concurrency"])
+    funnels = config["funnels"]
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(config["concurrency"], len(funnels)))) as executor:
+        futures = [
+            executor.submit(run_funnel, funnel, fetches, claims, invite, bucket, gate,
+                            config["invite_concurrency"])
+            for funnel in funnels
+        ]
+        reports = []
+        for funnel, future in zip(funnels, futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                logger.error(f"Funnel {funnel['name']} failed: {e}")
+                reports.append({**funnel, "error": str(e)})
+
+    succeeded = [r for r in reports if "error" not in r]
+    totals = {
+        "funnels": len(reports),
+        "succeeded": len(succeeded),
+        "failed": len(reports) - len(succeeded),
+    }
+    for key in ("passed_a", "invited", "invite_failed", "passed_b", "recruiter_ready_count"):
+        totals[key] = sum(r[key] for r in succeeded)
+    totals["already_on_roster"] = sum(len(r["already_on_roster"]) for r in succeeded)
+
+    return {
+        "funnels": reports,
+        "totals": totals,
+        **fetches.stats(),
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    report = run_funnels(load_funnels(sys.argv[1] if len(sys.argv) > 1 else None))
+    print(json.dumps(report, indent=2))
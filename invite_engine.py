@@ -0,0 +1,238 @@
+"""
+Bulk invite engine
+
+Sends test invites on a bounded worker pool, paced by a shared token bucket
+instead of a fixed sleep. 429 responses pause the bucket for the server's
+Retry-After (or an exponential backoff) and halve the send rate, which then
+recovers gradually as invites succeed. Every candidate gets a result entry.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+import email.utils
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+INVITE_CONCURRENCY = int(os.getenv("INVITE_CONCURRENCY", "4"))
+INVITE_RATE_PER_SEC = float(os.getenv("INVITE_RATE_PER_SEC", "5"))   # 5/s == old sleep(0.2)
+INVITE_MAX_RETRIES = int(os.getenv("INVITE_MAX_RETRIES", "5"))
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+# ===========================================================
+# RATE LIMITING
+# ===========================================================
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation.
+
+    `acquire()` blocks until a token is available. `throttle(delay)` pauses
+    every caller for `delay` seconds and halves the rate; `recover()` nudges
+    the rate back up towards the configured maximum. A rate of 0 means
+    unlimited, but callers still wait out a throttle pause.
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate is not None else max(self.max_rate / 16, 0.1)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def acquire(self):
+        """Block until one token can be taken."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.max_rate <= 0:
+                    return
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self, delay):
+        """Pause all callers for `delay` seconds and back the rate off."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + delay)
+            if self.max_rate > 0:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+
+    def recover(self):
+        """Additively restore the rate after a successful call."""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP-date) into seconds, or None."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt, retry_after=None, base=None, cap=None):
+    """Delay before retry `attempt` (1-based): Retry-After if given, else jittered exponential."""
+    base = BACKOFF_BASE_SECONDS if base is None else base
+    cap = BACKOFF_MAX_SECONDS if cap is None else cap
+    if retry_after is not None:
+        return min(retry_after, cap)
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# ===========================================================
+# BULK INVITES
+# ===========================================================
+
+def iter_bulk_invite(invite_fn, candidates, concurrency=None, rate=None,
+                     max_retries=None, bucket=None):
+    """Invite a stream of candidates, yielding one result per candidate in input order.
+
+    Candidates are pulled from `candidates` lazily: at most 2 * concurrency
+    are in flight at once, so an unbounded generator can be invited with
+    flat memory.
+
+    Args:
+        invite_fn: Callable taking a candidate and returning the HTTP response
+            (or None when the candidate was skipped, e.g. no email)
+        candidates: Iterable of candidate dicts
+        concurrency: Worker threads (default: INVITE_CONCURRENCY)
+        rate: Invites per second (default: INVITE_RATE_PER_SEC; 0 = unlimited)
+        max_retries: Retries per candidate on 429 (default: INVITE_MAX_RETRIES)
+        bucket: Optional TokenBucket shared with other callers
+    """
+    concurrency = concurrency or INVITE_CONCURRENCY
+    rate = INVITE_RATE_PER_SEC if rate is None else rate
+    max_retries = INVITE_MAX_RETRIES if max_retries is None else max_retries
+    bucket = bucket or TokenBucket(rate)
+
+    def invite_one(candidate):
+        email_address = candidate.get("email")
+        result = {"email": email_address, "status": "failed", "attempts": 0,
+                  "status_code": None, "throttled": 0}
+
+        for attempt in range(1, max_retries + 2):
+            bucket.acquire()
+            result["attempts"] = attempt
+            try:
+                res = invite_fn(candidate)
+            except Exception as e:
+                result["error"] = str(e)
+                return result
+
+            if res is None:
+                result["status"] = "skipped"
+                result["error"] = "No email address provided" if not email_address else "Skipped"
+                return result
+
+            result["status_code"] = res.status_code
+            if res.status_code in (200, 201):
+                bucket.recover()
+                result["status"] = "invited"
+                return result
+
+            if res.status_code == 429 and attempt <= max_retries:
+                result["throttled"] += 1
+                headers = getattr(res, "headers", None) or {}
+                delay = backoff_delay(attempt, parse_retry_after(headers.get("Retry-After")))
+                logger.warning(f"Rate limited inviting {email_address}; retrying in {delay:.1f}s")
+                bucket.throttle(delay)
+                continue
+
+            result["error"] = getattr(res, "text", "") or f"HTTP {res.status_code}"
+            return result
+
+        return result
+
+    window = 2 * concurrency
+    pending = deque()
+    iterator = iter(candidates)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            while True:
+                try:
+                    candidate = next(iterator)
+                except StopIteration:
+                    break
+                except Exception:
+                    # The input stream failed (e.g. a page fetch): report the
+                    # invites already sent before propagating the error
+                    while pending:
+                        yield pending.popleft().result()
+                    raise
+                pending.append(executor.submit(invite_one, candidate))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def summarize_invites(results):
+    """Build a bulk invite report from a list of per-candidate results."""
+    return {
+        "total": len(results),
+        "invited": sum(1 for r in results if r["status"] == "invited"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "throttled": sum(r.get("throttled", 0) for r in results),
+        "results": results,
+    }
+
+
+def bulk_invite(invite_fn, candidates, concurrency=None, rate=None,
+                max_retries=None, bucket=None):
+    """Invite many candidates concurrently under a shared rate limit.
+
+    Takes the same arguments as iter_bulk_invite and returns a report dict
+    with invited/failed/skipped/throttled counts and one result entry per
+    candidate, in input order.
+    """
+    results = list(iter_bulk_invite(invite_fn, candidates, concurrency, rate, max_retries, bucket))
+    report = summarize_invites(results)
+    logger.info(
+        f"Bulk invite done: {report['invited']} invited, {report['failed']} failed, "
+        f"{report['skipped']} skipped, {report['throttled']} throttled"
+    )
+    return report
@@ -0,0 +1,245 @@
+"""
+Background jobs with progress polling
+
+A long tool call (a full screening pipeline over a large funnel) can
+outlive an MCP client's request timeout. JobManager runs such calls on a
+small worker pool instead: `submit` returns a Job at once, and clients
+poll its status, per-stage progress counters and, once it has finished,
+its result.
+
+Code running inside a job reports progress through the module-level
+`set_stage`, `advance` and `check_cancelled` helpers, which find the
+current job through a context variable and are no-ops outside a job, so
+the same function works both as a job and as a direct call. Cancellation
+is cooperative: it takes effect at the next `check_cancelled`.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+# Jobs run concurrently; more are queued
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Finished jobs kept for status/result polling (oldest are dropped first)
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(BaseException):
+    """Raised by check_cancelled() inside a job whose cancellation was requested.
+
+    A BaseException, so tools that turn every Exception into an
+    {"error": ...} result still let a cancellation through.
+    """
+
+
+class Job:
+    """One submitted call: its state, per-stage progress and outcome."""
+
+    def __init__(self, kind, params=None, key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.params = dict(params or {})
+        self.status = QUEUED
+        self.stage = None
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def set_stage(self, stage):
+        with self.lock:
+            self.stage = stage
+
+    def advance(self, **counts):
+        """Add to the named progress counters."""
+        with self.lock:
+            for name, count in counts.items():
+                self.progress[name] = self.progress.get(name, 0) + count
+
+    def snapshot(self, include_result=False):
+        """JSON-ready view of the job; the result only once it has finished."""
+        with self.lock:
+            elapsed_end = self.finished_at or time.time()
+            view = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "params": dict(self.params),
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "cancel_requested": self.cancel_requested.is_set(),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_seconds": round(elapsed_end - self.started_at, 3) if self.started_at else 0.0,
+            }
+            if self.error is not None:
+                view["error"] = self.error
+            if include_result and self.finished:
+                view["result"] = self.result
+            return view
+
+
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+def current_job():
+    """The Job running in this context, or None outside a job."""
+    return _current_job.get()
+
+
+def set_stage(stage):
+    job = current_job()
+    if job is not None:
+        job.set_stage(stage)
+
+
+def advance(**counts):
+    job = current_job()
+    if job is not None:
+        job.advance(**counts)
+
+
+def check_cancelled():
+    """Raise JobCancelled if the current job has been asked to stop."""
+    job = current_job()
+    if job is not None and job.cancel_requested.is_set():
+        raise JobCancelled(job.id)
+
+
+class JobManager:
+    """Runs submitted calls on a worker pool and keeps them for polling."""
+
+    def __init__(self, workers=None, history=None):
+        self.workers = workers or JOB_WORKERS
+        self.history = JOB_HISTORY if history is None else history
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self.jobs = OrderedDict()      # job_id -> Job, in submission order
+        self.lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, job_key=None, **kwargs):
+        """Queue `fn(*args, **kwargs)` and return its Job immediately.
+
+        With `job_key`, at most one job per key is queued or running: while
+        one is, submitting the same key returns that job instead of starting
+        another. A dict result with an "error" key (the tools' error shape)
+        marks the job failed.
+        """
+        with self.lock:
+            existing = self._active(job_key)
+            if existing is not None:
+                return existing
+            job = Job(kind, kwargs, key=job_key)
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        with job.lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        token = _current_job.set(job)
+        try:
+            result = fn(*args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            self._finish(job, FAILED, error=str(e))
+        else:
+            if isinstance(result, dict) and "error" in result:
+                self._finish(job, FAILED, result=result, error=result["error"])
+            else:
+                self._finish(job, SUCCEEDED, result=result)
+        finally:
+            _current_job.reset(token)
+
+    def _finish(self, job, status, result=None, error=None):
+        with job.lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.stage = status if status != SUCCEEDED else "done"
+            job.finished_at = time.time()
+        job.done.set()
+        logger.info(f"Job {job.id} {status}")
+
+    def _prune(self):
+        # Caller holds self.lock; unfinished jobs are never dropped
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def _active(self, job_key):
+        # Caller holds self.lock
+        if job_key is None:
+            return None
+        for job in self.jobs.values():
+            if job.key == job_key and not job.finished:
+                return job
+        return None
+
+    def active(self, job_key):
+        """The queued or running job submitted with `job_key`, or None."""
+        with self.lock:
+            return self._active(job_key)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Ask a job to stop. Returns the Job, or None if the ID is unknown.
+
+        A queued job never starts; a running one stops at its next
+        check_cancelled(). Finished jobs are left as they are.
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_requested.set()
+        return job
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes (or timeout); True if it has finished."""
+        job = self.get(job_id)
+        return job is not None and job.done.wait(timeout)
+
+    def shutdown(self, wait=True):
+        for job in self.list():
+            if not job.finished:
+                job.cancel_requested.set()
+        self.executor.shutdown(wait=wait)
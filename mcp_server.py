@@ -7,8 +7,12 @@ by AI assistants and other MCP clients.
 
 import os
 import json
+import asyncio
 import logging
+import functools
+from types import SimpleNamespace
 from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Set up logging
@@ -24,6 +28,21 @@ load_dotenv()
 
 # Import agent functions
 import new_agent
+import async_client
+import candidate_store
+import scoring
+import score_aggregates
+import resilience
+import synthetic_cohort
+import top_candidates as top_candidates_engine
+import calendar_client
+import email_delivery
+import jobs
+from funnels import load_funnels, run_funnels
+from invite_engine import bulk_invite, iter_bulk_invite, summarize_invites
+from pipeline_journal import open_journal, screening_journal_path
+from single_flight import SingleFlight
+from ttl_cache import TTLCache
 
 # ===========================================================
 # MOCK CANDIDATES DATA - For testing/demo without real API
@@ -261,16 +280,246 @@ MOCK_TESTS_INFO = {
 }
 
 
+# Synthetic cohort replacing the hand-written mock candidates when
+# MOCK_COHORT_SIZE is set (None otherwise)
+MOCK_COHORT = synthetic_cohort.cohort_from_env(*MOCK_TESTS_INFO)
+
+
 def get_mock_candidates(test_id: int) -> List[Dict[str, Any]]:
     """Get mock candidates for a test ID"""
+    if MOCK_COHORT is not None and test_id in MOCK_COHORT.test_ids:
+        return MOCK_COHORT.candidates(test_id)
     return MOCK_CANDIDATES_DATA.get(test_id, [])
 
 
 def get_mock_tests() -> List[Dict[str, Any]]:
     """Get list of all mock tests"""
+    if MOCK_COHORT is not None:
+        return [
+            {**test, "candidate_count": MOCK_COHORT.size(test_id)}
+            for test_id, test in MOCK_TESTS_INFO.items()
+        ]
     return list(MOCK_TESTS_INFO.values())
 
 
+def build_recruiter_ready(passed_b: List[Dict[str, Any]],
+                          candidates_a: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Recruiter-ready entries for Test B passers, joined to their Test A score by email"""
+    return new_agent.recruiter_ready(passed_b, candidates_a)
+
+
+# Shared cache of candidate lists keyed by test_id (CACHE_TTL_SECONDS=0 disables)
+CANDIDATE_CACHE = TTLCache(
+    maxsize=int(os.getenv("CACHE_MAX_ENTRIES", "32")),
+    ttl=float(os.getenv("CACHE_TTL_SECONDS", "60"))
+)
+
+
+# Running score aggregates per test, rebuilt whenever a test is loaded from the
+# API (with CANDIDATE_STORE_PATH set the store keeps its own as it syncs). Kept
+# no longer than the candidate lists they summarise.
+SCORE_AGGREGATES = TTLCache(
+    maxsize=int(os.getenv("AGGREGATE_MAX_TESTS", "256")),
+    ttl=min(float(os.getenv("AGGREGATE_TTL_SECONDS", str(CANDIDATE_CACHE.ttl))), CANDIDATE_CACHE.ttl)
+)
+
+
+# Concurrent cache misses for the same test share one in-flight download
+CANDIDATE_FETCHES = SingleFlight()
+
+
+def candidate_fetch_key(test_id: int):
+    """Single-flight key: the test plus the settings that shape the fetched list."""
+    return (test_id, new_agent.COMPACT_CANDIDATES, bool(candidate_store.CANDIDATE_STORE_PATH))
+
+
+def fetch_candidates(test_id: int, session=None) -> List[Dict[str, Any]]:
+    """
+    Get all candidates for a test from mock data, the in-process cache, the
+    local candidate store (when CANDIDATE_STORE_PATH is set) or the
+    HackerRank API. Concurrent callers missing the cache for the same test
+    wait for one shared download.
+    """
+    if USE_MOCK_DATA:
+        return get_mock_candidates(test_id)
+    
+    def load():
+        active_session = session or new_agent.get_shared_session()
+        store = candidate_store.get_default_store()
+        if store is not None:
+            return store.get_candidates(active_session, test_id)
+        generation = SCORE_AGGREGATES.generation(test_id)
+        candidates = new_agent.get_all_candidates(active_session, test_id)
+        remember_aggregate(test_id, candidates, generation)
+        return candidates
+    
+    return CANDIDATE_CACHE.get_or_load(
+        test_id, lambda: CANDIDATE_FETCHES.do(candidate_fetch_key(test_id), load)
+    )
+
+
+def remember_aggregate(test_id: int, candidates: List[Dict[str, Any]], generation) -> None:
+    """Keep the aggregate of a downloaded test, unless it was invalidated during the download."""
+    SCORE_AGGREGATES.set_if_generation(test_id, score_aggregates.ScoreAggregate.from_scores(
+        map(new_agent.extract_score, candidates)
+    ), generation)
+
+
+async def prefetch_candidates(*test_ids: int) -> None:
+    """
+    Download tests missing from CANDIDATE_CACHE with the async client, on
+    the event loop, so a tool then run on TOOL_EXECUTOR finds them cached
+    instead of holding a pool thread for the download. Shares in-flight
+    downloads with fetch_candidates. Does nothing in mock mode, with the
+    candidate store or with the cache disabled; a failed download is only
+    logged, leaving the tool to fetch (and report the error) itself.
+    """
+    if USE_MOCK_DATA or candidate_store.get_default_store() is not None or not CANDIDATE_CACHE.enabled:
+        return
+    
+    async def prefetch(test_id):
+        if CANDIDATE_CACHE.peek(test_id) is not None:
+            return
+        generation = CANDIDATE_CACHE.generation(test_id)
+        
+        async def load():
+            aggregate_generation = SCORE_AGGREGATES.generation(test_id)
+            async with async_client.make_async_client() as client:
+                candidates = await async_client.get_all_candidates(client, test_id)
+            remember_aggregate(test_id, candidates, aggregate_generation)
+            return candidates
+        
+        try:
+            candidates = await CANDIDATE_FETCHES.do_async(candidate_fetch_key(test_id), load)
+        except Exception as e:
+            logger.warning(f"Prefetch of test {test_id} failed: {e}")
+            return
+        CANDIDATE_CACHE.set_if_generation(test_id, candidates, generation)
+    
+    await asyncio.gather(*(prefetch(test_id) for test_id in dict.fromkeys(test_ids)))
+
+
+async def prefetch_scores(test_id: int, email: Optional[str] = None,
+                          include_candidates: bool = True, **_) -> None:
+    """get_candidate_scores prefetch: statistics-only calls read aggregates, not candidate lists."""
+    if include_candidates or email:
+        await prefetch_candidates(test_id)
+
+
+def invalidate_candidates(test_id: int) -> None:
+    """Drop a test's cached candidates and aggregate and detach callers from any download in flight."""
+    CANDIDATE_CACHE.invalidate(test_id)
+    SCORE_AGGREGATES.invalidate(test_id)
+    CANDIDATE_FETCHES.forget(candidate_fetch_key(test_id))
+
+
+# Concurrent per-test fetches in list_all_tests
+TEST_STATS_WORKERS = int(os.getenv("TEST_STATS_WORKERS", "8"))
+
+
+def configured_test_ids() -> List[int]:
+    """Tests list_all_tests reports on: LIST_TEST_IDS (comma-separated), else TEST_A_ID and TEST_B_ID."""
+    raw = os.getenv("LIST_TEST_IDS", "")
+    if raw.strip():
+        test_ids = [int(part) for part in raw.split(",") if part.strip()]
+    else:
+        test_ids = [int(os.getenv("TEST_A_ID", "0")) or 356098,
+                    int(os.getenv("TEST_B_ID", "0")) or 2263157]
+    return list(dict.fromkeys(test_ids))
+
+
+def score_aggregate_for_test(test_id: int, session=None):
+    """
+    Running ScoreAggregate of a test plus its source: the candidate store's
+    ("store"), one kept from an earlier load ("aggregate"), one built from
+    the cached candidate list ("cache") or from one pass over the API pages
+    that holds no more than a page at a time ("api"). Mock mode aggregates
+    the mock data ("mock").
+    """
+    if USE_MOCK_DATA:
+        scores = map(new_agent.extract_score, get_mock_candidates(test_id))
+        return score_aggregates.ScoreAggregate.from_scores(scores), "mock"
+    
+    store = candidate_store.get_default_store()
+    if store is not None:
+        return store.get_aggregate(session or new_agent.get_shared_session(), test_id), "store"
+    
+    generation = SCORE_AGGREGATES.generation(test_id)
+    aggregate = SCORE_AGGREGATES.peek(test_id)
+    if aggregate is not None:
+        return aggregate, "aggregate"
+    
+    cached = CANDIDATE_CACHE.peek(test_id)
+    if cached is not None:
+        aggregate = score_aggregates.ScoreAggregate.from_scores(map(new_agent.extract_score, cached))
+        source = "cache"
+    else:
+        aggregate, source = score_aggregates.ScoreAggregate(), "api"
+        for _, batch in new_agent.iter_candidate_pages(session or new_agent.get_shared_session(), test_id):
+            for candidate in batch:
+                aggregate.add(new_agent.extract_score(candidate))
+    SCORE_AGGREGATES.set_if_generation(test_id, aggregate, generation)
+    return aggregate, source
+
+
+def peek_score_aggregate(test_id: int):
+    """A test's ScoreAggregate if one is at hand without any HackerRank I/O, else None."""
+    if USE_MOCK_DATA:
+        return score_aggregate_for_test(test_id)[0]
+    store = candidate_store.get_default_store()
+    if store is not None:
+        return store.peek_aggregate(test_id)
+    return SCORE_AGGREGATES.peek(test_id)
+
+
+def describe_aggregate(test_id: int, thresholds: List[float]) -> str:
+    """One-line statistics of a test from an aggregate already at hand, or "" if none."""
+    aggregate = peek_score_aggregate(test_id)
+    if aggregate is None or not aggregate.attempts:
+        return ""
+    summary = aggregate.summary()
+    line = f"Test {test_id}: {aggregate.attempts} attempts, {aggregate.scored} with a score"
+    if summary["count"]:
+        line += (f"; mean {summary['mean']}, min {summary['min']}, "
+                 f"median ~{summary['percentiles']['p50']}, max {summary['max']}")
+    for threshold in thresholds:
+        line += f"; {aggregate.count_at_least(threshold)} scored at least {scoring.as_number(threshold)}"
+    return line + "."
+
+
+# Tools doing blocking HackerRank, SMTP or Calendar I/O run on this pool so
+# the server's event loop keeps serving other requests meanwhile; upstream
+# HackerRank requests are capped process-wide by resilience.API_MAX_IN_FLIGHT
+MCP_TOOL_WORKERS = int(os.getenv("MCP_TOOL_WORKERS", "8"))
+TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=MCP_TOOL_WORKERS, thread_name_prefix="mcp-tool")
+
+
+def off_loop(register, prefetch=None):
+    """Register a blocking function through `register` (e.g. mcp.tool()) as an
+    async handler that runs it on TOOL_EXECUTOR.
+
+    With `prefetch`, the handler first awaits `prefetch(**arguments)` on the
+    event loop (e.g. prefetch_candidates for the tests the call reads).
+    The plain function is returned unchanged, so it can still be called
+    directly (and synchronously) from Python.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def handler(*args, **kwargs):
+            if prefetch is not None:
+                await prefetch(**kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(TOOL_EXECUTOR, functools.partial(fn, *args, **kwargs))
+        register(handler)
+        return fn
+    return decorator
+
+
+# Background jobs (start_screening_job): long pipelines run here and are
+# polled for progress instead of holding one tool call open
+JOB_MANAGER = jobs.JobManager()
+
+
 # Try to import MCP
 try:
     from mcp.server.fastmcp import FastMCP
@@ -288,7 +537,7 @@ if MCP_AVAILABLE:
     # MCP TOOLS - Expose agent functions as callable tools
     # ===========================================================
 
-    @mcp.tool()
+    @off_loop(mcp.tool(), prefetch=lambda test_id, **_: prefetch_candidates(test_id))
     def get_test_candidates(test_id: int, passing_score: float = 60.0) -> Dict[str, Any]:
         """
         Get candidates who passed a specific test.
@@ -301,11 +550,7 @@ if MCP_AVAILABLE:
             Dictionary with candidate count and list of passed candidates
         """
         try:
-            if USE_MOCK_DATA:
-                all_candidates = get_mock_candidates(test_id)
-            else:
-                session = new_agent.make_session()
-                all_candidates = new_agent.get_all_candidates(session, test_id)
+            all_candidates = fetch_candidates(test_id)
             
             passed_candidates = new_agent.filter_passed(all_candidates, passing_score)
             
@@ -328,11 +573,15 @@ if MCP_AVAILABLE:
             return {"error": str(e)}
 
 
-    @mcp.tool()
+    @off_loop(mcp.tool(), prefetch=lambda test_id, **_: prefetch_candidates(test_id))
     def invite_candidates_to_test(test_id: int, candidate_emails: List[str]) -> Dict[str, Any]:
         """
         Invite candidates to a test by their email addresses.
         
+        Candidates already on the test's roster (and repeated emails) are
+        skipped and listed under "already_invited", so retrying a call does
+        not send duplicate invites.
+        
         Args:
             test_id: The HackerRank test ID to invite candidates to
             candidate_emails: List of candidate email addresses
@@ -352,30 +601,44 @@ if MCP_AVAILABLE:
                 }
                 return results
             
-            session = new_agent.make_session()
-            results = {
+            # Skip anyone already on the test's roster so retried calls don't
+            # send duplicate invites; if the roster can't be read, invite anyway
+            try:
+                roster = new_agent.roster_emails(fetch_candidates(test_id))
+                roster_checked = True
+            except Exception as e:
+                logger.warning(f"Could not read roster of test {test_id}, not deduplicating: {e}")
+                roster = set()
+                roster_checked = False
+            
+            session = new_agent.get_shared_session()
+            candidates = [{"email": email, "name": email.split("@")[0]} for email in candidate_emails]
+            already_invited = []
+            report = bulk_invite(
+                lambda c: new_agent.invite_to_test(session, test_id, c),
+                new_agent.exclude_roster(candidates, roster, on_skip=already_invited.append)
+            )
+            invalidate_candidates(test_id)
+            
+            return {
                 "test_id": test_id,
-                "total_invited": 0,
-                "successful": [],
-                "failed": [],
+                "total_invited": report["invited"],
+                "successful": [r["email"] for r in report["results"] if r["status"] == "invited"],
+                "failed": [
+                    {"email": r["email"], "error": r.get("error")}
+                    for r in report["results"] if r["status"] != "invited"
+                ],
+                "already_invited": [c["email"] for c in already_invited],
+                "roster_checked": roster_checked,
+                "throttled": report["throttled"],
+                "results": report["results"],
                 "mock_data": False
             }
-            
-            for email in candidate_emails:
-                candidate = {"email": email, "name": email.split("@")[0]}
-                try:
-                    new_agent.invite_to_test(session, test_id, candidate)
-                    results["successful"].append(email)
-                    results["total_invited"] += 1
-                except Exception as e:
-                    results["failed"].append({"email": email, "error": str(e)})
-            
-            return results
         except Exception as e:
             return {"error": str(e)}
 
 
-    @mcp.tool()
+    @off_loop(mcp.tool())
     def run_screening_pipeline(
         test_a_id: int,
         test_b_id: int,
@@ -388,8 +651,8 @@ if MCP_AVAILABLE:
         This tool:
         1. Gets candidates from Test A
         2. Filters those who passed
-        3. Invites them to Test B
-        4. Gets Test B results
+        3. Gets Test B candidates and results
+        4. Invites Test A passers not already on the Test B roster
         5. Filters those who passed Test B
         6. Sends congratulatory emails to candidates who passed Test B
         7. Sends Google Meet invites to top 3 candidates (by score)
@@ -403,40 +666,39 @@ if MCP_AVAILABLE:
         
         Returns:
             Dictionary with pipeline results
+        
+        Use start_screening_job to run it in the background with progress
+        polling instead.
         """
         try:
             if USE_MOCK_DATA:
                 # Use mock data
+                jobs.set_stage("fetch_test_a")
                 candidates_a = get_mock_candidates(test_a_id)
                 passed_a = new_agent.filter_passed(candidates_a, test_a_pass_score)
                 
                 # Get Test B candidates (some from Test A may have taken Test B)
+                jobs.set_stage("fetch_test_b")
                 candidates_b = get_mock_candidates(test_b_id)
                 passed_b = new_agent.filter_passed(candidates_b, test_b_pass_score)
                 
                 # Prepare recruiter-ready list
-                recruiter_ready = [
-                    {
-                        "email": c.get("email"),
-                        "name": c.get("full_name") or c.get("name"),
-                        "score": new_agent.extract_score(c),
-                        "test_a_score": next(
-                            (new_agent.extract_score(ca) for ca in candidates_a 
-                             if ca.get("email") == c.get("email")), 
-                            None
-                        )
-                    }
-                    for c in passed_b
-                ]
+                recruiter_ready = build_recruiter_ready(passed_b, candidates_a)
                 
                 # Step 5: Send emails to candidates who passed Test B
+                jobs.check_cancelled()
+                jobs.set_stage("email")
                 email_results = send_email_to_candidates(recruiter_ready)
+                jobs.advance(emails_sent=email_results.get("emails_sent", 0))
                 
                 # Step 6: Send Google Meet invites to top 3 candidates
+                jobs.check_cancelled()
+                jobs.set_stage("calendar")
                 meet_invite_results = send_google_meet_invites_to_top_candidates(
                     recruiter_ready,
                     top_n=3
                 )
+                jobs.advance(meet_invites_sent=meet_invite_results.get("invites_sent", 0))
                 
                 return {
                     "test_a": {
@@ -467,48 +729,107 @@ if MCP_AVAILABLE:
                     "mock_data": True
                 }
             
-            session = new_agent.make_session()
+            session = new_agent.get_shared_session()
             
-            # Step 1: Get Test A candidates
-            candidates_a = new_agent.get_all_candidates(session, test_a_id)
-            passed_a = new_agent.filter_passed(candidates_a, test_a_pass_score)
+            # Checkpoint journal (PIPELINE_JOURNAL_DIR): a rerun after a failure
+            # replays fetched pages and skips candidates already handled
+            journal = open_journal(screening_journal_path(test_a_id, test_b_id))
             
-            # Step 2: Invite to Test B
-            invited_count = 0
-            for candidate in passed_a:
-                try:
-                    new_agent.invite_to_test(session, test_b_id, candidate)
-                    invited_count += 1
-                except Exception:
-                    pass
+            def page_fetched(batch):
+                # When running as a background job: progress, and a cancellation point
+                jobs.advance(pages_fetched=1, candidates_fetched=len(batch))
+                jobs.check_cancelled()
             
-            # Step 3: Get Test B candidates
-            candidates_b = new_agent.get_all_candidates(session, test_b_id)
-            passed_b = new_agent.filter_passed(candidates_b, test_b_pass_score)
+            def load_candidates(test_id):
+                if journal is None:
+                    return new_agent.get_all_candidates(session, test_id, on_page=page_fetched)
+                pages = journal.checkpointed_pages(
+                    test_id,
+                    lambda start: new_agent.iter_candidate_pages(session, test_id, start),
+                    new_agent.LIMIT
+                )
+                candidates = []
+                for _, batch in pages:
+                    page_fetched(batch)
+                    candidates.extend(batch)
+                return candidates
             
-            # Step 4: Prepare recruiter-ready list
-            recruiter_ready = [
-                {
-                    "email": c.get("email"),
-                    "name": c.get("full_name") or c.get("name"),
-                    "score": new_agent.extract_score(c),
-                    "test_a_score": next(
-                        (new_agent.extract_score(ca) for ca in candidates_a 
-                         if ca.get("email") == c.get("email")), 
-                        None
-                    )
-                }
-                for c in passed_b
-            ]
+            def pending(outcome, test_id, candidates):
+                if journal is None:
+                    return list(candidates)
+                return [c for c in candidates if not journal.has(outcome, test_id, c.get("email"))]
             
-            # Step 5: Send emails to candidates who passed Test B
-            email_results = send_email_to_candidates(recruiter_ready)
+            def record(outcome, test_id, entries):
+                if journal is not None:
+                    for entry in entries:
+                        journal.record(outcome, test_id, entry.get("email"))
             
-            # Step 6: Send Google Meet invites to top 3 candidates
-            meet_invite_results = send_google_meet_invites_to_top_candidates(
-                recruiter_ready,
-                top_n=3
-            )
+            try:
+                # Step 1: Get Test A candidates
+                jobs.set_stage("fetch_test_a")
+                candidates_a = load_candidates(test_a_id)
+                passed_a = new_agent.filter_passed(candidates_a, test_a_pass_score)
+                
+                # Step 2: Get Test B candidates once: the roster to dedupe invites
+                # against, and the results (new invitees have no results yet)
+                jobs.set_stage("fetch_test_b")
+                candidates_b = load_candidates(test_b_id)
+                passed_b = new_agent.filter_passed(candidates_b, test_b_pass_score)
+                
+                # Step 3: Invite to Test B anyone not already on its roster (each
+                # invite is journaled as it completes)
+                already_on_roster = []
+                to_invite = pending("invited", test_b_id, new_agent.exclude_roster(
+                    passed_a, new_agent.roster_emails(candidates_b),
+                    on_skip=already_on_roster.append
+                ))
+                jobs.set_stage("invite")
+                invite_results = []
+                for result in iter_bulk_invite(
+                    lambda c: new_agent.invite_to_test(session, test_b_id, c),
+                    to_invite
+                ):
+                    invite_results.append(result)
+                    if result["status"] == "invited":
+                        record("invited", test_b_id, [result])
+                        jobs.advance(invites_sent=1)
+                    else:
+                        jobs.advance(invites_not_sent=1)
+                    jobs.check_cancelled()
+                invite_report = summarize_invites(invite_results)
+                invited_count = invite_report["invited"]
+                invalidate_candidates(test_b_id)
+                
+                # Step 4: Prepare recruiter-ready list
+                recruiter_ready = build_recruiter_ready(passed_b, candidates_a)
+                
+                # Step 5: Send emails to candidates who passed Test B
+                jobs.check_cancelled()
+                jobs.set_stage("email")
+                to_email = pending("emailed", test_b_id, recruiter_ready)
+                email_results = send_email_to_candidates(to_email)
+                jobs.advance(emails_sent=email_results.get("emails_sent", 0))
+                record("emailed", test_b_id, email_results.get("successful", []))
+                
+                # Step 6: Send Google Meet invites to top 3 candidates; on resume the
+                # ones already invited keep their slots
+                jobs.check_cancelled()
+                jobs.set_stage("calendar")
+                to_calendar = pending("calendared", test_b_id, recruiter_ready)
+                meet_invite_results = send_google_meet_invites_to_top_candidates(
+                    to_calendar,
+                    top_n=max(0, 3 - (len(recruiter_ready) - len(to_calendar)))
+                )
+                jobs.advance(meet_invites_sent=meet_invite_results.get("invites_sent", 0))
+                record("calendared", test_b_id, meet_invite_results.get("successful", []))
+            except BaseException:
+                if journal is not None:
+                    journal.close()
+                raise
+            
+            resumed = journal is not None and journal.resumed
+            if journal is not None:
+                journal.finish()
             
             return {
                 "test_a": {
@@ -524,6 +845,13 @@ if MCP_AVAILABLE:
                     "passing_score": test_b_pass_score
                 },
                 "invited_to_test_b": invited_count,
+                "invite_results": {
+                    "failed": invite_report["failed"],
+                    "skipped": invite_report["skipped"],
+                    "already_on_roster": [c.get("email") for c in already_on_roster],
+                    "throttled": invite_report["throttled"],
+                    "results": invite_report["results"]
+                },
                 "recruiter_ready_count": len(recruiter_ready),
                 "recruiter_ready_candidates": recruiter_ready,
                 "emails_sent": email_results.get("emails_sent", 0),
@@ -536,6 +864,7 @@ if MCP_AVAILABLE:
                     "successful": meet_invite_results.get("successful", []),
                     "failed": meet_invite_results.get("failed", [])
                 },
+                "resumed": resumed,
                 "mock_data": False
             }
         except Exception as e:
@@ -543,10 +872,162 @@ if MCP_AVAILABLE:
 
 
     @mcp.tool()
+    def start_screening_job(
+        test_a_id: int,
+        test_b_id: int,
+        test_a_pass_score: float = 70.0,
+        test_b_pass_score: float = 80.0
+    ) -> Dict[str, Any]:
+        """
+        Start the screening pipeline (see run_screening_pipeline) as a
+        background job and return its job ID immediately.
+        
+        Poll get_job_status for per-stage progress and get_job_result for the
+        pipeline result; cancel_job stops it. While a job for the same pair
+        of tests is queued or running, that job is returned (with
+        already_running set) instead of starting a second one, as both would
+        share one checkpoint journal and send the same invites.
+        
+        Args:
+            test_a_id: Initial screening test ID
+            test_b_id: Advanced test ID
+            test_a_pass_score: Minimum score to pass Test A (default: 70.0)
+            test_b_pass_score: Minimum score to pass Test B (default: 80.0)
+        
+        Returns:
+            Dictionary with job_id, the job's status and already_running
+        """
+        job_key = ("screening_pipeline", test_a_id, test_b_id)
+        existing = JOB_MANAGER.active(job_key)
+        job = existing or JOB_MANAGER.submit(
+            "screening_pipeline", run_screening_pipeline, job_key=job_key,
+            test_a_id=test_a_id, test_b_id=test_b_id,
+            test_a_pass_score=test_a_pass_score, test_b_pass_score=test_b_pass_score
+        )
+        return {**job.snapshot(), "already_running": existing is not None}
+
+
+    @mcp.tool()
+    def get_job_status(job_id: str) -> Dict[str, Any]:
+        """
+        Get a background job's status, current stage and progress counters.
+        
+        Args:
+            job_id: ID returned by start_screening_job
+        
+        Returns:
+            Dictionary with status (queued, running, succeeded, failed or
+            cancelled), stage, progress (pages_fetched, candidates_fetched,
+            invites_sent, invites_not_sent, emails_sent, meet_invites_sent)
+            and timings
+        """
+        job = JOB_MANAGER.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.snapshot()
+
+
+    @mcp.tool()
+    def get_job_result(job_id: str) -> Dict[str, Any]:
+        """
+        Get a background job's result once it has finished.
+        
+        Args:
+            job_id: ID returned by start_screening_job
+        
+        Returns:
+            The job status, plus "result" (the pipeline result) once the job
+            has succeeded or failed
+        """
+        job = JOB_MANAGER.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.snapshot(include_result=True)
+
+
+    @mcp.tool()
+    def cancel_job(job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a background job. A queued job never starts; a running one stops
+        at its next page, invite or stage boundary (a journaled pipeline can be
+        resumed by starting it again).
+        
+        Args:
+            job_id: ID returned by start_screening_job
+        
+        Returns:
+            The job status with cancel_requested set
+        """
+        job = JOB_MANAGER.cancel(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.snapshot()
+
+
+    @mcp.tool()
+    def list_jobs() -> Dict[str, Any]:
+        """
+        List background jobs, oldest first (finished ones are kept up to JOB_HISTORY).
+        
+        Returns:
+            Dictionary with the status of every known job
+        """
+        return {"jobs": [job.snapshot() for job in JOB_MANAGER.list()]}
+
+
+    @off_loop(mcp.tool())
+    def run_screening_funnels(
+        config_path: Optional[str] = None,
+        funnels: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Screen many Test A -> Test B funnels concurrently in one run.
+        
+        Funnels share one invite rate and concurrency budget, each test is
+        fetched once however many funnels use it, and a candidate is never
+        invited twice to the same Test B.
+        
+        Args:
+            config_path: Funnel config JSON file (default: FUNNEL_CONFIG_PATH);
+                ignored when `funnels` is given
+            funnels: List of funnels, each with test_a_id, test_b_id and optional
+                name, test_a_pass_score and test_b_pass_score
+        
+        Returns:
+            Consolidated report with one entry per funnel and overall totals
+        """
+        try:
+            config = {"funnels": funnels} if funnels else load_funnels(config_path)
+            
+            if USE_MOCK_DATA:
+                # In mock mode, invites always succeed and, like the other mock
+                # paths, fake calls are not paced (rate 0 = unlimited)
+                report = run_funnels(
+                    {**config, "invite_rate_per_sec": 0},
+                    fetch=fetch_candidates,
+                    invite=lambda test_id, c: SimpleNamespace(status_code=201)
+                )
+                report["mock_data"] = True
+                return report
+            
+            report = run_funnels(config, fetch=fetch_candidates)
+            for funnel in report["funnels"]:
+                invalidate_candidates(funnel["test_b_id"])
+            report["mock_data"] = False
+            return report
+        except Exception as e:
+            return {"error": str(e)}
+
+
+    @off_loop(mcp.tool())
     def list_all_tests() -> Dict[str, Any]:
         """
         List all available tests in the system.
         
+        In real mode these are the configured tests (LIST_TEST_IDS, else
+        TEST_A_ID and TEST_B_ID), summarised from each test's running score
+        aggregate; tests without one yet are fetched concurrently.
+        
         Returns:
             Dictionary with list of all available tests, including test IDs, names, 
             candidate counts, and descriptions.
@@ -559,16 +1040,13 @@ if MCP_AVAILABLE:
                 for test in tests:
                     candidates = get_mock_candidates(test["id"])
                     test["candidate_count"] = len(candidates)
-                    # Calculate average score
-                    if candidates:
-                        scores = [new_agent.extract_score(c) for c in candidates]
-                        test["average_score"] = round(sum(scores) / len(scores), 2)
-                        test["min_score"] = min(scores)
-                        test["max_score"] = max(scores)
-                    else:
-                        test["average_score"] = None
-                        test["min_score"] = None
-                        test["max_score"] = None
+                    # Calculate score statistics in one pass over the score column
+                    summary = new_agent.score_column(candidates).summary()
+                    test["average_score"] = summary["mean"]
+                    test["min_score"] = summary["min"]
+                    test["max_score"] = summary["max"]
+                    test["score_percentiles"] = summary["percentiles"]
+                    test["score_histogram"] = summary["histogram"]
                 
                 return {
                     "total_tests": len(tests),
@@ -579,43 +1057,47 @@ if MCP_AVAILABLE:
                 # Try to get tests from API
                 # Note: This requires HackerRank API endpoint for listing tests
                 # For now, return configured tests from environment
-                test_a_id = int(os.getenv("TEST_A_ID", "0")) or 356098
-                test_b_id = int(os.getenv("TEST_B_ID", "0")) or 2263157
-                
-                session = new_agent.make_session()
-                tests = []
+                test_ids = configured_test_ids()
+                session = new_agent.get_shared_session()
                 
-                # Try to get candidate counts for each test
-                for test_id in [test_a_id, test_b_id]:
+                def describe(test_id):
                     try:
-                        candidates = new_agent.get_all_candidates(session, test_id)
-                        test_info = {
-                            "id": test_id,
-                            "name": f"Test {test_id}",
-                            "type": "configured",
-                            "candidate_count": len(candidates),
-                            "description": f"HackerRank test {test_id}"
-                        }
-                        
-                        # Calculate statistics if candidates exist
-                        if candidates:
-                            scores = [new_agent.extract_score(c) for c in candidates if new_agent.extract_score(c) > 0]
-                            if scores:
-                                test_info["average_score"] = round(sum(scores) / len(scores), 2)
-                                test_info["min_score"] = min(scores)
-                                test_info["max_score"] = max(scores)
-                        
-                        tests.append(test_info)
+                        aggregate, source = score_aggregate_for_test(test_id, session)
                     except Exception:
                         # If we can't fetch, just add basic info
-                        tests.append({
+                        return {
                             "id": test_id,
                             "name": f"Test {test_id}",
                             "type": "configured",
                             "candidate_count": None,
                             "description": f"HackerRank test {test_id}",
                             "note": "Unable to fetch candidate data"
-                        })
+                        }
+                    test_info = {
+                        "id": test_id,
+                        "name": f"Test {test_id}",
+                        "type": "configured",
+                        "candidate_count": aggregate.attempts,
+                        "description": f"HackerRank test {test_id}",
+                        "stats_source": source
+                    }
+                    
+                    # Statistics over attempts that have a score, read from the
+                    # running aggregate (percentiles come from its sketch)
+                    summary = aggregate.summary()
+                    if summary["count"]:
+                        test_info["average_score"] = summary["mean"]
+                        test_info["min_score"] = summary["min"]
+                        test_info["max_score"] = summary["max"]
+                        test_info["score_percentiles"] = summary["percentiles"]
+                        test_info["score_histogram"] = summary["histogram"]
+                    return test_info
+                
+                # Tests are fetched concurrently, so the call takes about as
+                # long as the slowest test rather than the sum of all of them
+                workers = max(1, min(len(test_ids), TEST_STATS_WORKERS))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="test-stats") as executor:
+                    tests = list(executor.map(describe, test_ids))
                 
                 return {
                     "total_tests": len(tests),
@@ -626,7 +1108,7 @@ if MCP_AVAILABLE:
             return {"error": str(e)}
 
 
-    @mcp.tool()
+    @off_loop(mcp.tool())
     def send_email_to_candidates(
         candidates: List[Dict[str, Any]],
         email_subject: str = "Congratulations! Next Steps in Your Application",
@@ -668,6 +1150,10 @@ The Hiring Team"""
             
             template = email_template or default_template
             
+            # With SMTP configured, real-mode emails are sent in bulk after the loop
+            deliver = not USE_MOCK_DATA and email_delivery.smtp_configured()
+            outgoing = []
+            
             for candidate in candidates:
                 email = candidate.get("email")
                 name = candidate.get("name") or candidate.get("full_name") or "Candidate"
@@ -681,45 +1167,28 @@ The Hiring Team"""
                     continue
                 
                 try:
+                    email_body = template.format(name=name, score=score)
                     if USE_MOCK_DATA:
                         # In mock mode, just log the email
-                        email_body = template.format(name=name, score=score)
                         logger.info(f"[MOCK EMAIL] To: {email}")
                         logger.info(f"[MOCK EMAIL] Subject: {email_subject}")
                         logger.info(f"[MOCK EMAIL] Body preview: {email_body[:100]}...")
-                        results["successful"].append({
-                            "email": email,
-                            "name": name,
-                            "score": score
-                        })
-                        results["emails_sent"] += 1
+                    elif deliver:
+                        outgoing.append(({"email": email, "name": name, "score": score},
+                                         email_delivery.build_message(email, email_subject, email_body)))
+                        continue
                     else:
-                        # In real mode, send actual email
-                        # TODO: Integrate with your email service (SMTP, SendGrid, etc.)
-                        # For now, we'll use the same logging approach
-                        email_body = template.format(name=name, score=score)
+                        # SMTP_HOST is not set: log the email instead of sending it
                         logger.info(f"[EMAIL] Sending to: {email}")
                         logger.info(f"[EMAIL] Subject: {email_subject}")
                         logger.info(f"[EMAIL] Body: {email_body}")
-                        
-                        # Placeholder for actual email sending
-                        # Example with SMTP:
-                        # import smtplib
-                        # from email.mime.text import MIMEText
-                        # msg = MIMEText(email_body)
-                        # msg['Subject'] = email_subject
-                        # msg['From'] = os.getenv('EMAIL_FROM')
-                        # msg['To'] = email
-                        # server = smtplib.SMTP(os.getenv('SMTP_SERVER'), os.getenv('SMTP_PORT'))
-                        # server.send_message(msg)
-                        # server.quit()
-                        
-                        results["successful"].append({
-                            "email": email,
-                            "name": name,
-                            "score": score
-                        })
-                        results["emails_sent"] += 1
+                    
+                    results["successful"].append({
+                        "email": email,
+                        "name": name,
+                        "score": score
+                    })
+                    results["emails_sent"] += 1
                         
                 except Exception as e:
                     results["failed"].append({
@@ -728,12 +1197,23 @@ The Hiring Team"""
                         "error": str(e)
                     })
             
+            if outgoing:
+                sent = email_delivery.send_bulk(
+                    email_delivery.get_smtp_pool(), [message for _, message in outgoing]
+                )
+                for (entry, _), result in zip(outgoing, sent):
+                    if result["status"] == "sent":
+                        results["successful"].append(entry)
+                        results["emails_sent"] += 1
+                    else:
+                        results["failed"].append({**entry, "error": result["error"]})
+            
             return results
         except Exception as e:
             return {"error": str(e)}
 
 
-    @mcp.tool()
+    @off_loop(mcp.tool())
     def send_google_meet_invites_to_top_candidates(
         candidates: List[Dict[str, Any]],
         top_n: int = 3,
@@ -773,13 +1253,8 @@ The Hiring Team"""
             if not candidates:
                 return results
             
-            # Sort candidates by score (descending) and get top N
-            sorted_candidates = sorted(
-                candidates,
-                key=lambda c: c.get("score") or new_agent.extract_score(c) or 0,
-                reverse=True
-            )
-            top_candidates = sorted_candidates[:top_n]
+            # Heap-select the top N (score, then Test A score, then completion time)
+            top_candidates = top_candidates_engine.top_n(candidates, top_n)
             
             # Set default meeting date if not provided (7 days from now)
             if not meeting_date:
@@ -796,6 +1271,31 @@ The Hiring Team"""
             if not meeting_description:
                 meeting_description = f"Technical interview with {meeting_title}. Looking forward to discussing your assessment results!"
             
+            def invite_entry(email, name, score, event_id, calendar_link, meet_link, invite_sent=True):
+                return {
+                    "email": email,
+                    "name": name,
+                    "score": score,
+                    "event_id": event_id,
+                    "calendar_link": calendar_link,
+                    "meet_link": meet_link,
+                    "meeting_title": meeting_title,
+                    "meeting_date": start_time_str,
+                    "meeting_end": end_time_str,
+                    "duration_minutes": meeting_duration_minutes,
+                    "description": meeting_description,
+                    "invite_sent": invite_sent
+                }
+            
+            def placeholder_link(email, prefix):
+                import hashlib
+                import uuid
+                link_hash = hashlib.md5(f"{email}{meeting_date}".encode()).hexdigest()[:12]
+                return f"https://meet.google.com/{prefix}-{link_hash}", str(uuid.uuid4())[:8]
+            
+            # In real mode, events are collected and inserted in batches after the loop
+            pending = []
+            
             for candidate in top_candidates:
                 email = candidate.get("email")
                 name = candidate.get("name") or candidate.get("full_name") or "Candidate"
@@ -808,198 +1308,95 @@ The Hiring Team"""
                     })
                     continue
                 
+                if USE_MOCK_DATA:
+                    # In mock mode, generate mock calendar event details
+                    mock_meet_link, mock_event_id = placeholder_link(email, "mock")
+                    
+                    logger.info(f"[MOCK CALENDAR INVITE] To: {email}")
+                    logger.info(f"[MOCK CALENDAR INVITE] Title: {meeting_title}")
+                    logger.info(f"[MOCK CALENDAR INVITE] Date: {start_time_str} - {end_time_str}")
+                    logger.info(f"[MOCK CALENDAR INVITE] Event ID: {mock_event_id}")
+                    logger.info(f"[MOCK CALENDAR INVITE] Meet Link: {mock_meet_link}")
+                    logger.info(f"[MOCK CALENDAR INVITE] Description: {meeting_description}")
+                    
+                    results["successful"].append(invite_entry(
+                        email, name, score, mock_event_id,
+                        f"https://calendar.google.com/event?eid={mock_event_id}", mock_meet_link
+                    ))
+                    results["invites_sent"] += 1
+                else:
+                    pending.append((email, name, score))
+            
+            if pending:
+                # In real mode, create actual Google Calendar events with Meet links
                 try:
-                    if USE_MOCK_DATA:
-                        # In mock mode, generate mock calendar event details
-                        import hashlib
-                        import uuid
-                        link_hash = hashlib.md5(f"{email}{meeting_date}".encode()).hexdigest()[:12]
-                        mock_meet_link = f"https://meet.google.com/mock-{link_hash}"
-                        mock_event_id = str(uuid.uuid4())[:8]
+                    client = calendar_client.get_calendar_client()
+                except ImportError:
+                    # Google Calendar API libraries not installed
+                    logger.warning(
+                        "Google Calendar API libraries not installed. "
+                        "Install with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client"
+                    )
+                    # Fallback to mock behavior
+                    for email, name, score in pending:
+                        fallback_link, mock_event_id = placeholder_link(email, "real")
                         
-                        logger.info(f"[MOCK CALENDAR INVITE] To: {email}")
-                        logger.info(f"[MOCK CALENDAR INVITE] Title: {meeting_title}")
-                        logger.info(f"[MOCK CALENDAR INVITE] Date: {start_time_str} - {end_time_str}")
-                        logger.info(f"[MOCK CALENDAR INVITE] Event ID: {mock_event_id}")
-                        logger.info(f"[MOCK CALENDAR INVITE] Meet Link: {mock_meet_link}")
-                        logger.info(f"[MOCK CALENDAR INVITE] Description: {meeting_description}")
+                        logger.info(f"[CALENDAR INVITE] (Fallback) Creating invite for: {email}")
+                        logger.info(f"[CALENDAR INVITE] (Fallback) Event ID: {mock_event_id}")
+                        logger.info(f"[CALENDAR INVITE] (Fallback) Meet Link: {fallback_link}")
                         
-                        results["successful"].append({
-                            "email": email,
-                            "name": name,
-                            "score": score,
-                            "event_id": mock_event_id,
-                            "calendar_link": f"https://calendar.google.com/event?eid={mock_event_id}",
-                            "meet_link": mock_meet_link,
-                            "meeting_title": meeting_title,
-                            "meeting_date": start_time_str,
-                            "meeting_end": end_time_str,
-                            "duration_minutes": meeting_duration_minutes,
-                            "description": meeting_description,
-                            "invite_sent": True
-                        })
+                        entry = invite_entry(
+                            email, name, score, mock_event_id,
+                            f"https://calendar.google.com/event?eid={mock_event_id}", fallback_link,
+                            invite_sent=False
+                        )
+                        entry["note"] = "Google Calendar API not configured - using fallback"
+                        results["successful"].append(entry)
                         results["invites_sent"] += 1
-                    else:
-                        # In real mode, create actual Google Calendar event with Meet link
-                        try:
-                            from google.oauth2.credentials import Credentials
-                            from google_auth_oauthlib.flow import InstalledAppFlow
-                            from google.auth.transport.requests import Request
-                            from googleapiclient.discovery import build
-                            import pickle
-                            import os.path
-                            
-                            # Google Calendar API scopes
-                            SCOPES = ['https://www.googleapis.com/auth/calendar']
-                            
-                            # Get calendar service
-                            creds = None
-                            token_path = os.getenv('GOOGLE_CALENDAR_TOKEN_PATH', 'token.pickle')
-                            credentials_path = os.getenv('GOOGLE_CALENDAR_CREDENTIALS_PATH', 'credentials.json')
-                            
-                            # Load existing token or get new one
-                            if os.path.exists(token_path):
-                                with open(token_path, 'rb') as token:
-                                    creds = pickle.load(token)
-                            
-                            # If there are no (valid) credentials available, let the user log in
-                            if not creds or not creds.valid:
-                                if creds and creds.expired and creds.refresh_token:
-                                    creds.refresh(Request())
-                                else:
-                                    if not os.path.exists(credentials_path):
-                                        raise FileNotFoundError(
-                                            f"Google Calendar credentials not found at {credentials_path}. "
-                                            "Please set up Google Calendar API credentials. See documentation."
-                                        )
-                                    flow = InstalledAppFlow.from_client_secrets_file(
-                                        credentials_path, SCOPES)
-                                    creds = flow.run_local_server(port=0)
-                                
-                                # Save the credentials for the next run
-                                with open(token_path, 'wb') as token:
-                                    pickle.dump(creds, token)
-                            
-                            # Build calendar service
-                            service = build('calendar', 'v3', credentials=creds)
-                            
-                            # Create calendar event with Google Meet
-                            event = {
-                                'summary': meeting_title,
-                                'description': meeting_description,
-                                'start': {
-                                    'dateTime': start_time_str,
-                                    'timeZone': os.getenv('GOOGLE_CALENDAR_TIMEZONE', 'UTC'),
-                                },
-                                'end': {
-                                    'dateTime': end_time_str,
-                                    'timeZone': os.getenv('GOOGLE_CALENDAR_TIMEZONE', 'UTC'),
-                                },
-                                'attendees': [
-                                    {'email': email, 'displayName': name}
-                                ],
-                                'conferenceData': {
-                                    'createRequest': {
-                                        'requestId': f'meet-{email}-{int(datetime.datetime.now().timestamp())}',
-                                        'conferenceSolutionKey': {'type': 'hangoutsMeet'}
-                                    }
-                                },
-                                'reminders': {
-                                    'useDefault': False,
-                                    'overrides': [
-                                        {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                                        {'method': 'popup', 'minutes': 15},  # 15 minutes before
-                                    ],
-                                },
-                            }
-                            
-                            # Insert event with conference data
-                            created_event = service.events().insert(
-                                calendarId='primary',
-                                body=event,
-                                conferenceDataVersion=1,
-                                sendUpdates='all'  # Send calendar invites to attendees
-                            ).execute()
-                            
-                            # Extract Meet link from event
-                            meet_link = None
-                            if 'conferenceData' in created_event:
-                                entry_points = created_event['conferenceData'].get('entryPoints', [])
-                                if entry_points:
-                                    meet_link = entry_points[0].get('uri')
-                            
-                            event_id = created_event.get('id')
-                            html_link = created_event.get('htmlLink')
-                            
-                            logger.info(f"[CALENDAR INVITE] Created event for: {email}")
-                            logger.info(f"[CALENDAR INVITE] Event ID: {event_id}")
-                            logger.info(f"[CALENDAR INVITE] Meet Link: {meet_link}")
-                            logger.info(f"[CALENDAR INVITE] Calendar Link: {html_link}")
-                            
-                            results["successful"].append({
-                                "email": email,
-                                "name": name,
-                                "score": score,
-                                "event_id": event_id,
-                                "calendar_link": html_link,
-                                "meet_link": meet_link,
-                                "meeting_title": meeting_title,
-                                "meeting_date": start_time_str,
-                                "meeting_end": end_time_str,
-                                "duration_minutes": meeting_duration_minutes,
-                                "description": meeting_description,
-                                "invite_sent": True
-                            })
-                            results["invites_sent"] += 1
-                            
-                        except ImportError:
-                            # Google Calendar API libraries not installed
-                            logger.warning(
-                                "Google Calendar API libraries not installed. "
-                                "Install with: pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client"
-                            )
-                            # Fallback to mock behavior
-                            import hashlib
-                            import uuid
-                            link_hash = hashlib.md5(f"{email}{meeting_date}".encode()).hexdigest()[:12]
-                            meet_link = f"https://meet.google.com/real-{link_hash}"
-                            mock_event_id = str(uuid.uuid4())[:8]
-                            
-                            logger.info(f"[CALENDAR INVITE] (Fallback) Creating invite for: {email}")
-                            logger.info(f"[CALENDAR INVITE] (Fallback) Event ID: {mock_event_id}")
-                            logger.info(f"[CALENDAR INVITE] (Fallback) Meet Link: {meet_link}")
-                            
-                            results["successful"].append({
-                                "email": email,
-                                "name": name,
-                                "score": score,
-                                "event_id": mock_event_id,
-                                "calendar_link": f"https://calendar.google.com/event?eid={mock_event_id}",
-                                "meet_link": meet_link,
-                                "meeting_title": meeting_title,
-                                "meeting_date": start_time_str,
-                                "meeting_end": end_time_str,
-                                "duration_minutes": meeting_duration_minutes,
-                                "description": meeting_description,
-                                "invite_sent": False,
-                                "note": "Google Calendar API not configured - using fallback"
-                            })
-                            results["invites_sent"] += 1
-                        
+                    return results
                 except Exception as e:
-                    results["failed"].append({
-                        "email": email,
-                        "name": name,
-                        "error": str(e)
-                    })
+                    for email, name, score in pending:
+                        results["failed"].append({"email": email, "name": name, "error": str(e)})
+                    return results
+                
+                timestamp = int(datetime.datetime.now().timestamp())
+                events = [
+                    calendar_client.build_meet_event(
+                        meeting_title, meeting_description, start_time_str, end_time_str,
+                        email, name, request_id=f"meet-{email}-{timestamp}"
+                    )
+                    for email, name, _ in pending
+                ]
+                
+                for (email, name, score), (created_event, error) in zip(pending, client.insert_events(events)):
+                    if error is not None:
+                        results["failed"].append({"email": email, "name": name, "error": str(error)})
+                        continue
+                    
+                    meet_link = calendar_client.meet_link(created_event)
+                    event_id = created_event.get("id")
+                    html_link = created_event.get("htmlLink")
+                    
+                    logger.info(f"[CALENDAR INVITE] Created event for: {email}")
+                    logger.info(f"[CALENDAR INVITE] Event ID: {event_id}")
+                    logger.info(f"[CALENDAR INVITE] Meet Link: {meet_link}")
+                    logger.info(f"[CALENDAR INVITE] Calendar Link: {html_link}")
+                    
+                    results["successful"].append(invite_entry(email, name, score, event_id, html_link, meet_link))
+                    results["invites_sent"] += 1
             
             return results
         except Exception as e:
             return {"error": str(e)}
 
 
-    @mcp.tool()
-    def get_candidate_scores(test_id: int, email: Optional[str] = None) -> Dict[str, Any]:
+    @off_loop(mcp.tool(), prefetch=prefetch_scores)
+    def get_candidate_scores(
+        test_id: int,
+        email: Optional[str] = None,
+        thresholds: Optional[List[float]] = None,
+        include_candidates: bool = True
+    ) -> Dict[str, Any]:
         """
         Get candidate scores for a test. If email is provided, returns that candidate's score.
         Otherwise returns all candidate scores.
@@ -1007,60 +1404,159 @@ The Hiring Team"""
         Args:
             test_id: The HackerRank test ID
             email: Optional candidate email to filter by
+            thresholds: Optional passing scores to report pass counts for
+            include_candidates: Set to false (without email) for statistics only,
+                answered from the test's running score aggregate without
+                reading its candidates
         
         Returns:
-            Dictionary with candidate score information
+            Dictionary with candidate score information and score statistics:
+            "score_summary" over every attempt listed (unscored ones count as
+            0), or, for statistics only, "scored_summary" over the attempts
+            with a score above 0, with approximate percentiles
         """
         try:
-            if USE_MOCK_DATA:
-                all_candidates = get_mock_candidates(test_id)
-            else:
-                session = new_agent.make_session()
-                all_candidates = new_agent.get_all_candidates(session, test_id)
+            if not include_candidates and not email:
+                aggregate, source = score_aggregate_for_test(test_id)
+                result = {
+                    "test_id": test_id,
+                    "total_candidates": aggregate.attempts,
+                    "scored_count": aggregate.scored,
+                    "scored_summary": aggregate.summary(),
+                    "stats_source": source,
+                    "mock_data": USE_MOCK_DATA
+                }
+                if thresholds:
+                    result["pass_counts"] = {
+                        str(t): aggregate.count_at_least(t) for t in thresholds
+                    }
+                return result
+            
+            all_candidates = fetch_candidates(test_id)
             
             if email:
                 candidates = [c for c in all_candidates if c.get("email") == email]
             else:
                 candidates = all_candidates
             
+            column = new_agent.score_column(candidates)
             scores = [
                 {
                     "email": c.get("email"),
                     "name": c.get("full_name") or c.get("name"),
-                    "score": new_agent.extract_score(c),
+                    "score": score,
                     "percentage_score": c.get("percentage_score"),
                     "status": c.get("status")
                 }
-                for c in candidates
+                for c, score in zip(candidates, map(scoring.as_number, column.values))
             ]
             
-            return {
+            result = {
                 "test_id": test_id,
                 "total_candidates": len(all_candidates),
                 "filtered_count": len(candidates),
                 "candidates": scores,
+                "score_summary": column.summary(),
+                "mock_data": USE_MOCK_DATA
+            }
+            if thresholds:
+                result["pass_counts"] = {
+                    str(t): count for t, count in column.sweep(thresholds).items()
+                }
+            return result
+        except Exception as e:
+            return {"error": str(e)}
+
+
+    @off_loop(mcp.tool(), prefetch=lambda test_ids, **_: prefetch_candidates(*test_ids))
+    def get_top_candidates(
+        test_ids: List[int],
+        top_n: int = 10,
+        combine: str = "mean"
+    ) -> Dict[str, Any]:
+        """
+        Get the top N candidates of one test, or across several tests joined by email.
+
+        Candidates rank by score, then Test A score (the first test), then
+        earliest completion time.
+
+        Args:
+            test_ids: One or more HackerRank test IDs; the first is Test A
+            top_n: Number of candidates to return (default: 10)
+            combine: How scores from several tests are combined per candidate:
+                "mean" of the tests taken, "max", or "sum" (default: "mean")
+
+        Returns:
+            Dictionary with the ranked candidates, best first
+        """
+        try:
+            if not test_ids:
+                return {"error": "At least one test ID is required"}
+
+            if len(test_ids) == 1:
+                ranked = [
+                    {
+                        "email": c.get("email"),
+                        "name": c.get("full_name") or c.get("name"),
+                        "score": new_agent.extract_score(c),
+                        "completed_at": c.get("completed_at")
+                    }
+                    for c in top_candidates_engine.top_n(fetch_candidates(test_ids[0]), top_n)
+                ]
+            else:
+                tests = {test_id: fetch_candidates(test_id) for test_id in test_ids}
+                ranked = [
+                    {**entry, "scores": {str(t): s for t, s in entry["scores"].items()}}
+                    for entry in top_candidates_engine.top_across_tests(tests, top_n, combine)
+                ]
+
+            return {
+                "test_ids": test_ids,
+                "top_n": top_n,
+                "combine": combine if len(test_ids) > 1 else None,
+                "candidates": [{"rank": i, **entry} for i, entry in enumerate(ranked, 1)],
                 "mock_data": USE_MOCK_DATA
             }
         except Exception as e:
             return {"error": str(e)}
 
 
+    @mcp.tool()
+    def get_cache_stats() -> Dict[str, Any]:
+        """
+        Get statistics for the in-memory candidate cache.
+        
+        Returns:
+            Dictionary with cache size, hits, misses, hit rate, evictions and
+            invalidations, plus how many cache misses shared an in-flight download
+        """
+        return {**CANDIDATE_CACHE.stats(), "coalesced_fetches": CANDIDATE_FETCHES.stats()}
+
+
+    @mcp.tool()
+    def get_api_health() -> Dict[str, Any]:
+        """
+        Get the HackerRank API circuit breaker state and per-endpoint call metrics.
+        
+        Returns:
+            Dictionary with circuit state and, per endpoint, request, retry,
+            failure and short-circuit counts plus response status counts
+        """
+        return resilience.api_health()
+
+
     # ===========================================================
     # MCP RESOURCES - Expose data as readable resources
     # ===========================================================
 
-    @mcp.resource("hackerrank://test/{test_id}/candidates")
+    @off_loop(mcp.resource("hackerrank://test/{test_id}/candidates"))
     def get_test_candidates_resource(test_id: str) -> str:
         """
         Resource endpoint to get candidates for a test.
         Access via: hackerrank://test/{test_id}/candidates
         """
         try:
-            if USE_MOCK_DATA:
-                candidates = get_mock_candidates(int(test_id))
-            else:
-                session = new_agent.make_session()
-                candidates = new_agent.get_all_candidates(session, int(test_id))
+            candidates = fetch_candidates(int(test_id))
             
             result = {
                 "test_id": int(test_id),
@@ -1110,6 +1606,9 @@ The Hiring Team"""
             test_id: The test ID to analyze
             passing_score: The passing score threshold
         """
+        current = describe_aggregate(test_id, [passing_score])
+        if current:
+            current = f"\n\nCurrent statistics: {current}"
         return f"""Analyze the results for HackerRank test {test_id} with a passing score of {passing_score}.
 
 Please:
@@ -1117,7 +1616,10 @@ Please:
 2. Identify how many passed vs failed
 3. Calculate the pass rate
 4. Identify any patterns in the scores
-5. Provide recommendations for next steps"""
+5. Provide recommendations for next steps
+
+For counts and score statistics alone, call get_candidate_scores with
+include_candidates=false; it answers from running aggregates.{current}"""
 
 
     @mcp.prompt()
@@ -1129,6 +1631,12 @@ Please:
             test_a_id: Initial test ID
             test_b_id: Advanced test ID
         """
+        current = "\n".join(filter(None, (
+            describe_aggregate(test_a_id, [new_agent.TEST_A_PASS_SCORE]),
+            describe_aggregate(test_b_id, [new_agent.TEST_B_PASS_SCORE])
+        )))
+        if current:
+            current = f"\n\nCurrent statistics:\n{current}"
         return f"""Create a summary for recruiters about candidates who passed both tests.
 
 Test A (Initial): {test_a_id}
@@ -1139,7 +1647,7 @@ Please:
 2. Get candidates who passed Test B
 3. Identify candidates who passed both
 4. Create a summary with candidate names, emails, and scores
-5. Format it for easy use by recruiters"""
+5. Format it for easy use by recruiters{current}"""
 
 
     # ===========================================================
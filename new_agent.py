@@ -1,8 +1,19 @@
 import requests
-import time
 import logging
 import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import resilience
+from invite_engine import iter_bulk_invite
+from resilience import HackerRankAPIError
+from scoring import ScoreColumn
+from pipeline_journal import PIPELINE_JOURNAL_PATH, open_journal
 
 # ===========================================================
 # LOGGING CONFIGURATION
@@ -38,24 +49,146 @@ TEST_B_PASS_SCORE = int(os.getenv("TEST_B_PASS_SCORE", "80"))
 
 LIMIT = 50  # candidates per API page
 
+# Concurrent page fetches in get_all_candidates (1 = serial)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "1"))
+
+# Connection pool: max concurrent connections to HackerRank per session and
+# transport-level retries of connection errors on GETs (retries on HTTP
+# statuses and the circuit breaker live in resilience.send)
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+# Pages run_pipeline fetches ahead on a background thread while earlier
+# pages are being filtered and invited (0 = fetch only when needed)
+PIPELINE_PREFETCH_PAGES = int(os.getenv("PIPELINE_PREFETCH_PAGES", "4"))
+
+# Project candidates into compact CandidateRecord objects at parse time
+COMPACT_CANDIDATES = os.getenv("COMPACT_CANDIDATES", "false").lower() == "true"
+
+
+# ===========================================================
+# CANDIDATE RECORDS
+# ===========================================================
+
+class CandidateRecord:
+    """Compact candidate holding only the fields the pipeline uses.
+
+    Raw API candidates carry every attempt field; a slotted record keeps
+    just these, with no per-object __dict__. It supports the dict read API
+    (`get`, `[]`, `in`) so extract_score, filter_passed and the MCP tools
+    accept it in place of the raw dict.
+    """
+
+    FIELDS = ("id", "email", "full_name", "name", "percentage_score", "score",
+              "status", "completed_at")
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.FIELDS})
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def keys(self):
+        return [field for field in self.FIELDS if getattr(self, field) is not None]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, CandidateRecord):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CandidateRecord({self.to_dict()!r})"
+
+
+def compact_candidates(candidates):
+    """Project raw candidate dicts into CandidateRecord objects."""
+    return [CandidateRecord.from_dict(c) for c in candidates]
+
 
 # ===========================================================
 # AUTH SESSION
 # ===========================================================
 
-def make_session():
-    session = requests.Session()
-    session.headers.update({
+def auth_headers():
+    """Headers every HackerRank request carries (sync session and async client)."""
+    return {
         "Authorization": f"Bearer {ACCESS_TOKEN}",
         "X-Auth-Token": API_TOKEN,
         "x-jwt-token": JWT_ACCESS_TOKEN,
         "x-refresh-token": JWT_REFRESH_TOKEN,
         "Accept": "application/json",
         "Content-Type": "application/json",
-    })
+    }
+
+
+def make_session(pool_maxsize=None, max_retries=None):
+    pool_maxsize = pool_maxsize or HTTP_POOL_MAXSIZE
+    max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+
+    session = requests.Session()
+    session.headers.update(auth_headers())
+
+    # Keep-alive pool sized for concurrent fetches; pool_block caps the
+    # number of open connections instead of opening overflow ones.
+    retries = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_maxsize,
+        max_retries=retries,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     return session
 
 
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """Long-lived pooled session reused across calls in this process."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = make_session()
+        return _shared_session
+
+
+def reset_shared_session():
+    """Close the shared session; the next get_shared_session() builds a new one."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+        _shared_session = None
+
+
 # ===========================================================
 # API HELPERS
 # ===========================================================
@@ -65,31 +198,184 @@ def get_candidates_page(session, test_id, offset=0):
     url = f"{BASE_URL}/tests/{test_id}/candidates"
     params = {"offset": offset, "limit": LIMIT}
 
-    res = session.get(url, params=params)
+    res = resilience.send(session, "get", "GET /tests/{id}/candidates", url, params=params)
     if res.status_code != 200:
         logger.error(f"Failed to fetch candidates page: {res.status_code} - {res.text}")
-        raise Exception(f"Failed: {res.text}")
+        raise HackerRankAPIError(f"Failed: {res.text}", res.status_code, "GET /tests/{id}/candidates")
 
     return res.json()
 
 
-def get_all_candidates(session, test_id):
-    """Fetch all pages of full candidate objects."""
-    all_candidates = []
-    offset = 0
+def get_all_candidates(session, test_id, max_workers=None, compact=None, on_page=None):
+    """Fetch all pages of full candidate objects.
+
+    With max_workers > 1 (default: FETCH_WORKERS) the remaining pages are
+    fetched on a thread pool; the result is identical to the serial walk.
+    With compact=True (default: COMPACT_CANDIDATES) each page is projected
+    into CandidateRecord objects as it is parsed. `on_page(batch)`, when
+    given, is called with each page's candidates as it is consumed.
+    """
+    if max_workers is None:
+        max_workers = FETCH_WORKERS
+    if compact is None:
+        compact = COMPACT_CANDIDATES
+
+    if max_workers > 1:
+        return get_all_candidates_parallel(session, test_id, max_workers, compact, on_page)
+
+    return list(iter_candidates(session, test_id, compact, on_page))
+
+
+def iter_candidate_pages(session, test_id, start_offset=0):
+    """Yield (offset, batch) for each page, fetching the next page only when asked."""
+    offset = start_offset
 
     while True:
         data = get_candidates_page(session, test_id, offset)
-        batch = data.get("data", [])
-
-        all_candidates.extend(batch)
+        yield offset, data.get("data", [])
 
         if not data.get("next"):
             break
 
         offset += LIMIT
 
-    return all_candidates
+
+def iter_candidates(session, test_id, compact=False, on_page=None):
+    """Stream full candidate objects page by page.
+
+    Only one page is held at a time, so callers can filter and invite as
+    soon as the first page arrives with flat memory use. With compact=True
+    candidates are yielded as CandidateRecord objects.
+    """
+    for _, batch in iter_candidate_pages(session, test_id):
+        if compact:
+            batch = compact_candidates(batch)
+        if on_page is not None:
+            on_page(batch)
+        yield from batch
+
+
+class Prefetcher:
+    """Iterate `iterable` on a background thread through a bounded queue.
+
+    The producer thread keeps fetching up to `depth` items ahead while the
+    consumer works on earlier ones, so network waits on both sides overlap.
+    Fetching starts as soon as the Prefetcher is created. An exception in
+    the producer is re-raised to the consumer at the point it occurred;
+    close() stops the producer early.
+    """
+
+    _DONE = object()
+
+    def __init__(self, iterable, depth=None):
+        depth = PIPELINE_PREFETCH_PAGES if depth is None else depth
+        self.depth = depth
+        self.stopped = threading.Event()
+        if depth <= 0:
+            self.source = iter(iterable)
+            return
+        self.source = None
+        self.buffer = queue.Queue(maxsize=depth)
+        self.thread = threading.Thread(target=self._produce, args=(iterable,),
+                                       name="prefetch", daemon=True)
+        self.thread.start()
+
+    def _put(self, entry):
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put((None, item)):
+                    return
+        except BaseException as e:
+            self._put((e, None))
+            return
+        self._put((None, self._DONE))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.source is not None:
+            return next(self.source)
+        if self.stopped.is_set():
+            raise StopIteration
+        error, item = self.buffer.get()
+        if error is not None:
+            self.stopped.set()
+            raise error
+        if item is self._DONE:
+            self.stopped.set()
+            raise StopIteration
+        return item
+
+    def close(self):
+        self.stopped.set()
+
+
+def get_all_candidates_parallel(session, test_id, max_workers, compact=False, on_page=None):
+    """Fetch all pages concurrently, keeping pages in offset order.
+
+    The first page is fetched on its own. If it reports a `total`, every
+    remaining offset is requested at once on a bounded pool; otherwise
+    pages are probed ahead in windows of `max_workers`. Pages are consumed
+    in order and the walk stops at the first page without `next`, exactly
+    like the serial loop.
+    """
+    project = compact_candidates if compact else list
+
+    def add(batch):
+        if on_page is not None:
+            on_page(batch)
+        all_candidates.extend(batch)
+
+    first = get_candidates_page(session, test_id, 0)
+    all_candidates = []
+    add(project(first.get("data", [])))
+
+    if not first.get("next"):
+        return all_candidates
+
+    total = first.get("total")
+
+    def fetch(offset):
+        return get_candidates_page(session, test_id, offset)
+
+    def consume(offsets):
+        # Returns True once the last page has been reached. Closing the
+        # map iterator cancels any pages queued beyond the end.
+        pages = executor.map(fetch, offsets)
+        try:
+            for data in pages:
+                add(project(data.get("data", [])))
+                if not data.get("next"):
+                    return True
+        finally:
+            pages.close()
+        return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        offset = LIMIT
+
+        if isinstance(total, int) and total > offset:
+            offsets = list(range(offset, total, LIMIT))
+            if consume(offsets):
+                return all_candidates
+            # `total` was stale: new attempts arrived while we were paging
+            offset = offsets[-1] + LIMIT
+
+        while True:
+            offsets = [offset + i * LIMIT for i in range(max_workers)]
+            if consume(offsets):
+                return all_candidates
+            offset = offsets[-1] + LIMIT
 
 
 def extract_score(candidate):
@@ -103,18 +389,28 @@ def extract_score(candidate):
     return 0
 
 
-def filter_passed(candidates, threshold):
-    passed = []
+def iter_passed(candidates, threshold):
+    """Streaming filter_passed: yields candidates scoring at least `threshold`."""
     for c in candidates:
-        score = extract_score(c)
-        # status values can be: -1, 1, 2, etc. depending on test state
-        if score >= threshold:
-            passed.append(c)
-    return passed
+        if extract_score(c) >= threshold:
+            yield c
+
+
+def score_column(candidates):
+    """Extract every candidate's score once into a ScoreColumn."""
+    return ScoreColumn(extract_score(c) for c in candidates)
+
+
+def filter_passed(candidates, threshold):
+    # status values can be: -1, 1, 2, etc. depending on test state
+    return [c for c in candidates if extract_score(c) >= threshold]
 
 
 def invite_to_test(session, test_id, candidate):
-    """Invite candidate to next test."""
+    """Invite candidate to next test.
+
+    Returns the HTTP response, or None when the candidate has no email.
+    """
     email = candidate.get("email")
     name = candidate.get("full_name") or candidate.get("name") or "Candidate"
 
@@ -130,12 +426,89 @@ def invite_to_test(session, test_id, candidate):
         "send_email": True
     }
 
-    res = session.post(url, json=payload)
+    # Not retried here: a repeated POST could invite twice, and 429s are
+    # paced by the bulk invite engine
+    res = resilience.send(session, "post", "POST /tests/{id}/invites", url,
+                          retry_statuses=(), json=payload)
     if res.status_code not in (200, 201):
         logger.error(f"Failed to invite {email}: {res.text}")
     else:
         logger.info(f"Invited {email} to Test {test_id}")
 
+    return res
+
+
+# ===========================================================
+# CANDIDATE JOINS
+# ===========================================================
+
+def normalize_email(email):
+    """Case- and whitespace-insensitive email key (None if missing)."""
+    if not isinstance(email, str):
+        return None
+    email = email.strip().lower()
+    return email or None
+
+
+def index_by_email(candidates):
+    """Map normalised email -> candidate. The first attempt for an email wins."""
+    index = {}
+    for c in candidates:
+        key = normalize_email(c.get("email"))
+        if key is not None and key not in index:
+            index[key] = c
+    return index
+
+
+def join_by_email(primary, *others):
+    """Join candidates across tests by email.
+
+    Each of `others` is indexed once, so the join is O(|primary| + sum|others|).
+    Returns a list of (candidate, [match_in_each_other_test or None, ...]).
+    """
+    indexes = [index_by_email(other) for other in others]
+    joined = []
+    for c in primary:
+        key = normalize_email(c.get("email"))
+        joined.append((c, [index.get(key) if key else None for index in indexes]))
+    return joined
+
+
+def recruiter_ready(passed_b, candidates_a):
+    """Recruiter-ready entries for Test B passers, joined to their Test A score by email."""
+    ready = []
+    for c, (match_a,) in join_by_email(passed_b, candidates_a):
+        ready.append({
+            "email": c.get("email"),
+            "name": c.get("full_name") or c.get("name"),
+            "score": extract_score(c),
+            "test_a_score": extract_score(match_a) if match_a is not None else None
+        })
+    return ready
+
+
+def roster_emails(candidates):
+    """Normalised emails already on a test's roster (invited or attempted)."""
+    return {key for key in (normalize_email(c.get("email")) for c in candidates) if key}
+
+
+def exclude_roster(candidates, roster, on_skip=None):
+    """Yield candidates whose email is not in `roster` yet.
+
+    Each yielded email is added to `roster`, so repeat attempts by the same
+    candidate are only invited once. Skipped candidates are passed to
+    `on_skip` when given.
+    """
+    for c in candidates:
+        key = normalize_email(c.get("email"))
+        if key in roster:
+            if on_skip is not None:
+                on_skip(c)
+            continue
+        if key:
+            roster.add(key)
+        yield c
+
 
 def send_recruiter_invite(candidate):
     """Your Calendly / email automation goes here."""
@@ -148,33 +521,109 @@ def send_recruiter_invite(candidate):
 # MAIN
 # ===========================================================
 
-def run_pipeline():
-    session = make_session()
-
-    logger.info("Fetching Test A candidates...")
-    candidates_a = get_all_candidates(session, TEST_A_ID)
-    logger.info(f"Test A candidates: {len(candidates_a)}")
+def count_into(counter, key, iterable):
+    """Pass items through unchanged while counting them into counter[key]."""
+    for item in iterable:
+        counter[key] += 1
+        yield item
 
-    logger.info("Filtering passed Test A...")
-    passed_a = filter_passed(candidates_a, TEST_A_PASS_SCORE)
-    logger.info(f"Passed Test A: {len(passed_a)}")
 
-    logger.info("Inviting passed A → Test B...")
-    for c in passed_a:
-        invite_to_test(session, TEST_B_ID, c)
-        time.sleep(0.2)
+def run_pipeline(journal_path=None):
+    """Run the screening pipeline as a stream.
 
-    logger.info("Fetching Test B candidates...")
-    candidates_b = get_all_candidates(session, TEST_B_ID)
-    logger.info(f"Test B candidates: {len(candidates_b)}")
+    The Test B roster is read once up front (emails plus its passers), then
+    Test A pages are filtered and invited as they arrive, skipping anyone
+    already on the Test B roster. Only emails and passers are held, so
+    memory stays flat regardless of how many attempts a test has.
 
-    logger.info("Filtering passed Test B...")
-    passed_b = filter_passed(candidates_b, TEST_B_PASS_SCORE)
-    logger.info(f"Passed Test B: {len(passed_b)}")
+    Fetching, filtering and inviting run as overlapping stages: a prefetch
+    thread pages through each test into a bounded queue while the invite
+    pool works on earlier pages, so a run takes roughly the longer of the
+    fetch and invite times rather than their sum.
 
-    logger.info("Sending recruiter invites...")
-    for c in passed_b:
-        send_recruiter_invite(c)
+    With a journal (journal_path, default PIPELINE_JOURNAL_PATH) every
+    fetched page and every invite is checkpointed; rerunning after a crash
+    replays the journaled pages and skips candidates already handled.
+    """
+    session = make_session()
+    counts = Counter()
+    journal = open_journal(PIPELINE_JOURNAL_PATH if journal_path is None else journal_path)
+
+    def pages_of(test_id):
+        # Pages are fetched on a prefetch thread, ahead of the stage consuming them
+        if journal is None:
+            pages = iter_candidate_pages(session, test_id)
+        else:
+            pages = journal.checkpointed_pages(
+                test_id, lambda start: iter_candidate_pages(session, test_id, start), LIMIT
+            )
+        return Prefetcher(pages)
+
+    def candidates_of(pages):
+        return (c for _, batch in pages for c in batch)
+
+    def not_yet(outcome, test_id, candidates):
+        for c in candidates:
+            if journal is not None and journal.has(outcome, test_id, c.get("email")):
+                counts[f"already_{outcome}"] += 1
+                continue
+            yield c
+
+    # Test A starts paginating straight away, overlapping the Test B read;
+    # its bounded queue holds at most PIPELINE_PREFETCH_PAGES pages.
+    pages_a = pages_of(TEST_A_ID)
+    try:
+        # One pass over Test B gives both the roster to dedupe invites against
+        # and its passers; invites sent below cannot add Test B results.
+        logger.info("Fetching Test B roster and results...")
+        roster = set()
+        passed_b = []
+        pages_b = pages_of(TEST_B_ID)
+        try:
+            for c in count_into(counts, "test_b", candidates_of(pages_b)):
+                key = normalize_email(c.get("email"))
+                if key:
+                    roster.add(key)
+                if extract_score(c) >= TEST_B_PASS_SCORE:
+                    passed_b.append(c)
+        finally:
+            pages_b.close()
+        counts["passed_b"] = len(passed_b)
+        logger.info(f"Test B candidates: {counts['test_b']}")
+
+        logger.info("Streaming Test A candidates → filter → invite to Test B...")
+        candidates_a = count_into(counts, "test_a", candidates_of(pages_a))
+        passed_a = count_into(counts, "passed_a", iter_passed(candidates_a, TEST_A_PASS_SCORE))
+
+        to_invite = not_yet("invited", TEST_B_ID, exclude_roster(
+            passed_a, roster, on_skip=lambda c: counts.update(["skipped_on_roster"])
+        ))
+        for result in iter_bulk_invite(lambda c: invite_to_test(session, TEST_B_ID, c), to_invite):
+            counts[f"invite_{result['status']}"] += 1
+            if journal is not None and result["status"] == "invited":
+                journal.record("invited", TEST_B_ID, result["email"])
+
+        logger.info(f"Test A candidates: {counts['test_a']}")
+        logger.info(f"Passed Test A: {counts['passed_a']}")
+        logger.info(
+            f"Invited to Test B: {counts['invite_invited']} (failed: {counts['invite_failed']}, "
+            f"already on Test B roster: {counts['skipped_on_roster']})"
+        )
+
+        logger.info(f"Passed Test B: {counts['passed_b']} → recruiter invites...")
+        for c in not_yet("calendared", TEST_B_ID, passed_b):
+            send_recruiter_invite(c)
+            if journal is not None:
+                journal.record("calendared", TEST_B_ID, c.get("email"))
+    except BaseException:
+        pages_a.close()
+        if journal is not None:
+            journal.close()
+        raise
+
+    if journal is not None:
+        journal.finish()
+    return dict(counts)
 
 
 if __name__ == "__main__":
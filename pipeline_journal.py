@@ -0,0 +1,168 @@
+"""
+Checkpoint journal for resumable pipeline runs
+
+An append-only JSON-lines file that records pipeline progress as it
+happens: each fetched candidate page, the end of each test's pagination,
+and every candidate invited, emailed or calendared. When a run dies
+halfway, the next run replays the journal, skips the finished units and
+picks up where the last one stopped. A run that completes deletes its
+journal so the next run starts fresh.
+"""
+
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Journal file for new_agent.run_pipeline and directory for MCP pipeline
+# journals; journaling is off when unset
+PIPELINE_JOURNAL_PATH = os.getenv("PIPELINE_JOURNAL_PATH", "")
+PIPELINE_JOURNAL_DIR = os.getenv("PIPELINE_JOURNAL_DIR", "")
+
+# Per-candidate outcomes that can be journaled
+OUTCOMES = ("invited", "emailed", "calendared")
+
+
+def journal_key(email):
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+class PipelineJournal:
+    """Append-only record of completed pipeline units."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pages = {}            # test_id -> {offset: batch}
+        self.fetch_complete = set()
+        self.stages = set()
+        self.outcomes = {outcome: set() for outcome in OUTCOMES}
+        self.resumed = False
+        self._load()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        good_end = size = 0        # end of the last intact line, end of the file
+        unterminated = False
+        with open(self.path, "rb") as f:
+            for line in f:
+                size += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    logger.warning(f"Ignoring corrupt journal line in {self.path}")
+                    continue
+                self._apply(event)
+                self.resumed = True
+                good_end = size
+                unterminated = not line.endswith(b"\n")
+
+        # Appends must start on a fresh line, or the next record would be
+        # glued onto the torn fragment and lost on the following resume
+        if good_end < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+        if unterminated:
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+        if self.resumed:
+            logger.info(
+                f"Resuming from journal {self.path}: stages done {sorted(self.stages)}, "
+                f"{len(self.outcomes['invited'])} already invited"
+            )
+
+    def _apply(self, event):
+        kind = event.get("type")
+        if kind == "page":
+            self.pages.setdefault(event["test_id"], {})[event["offset"]] = event["data"]
+        elif kind == "fetch_complete":
+            self.fetch_complete.add(event["test_id"])
+        elif kind == "stage":
+            self.stages.add(event["stage"])
+        elif kind in OUTCOMES:
+            self.outcomes[kind].add((event["test_id"], journal_key(event["email"])))
+
+    def _append(self, event):
+        with self.lock:
+            self._apply(event)
+            self.file.write(json.dumps(event) + "\n")
+            self.file.flush()
+
+    # -------------------------------------------------------
+    # Stages
+    # -------------------------------------------------------
+
+    def is_done(self, stage):
+        return stage in self.stages
+
+    def mark_done(self, stage):
+        self._append({"type": "stage", "stage": stage})
+
+    # -------------------------------------------------------
+    # Per-candidate outcomes
+    # -------------------------------------------------------
+
+    def has(self, outcome, test_id, email):
+        return (test_id, journal_key(email)) in self.outcomes[outcome]
+
+    def record(self, outcome, test_id, email):
+        self._append({"type": outcome, "test_id": test_id, "email": email})
+
+    # -------------------------------------------------------
+    # Pages
+    # -------------------------------------------------------
+
+    def checkpointed_pages(self, test_id, fetch_pages, page_size):
+        """Yield (offset, batch) pages, replaying journaled pages first.
+
+        `fetch_pages(start_offset)` must yield (offset, batch) pages from
+        the API starting at `start_offset`; every page it yields is
+        journaled before being passed on.
+        """
+        saved = self.pages.get(test_id, {})
+        offset = 0
+        while offset in saved:
+            yield offset, saved[offset]
+            offset += page_size
+
+        if test_id in self.fetch_complete:
+            return
+
+        for page_offset, batch in fetch_pages(offset):
+            self._append({"type": "page", "test_id": test_id, "offset": page_offset, "data": batch})
+            yield page_offset, batch
+
+        self._append({"type": "fetch_complete", "test_id": test_id})
+
+    # -------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def finish(self):
+        """Run completed: drop the journal so the next run starts fresh."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def open_journal(path):
+    """PipelineJournal at `path`, or None when journaling is disabled."""
+    return PipelineJournal(path) if path else None
+
+
+def screening_journal_path(test_a_id, test_b_id):
+    """Journal file for an MCP screening run, or "" when PIPELINE_JOURNAL_DIR is unset."""
+    if not PIPELINE_JOURNAL_DIR:
+        return ""
+    os.makedirs(PIPELINE_JOURNAL_DIR, exist_ok=True)
+    return os.path.join(PIPELINE_JOURNAL_DIR, f"screening_{test_a_id}_{test_b_id}.jsonl")
@@ -0,0 +1,342 @@
+"""
+Resilience layer for HackerRank API calls
+
+Every new_agent HTTP call goes through `send()` (and every async_client
+call through its coroutine twin `send_async()`), which adds:
+
+- classified retries: 429 and 5xx gateway errors are retried with jittered
+  exponential backoff (or the server's Retry-After); other statuses are
+  returned to the caller straight away
+- a circuit breaker shared by all endpoints: after repeated server-side
+  failures calls fail fast with CircuitOpenError instead of hammering an
+  API that is down, and a single trial call is let through once the reset
+  timeout has passed
+- a process-wide cap (API_MAX_IN_FLIGHT) on requests in flight at once,
+  so concurrent MCP tool calls cannot flood the API between them
+- per-endpoint metrics (requests, retries, failures, status counts)
+
+Connection errors are already retried at the transport level by the
+session's urllib3 adapter (or the async client's httpx transport), so here
+they only count against the breaker.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+
+from invite_engine import backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "4"))
+API_RETRY_BASE_SECONDS = float(os.getenv("API_RETRY_BASE_SECONDS", "0.5"))
+API_RETRY_MAX_SECONDS = float(os.getenv("API_RETRY_MAX_SECONDS", "30"))
+
+# Consecutive server-side failures that open the circuit, and seconds it
+# stays open before a trial call is allowed
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Process-wide cap on HackerRank requests in flight at once, across every
+# session, thread and MCP tool call (0 = unlimited)
+API_MAX_IN_FLIGHT = int(os.getenv("API_MAX_IN_FLIGHT", "16"))
+
+# Statuses worth retrying, and the ones that mean the API itself is unhealthy
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+SERVER_ERROR_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class HackerRankAPIError(Exception):
+    """A HackerRank API call that did not succeed."""
+
+    def __init__(self, message, status_code=None, endpoint=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.endpoint = endpoint
+
+
+class CircuitOpenError(HackerRankAPIError):
+    """Raised instead of calling the API while the circuit is open."""
+
+
+# ===========================================================
+# CIRCUIT BREAKER
+# ===========================================================
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open circuit breaker."""
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = (CIRCUIT_FAILURE_THRESHOLD if failure_threshold is None
+                                  else failure_threshold)
+        self.reset_timeout = CIRCUIT_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return "closed"
+        if now - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self, endpoint=None):
+        """Raise CircuitOpenError unless a call may go out now."""
+        if self.failure_threshold <= 0:
+            return
+        with self.lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+        raise CircuitOpenError(
+            f"Failed: HackerRank API circuit open after {self.failure_threshold} failures",
+            endpoint=endpoint
+        )
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("HackerRank API recovered; closing circuit")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            now = time.monotonic()
+            if self.trial_in_flight or (self.opened_at is None
+                                        and self.failures >= self.failure_threshold > 0):
+                if self.opened_at is None:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"HackerRank API failing ({self.failures} in a row); opening circuit "
+                        f"for {self.reset_timeout:.0f}s"
+                    )
+                self.opened_at = now
+            self.trial_in_flight = False
+
+    def reset(self):
+        self.record_success()
+        with self.lock:
+            self.times_opened = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "state": self._state(time.monotonic()),
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+            }
+
+
+# ===========================================================
+# METRICS
+# ===========================================================
+
+class EndpointMetrics:
+    """Per-endpoint request, retry and failure counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def _entry(self, endpoint):
+        entry = self.endpoints.get(endpoint)
+        if entry is None:
+            entry = self.endpoints[endpoint] = {
+                "requests": 0, "retries": 0, "failures": 0, "short_circuited": 0,
+                "statuses": Counter(),
+            }
+        return entry
+
+    def record(self, endpoint, key=None, status=None):
+        """Bump counter `key` (if given) and the count of response `status`."""
+        with self.lock:
+            entry = self._entry(endpoint)
+            if key is not None:
+                entry[key] += 1
+            if status is not None:
+                entry["statuses"][str(status)] += 1
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: {**entry, "statuses": dict(entry["statuses"])}
+                for endpoint, entry in self.endpoints.items()
+            }
+
+
+class InFlightLimiter:
+    """Bounded count of concurrent upstream requests (limit 0 = unlimited)."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit) if limit > 0 else None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def __enter__(self):
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        return self
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.in_flight -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    async def __aenter__(self):
+        if self.semaphore is not None:
+            # The slots are shared with threads, so poll rather than block the loop
+            while not self.semaphore.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.__exit__(*exc)
+
+    def reset(self):
+        with self.lock:
+            self.peak = self.in_flight
+
+    def stats(self):
+        with self.lock:
+            return {"limit": self.limit, "in_flight": self.in_flight, "peak": self.peak}
+
+
+API_BREAKER = CircuitBreaker()
+API_METRICS = EndpointMetrics()
+API_IN_FLIGHT = InFlightLimiter(API_MAX_IN_FLIGHT)
+
+
+def api_health():
+    """Circuit breaker state, in-flight requests and per-endpoint metrics."""
+    return {"circuit": API_BREAKER.stats(), "in_flight": API_IN_FLIGHT.stats(),
+            "endpoints": API_METRICS.snapshot()}
+
+
+def reset():
+    """Close the circuit and clear metrics (tests, or after reconfiguring)."""
+    API_BREAKER.reset()
+    API_METRICS.reset()
+    API_IN_FLIGHT.reset()
+
+
+# ===========================================================
+# CALLS
+# ===========================================================
+
+def send(session, method, endpoint, url, retry_statuses=RETRY_STATUSES,
+         max_retries=None, **kwargs):
+    """Issue `session.<method>(url, **kwargs)` through the breaker with retries.
+
+    Returns the final response whatever its status, so callers keep their
+    own error handling; raises CircuitOpenError while the circuit is open.
+    Pass `retry_statuses=()` for calls that must not be repeated.
+    """
+    max_retries = API_MAX_RETRIES if max_retries is None else max_retries
+    request = getattr(session, method)
+
+    for attempt in range(1, max_retries + 2):
+        _before_request(endpoint)
+        try:
+            with API_IN_FLIGHT:
+                res = request(url, **kwargs)
+        except Exception:
+            _request_failed(endpoint)
+            raise
+
+        delay = _retry_delay(endpoint, res, attempt, max_retries, retry_statuses)
+        if delay is None:
+            return res
+        time.sleep(delay)
+
+
+async def send_async(client, method, endpoint, url, retry_statuses=RETRY_STATUSES,
+                     max_retries=None, **kwargs):
+    """Awaitable `send()` for an httpx.AsyncClient, sharing its breaker, cap and metrics."""
+    max_retries = API_MAX_RETRIES if max_retries is None else max_retries
+    request = getattr(client, method)
+
+    for attempt in range(1, max_retries + 2):
+        _before_request(endpoint)
+        try:
+            async with API_IN_FLIGHT:
+                res = await request(url, **kwargs)
+        except Exception:
+            _request_failed(endpoint)
+            raise
+
+        delay = _retry_delay(endpoint, res, attempt, max_retries, retry_statuses)
+        if delay is None:
+            return res
+        await asyncio.sleep(delay)
+
+
+def _before_request(endpoint):
+    try:
+        API_BREAKER.before_call(endpoint)
+    except CircuitOpenError:
+        API_METRICS.record(endpoint, "short_circuited")
+        raise
+    API_METRICS.record(endpoint, "requests")
+
+
+def _request_failed(endpoint):
+    API_BREAKER.record_failure()
+    API_METRICS.record(endpoint, "failures")
+
+
+def _retry_delay(endpoint, res, attempt, max_retries, retry_statuses):
+    """Record a response; return seconds to wait before retrying it, or None to return it."""
+    status = res.status_code
+    if status in SERVER_ERROR_STATUSES:
+        API_BREAKER.record_failure()
+    else:
+        API_BREAKER.record_success()
+
+    if status in retry_statuses and attempt <= max_retries:
+        retry_after = None
+        if status in (429, 503):
+            headers = getattr(res, "headers", None) or {}
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+        delay = backoff_delay(attempt, retry_after, API_RETRY_BASE_SECONDS, API_RETRY_MAX_SECONDS)
+        logger.warning(f"{endpoint} returned {status}; retry {attempt}/{max_retries} in {delay:.1f}s")
+        API_METRICS.record(endpoint, "retries", status)
+        return delay
+
+    API_METRICS.record(endpoint, None if status in (200, 201) else "failures", status)
+    return None
@@ -0,0 +1,222 @@
+"""
+Incremental per-test score aggregates
+
+A ScoreAggregate is a running summary of one test's attempts: counts, sum,
+min, max, a fixed 10-bin histogram, exact pass counts at the configured
+thresholds and a bucketed quantile sketch. Attempts are added, removed or
+replaced one at a time as they are synced, so statistics are read in time
+independent of the number of candidates instead of being recomputed from a
+full candidate list.
+
+Statistics cover scored attempts (score > 0); unscored attempts are only
+counted. The sketch keeps a count and a sum per
+bucket of AGGREGATE_SKETCH_RESOLUTION score points, so percentiles are
+exact while every bucket holds a single distinct score (e.g. whole-number
+scores) and otherwise within one bucket width.
+
+Min and max are exact until an attempt holding one of them is removed;
+the aggregate is then marked `dirty` (its bounds fall back to the sketch's
+outer buckets) and whoever owns it rebuilds it from the source before
+reporting it, as CandidateStore does.
+"""
+
+import os
+import time
+import threading
+
+from scoring import as_number
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+# Thresholds with exact pass counts (default: the Test A and Test B pass scores)
+AGGREGATE_THRESHOLDS = [
+    float(t) for t in os.getenv(
+        "AGGREGATE_THRESHOLDS",
+        f"{os.getenv('TEST_A_PASS_SCORE', '70')},{os.getenv('TEST_B_PASS_SCORE', '80')}"
+    ).split(",") if t.strip()
+]
+
+# Width, in score points, of a quantile sketch bucket
+AGGREGATE_SKETCH_RESOLUTION = float(os.getenv("AGGREGATE_SKETCH_RESOLUTION", "0.5"))
+
+HISTOGRAM_BINS = 10
+HISTOGRAM_LOW, HISTOGRAM_HIGH = 0.0, 100.0
+
+
+class QuantileSketch:
+    """Fixed-width buckets of (count, sum) supporting add, remove and quantiles.
+
+    Memory and query time depend on the score range over the resolution,
+    not on how many scores were added.
+    """
+
+    def __init__(self, resolution=None):
+        self.resolution = resolution or AGGREGATE_SKETCH_RESOLUTION
+        self.buckets = {}      # bucket index -> [count, sum]
+        self.count = 0
+
+    def _index(self, value):
+        return int(value // self.resolution)
+
+    def add(self, value):
+        bucket = self.buckets.setdefault(self._index(value), [0, 0.0])
+        bucket[0] += 1
+        bucket[1] += value
+        self.count += 1
+
+    def remove(self, value):
+        index = self._index(value)
+        bucket = self.buckets.get(index)
+        if bucket is None:
+            return
+        bucket[0] -= 1
+        bucket[1] -= value
+        self.count -= 1
+        if bucket[0] <= 0:
+            del self.buckets[index]
+
+    def order_statistics(self):
+        """(count, representative value) per non-empty bucket, ascending."""
+        return [(count, total / count) for _, (count, total) in sorted(self.buckets.items())]
+
+    def quantile(self, q):
+        """q-th percentile (0-100), interpolated like ScoreColumn.percentile, or None if empty."""
+        if not self.count:
+            return None
+        rank = (self.count - 1) * q / 100.0
+        low = int(rank)
+        high = min(low + 1, self.count - 1)
+        values = {}
+        seen = 0
+        for count, value in self.order_statistics():
+            for position in (low, high):
+                if position not in values and position < seen + count:
+                    values[position] = value
+            if high in values:
+                break
+            seen += count
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+    def count_at_least(self, threshold):
+        """Scores >= threshold, counting each bucket by its mean value."""
+        return sum(count for count, value in self.order_statistics() if value >= threshold)
+
+
+class ScoreAggregate:
+    """Running statistics for one test's attempts."""
+
+    def __init__(self, thresholds=None, resolution=None):
+        self.thresholds = sorted(set(AGGREGATE_THRESHOLDS if thresholds is None else thresholds))
+        self.attempts = 0
+        self.scored = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.pass_counts = dict.fromkeys(self.thresholds, 0)
+        self.sketch = QuantileSketch(resolution)
+        self.updated_at = time.time()
+        self.dirty = False     # min/max approximate until rebuilt
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_scores(cls, scores, thresholds=None, resolution=None):
+        """Aggregate of an iterable of scores (as extract_score returns them)."""
+        aggregate = cls(thresholds, resolution)
+        for score in scores:
+            aggregate.add(score)
+        return aggregate
+
+    @staticmethod
+    def _bin(score):
+        # Equal-width bins over [0, 100], last bin closed; out-of-range scores
+        # land in the end bins
+        width = (HISTOGRAM_HIGH - HISTOGRAM_LOW) / HISTOGRAM_BINS
+        return max(0, min(int((score - HISTOGRAM_LOW) // width), HISTOGRAM_BINS - 1))
+
+    def add(self, score):
+        """Count one attempt with this score."""
+        with self.lock:
+            self.attempts += 1
+            self.updated_at = time.time()
+            if score is None or score <= 0:
+                return
+            self.scored += 1
+            self.total += score
+            self.min = score if self.min is None else min(self.min, score)
+            self.max = score if self.max is None else max(self.max, score)
+            self.histogram[self._bin(score)] += 1
+            for threshold in self.thresholds:
+                if score >= threshold:
+                    self.pass_counts[threshold] += 1
+            self.sketch.add(score)
+
+    def remove(self, score):
+        """Uncount one attempt previously added with this score."""
+        with self.lock:
+            self.attempts -= 1
+            self.updated_at = time.time()
+            if score is None or score <= 0:
+                return
+            self.scored -= 1
+            self.total -= score
+            self.histogram[self._bin(score)] -= 1
+            for threshold in self.thresholds:
+                if score >= threshold:
+                    self.pass_counts[threshold] -= 1
+            self.sketch.remove(score)
+            if score == self.min or score == self.max:
+                # The exact extreme is gone: approximate it from the sketch's
+                # outer buckets until the owner rebuilds the aggregate
+                self.dirty = True
+                statistics = self.sketch.order_statistics()
+                self.min = statistics[0][1] if statistics else None
+                self.max = statistics[-1][1] if statistics else None
+
+    def replace(self, old_score, new_score):
+        """Update an attempt whose score changed on re-sync."""
+        self.remove(old_score)
+        self.add(new_score)
+
+    def count_at_least(self, threshold):
+        """Attempts scoring >= threshold: exact at configured thresholds, else from the sketch."""
+        with self.lock:
+            if threshold <= 0:
+                return self.attempts
+            if threshold in self.pass_counts:
+                return self.pass_counts[threshold]
+            return self.sketch.count_at_least(threshold)
+
+    def summary(self, percentiles=(25, 50, 75, 90)):
+        """Scored-attempt statistics in the shape of ScoreColumn.summary()."""
+        with self.lock:
+            if not self.scored:
+                return {"count": 0, "mean": None, "min": None, "max": None,
+                        "percentiles": {}, "histogram": None}
+            width = (HISTOGRAM_HIGH - HISTOGRAM_LOW) / HISTOGRAM_BINS
+            edges = [HISTOGRAM_LOW + i * width for i in range(HISTOGRAM_BINS + 1)]
+            return {
+                "count": self.scored,
+                "mean": round(self.total / self.scored, 2),
+                "min": as_number(round(self.min, 6)),
+                "max": as_number(round(self.max, 6)),
+                "percentiles": {
+                    f"p{q}": as_number(round(self.sketch.quantile(q), 2)) for q in percentiles
+                },
+                "histogram": {"edges": [as_number(round(e, 6)) for e in edges],
+                              "counts": list(self.histogram)},
+            }
+
+    def snapshot(self):
+        """Counts, pass counts and summary as a JSON-ready dict."""
+        with self.lock:
+            counts = {
+                "attempts": self.attempts,
+                "scored": self.scored,
+                "unscored": self.attempts - self.scored,
+                "pass_counts": {str(as_number(t)): c for t, c in self.pass_counts.items()},
+                "updated_at": self.updated_at,
+            }
+        return {**counts, "score_summary": self.summary()}
@@ -0,0 +1,92 @@
+"""
+Columnar score statistics
+
+Scores are extracted once into a packed float array. Multi-threshold pass
+counts, percentiles and histograms are then answered from that array (and
+one sorted copy, built on first use, which lets any threshold count be a
+binary search) instead of re-extracting per candidate. Filtering the
+candidates themselves is a single pass in new_agent.filter_passed; a
+column does not pay off there.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+def as_number(value):
+    """Render whole floats as ints so 85.0 reports as 85, like the raw scores."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class ScoreColumn:
+    """Packed array of candidate scores with vectorised queries."""
+
+    def __init__(self, scores=()):
+        self.values = array("d", scores)
+        self._sorted = None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def sorted_values(self):
+        if self._sorted is None:
+            self._sorted = array("d", sorted(self.values))
+        return self._sorted
+
+    # -------------------------------------------------------
+    # Threshold counts
+    # -------------------------------------------------------
+
+    def count_at_least(self, threshold):
+        return len(self.values) - bisect_left(self.sorted_values, threshold)
+
+    def sweep(self, thresholds):
+        """Pass counts for many thresholds at once: {threshold: count}."""
+        return {threshold: self.count_at_least(threshold) for threshold in thresholds}
+
+    # -------------------------------------------------------
+    # Statistics
+    # -------------------------------------------------------
+
+    def percentile(self, q):
+        """q-th percentile (0-100) with linear interpolation, or None if empty."""
+        values = self.sorted_values
+        if not values:
+            return None
+        rank = (len(values) - 1) * q / 100.0
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+    def histogram(self, bins=10, low=0.0, high=100.0):
+        """Equal-width bin counts over [low, high]; the last bin is closed."""
+        values = self.sorted_values
+        width = (high - low) / bins
+        edges = [low + i * width for i in range(bins + 1)]
+        counts = []
+        for i in range(bins):
+            start = bisect_left(values, edges[i])
+            if i == bins - 1:
+                end = bisect_right(values, edges[i + 1])
+            else:
+                end = bisect_left(values, edges[i + 1])
+            counts.append(end - start)
+        return {"edges": [as_number(round(e, 6)) for e in edges], "counts": counts}
+
+    def summary(self, percentiles=(25, 50, 75, 90), bins=10):
+        """Count, mean, min, max, percentiles and histogram in one pass over the column."""
+        if not self.values:
+            return {"count": 0, "mean": None, "min": None, "max": None,
+                    "percentiles": {}, "histogram": None}
+        values = self.sorted_values
+        return {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 2),
+            "min": as_number(values[0]),
+            "max": as_number(values[-1]),
+            "percentiles": {f"p{q}": as_number(round(self.percentile(q), 2)) for q in percentiles},
+            "histogram": self.histogram(bins, low=min(0.0, values[0]), high=max(100.0, values[-1])),
+        }
@@ -0,0 +1,127 @@
+"""
+Single-flight request coalescing
+
+When several threads ask for the same key at once, only the first runs the
+loader; the others wait for it and receive the same result (or exception).
+Nothing is remembered once the call finishes, so unlike a cache a later
+call always loads afresh. The MCP server puts this under its candidate
+cache so a burst of tool calls for one test downloads it only once.
+
+`do_async()` is the same for coroutines on an event loop; it shares the
+in-flight calls with `do()`, so threads and coroutines asking for one key
+still cause a single load.
+
+forget() detaches the current call from its key, e.g. when the data it is
+loading has just been invalidated: later callers start a new load, and
+callers already waiting on the detached call load again as well instead
+of receiving its stale result. Only the caller that ran the detached
+loader gets its result.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class Flight(Future):
+    """One in-flight call; `detached` once forget() has cut it off from its key."""
+
+    detached = False
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}        # key -> Future
+        self.calls = 0
+        self.shared = 0
+        self.reloads = 0
+
+    def _join(self, key, first_try):
+        # Returns (future, owner): a new Flight this caller must complete, or
+        # the one already in flight for `key`
+        with self.lock:
+            if first_try:
+                self.calls += 1
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Flight()
+            else:
+                self.shared += 1
+            return future, owner
+
+    def _land(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def _rejoin(self):
+        # Joined a call that was forgotten meanwhile: load again
+        with self.lock:
+            self.reloads += 1
+
+    def do(self, key, loader):
+        """Return `loader()`, sharing one call among concurrent callers with `key`."""
+        first_try = True
+        while True:
+            future, owner = self._join(key, first_try)
+            first_try = False
+            if owner:
+                try:
+                    future.set_result(loader())
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    self._land(key, future)
+                return future.result()
+            try:
+                result = future.result()
+            except BaseException:
+                if not future.detached:
+                    raise
+            else:
+                if not future.detached:
+                    return result
+            self._rejoin()
+
+    async def do_async(self, key, loader):
+        """Return `await loader()`, sharing one call among concurrent callers with `key`."""
+        first_try = True
+        while True:
+            future, owner = self._join(key, first_try)
+            first_try = False
+            if owner:
+                try:
+                    future.set_result(await loader())
+                except BaseException as e:
+                    future.set_exception(e)
+                finally:
+                    self._land(key, future)
+                return future.result()
+            try:
+                # Shielded: a cancelled waiter must not cancel the shared call
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                if not future.detached:
+                    raise
+            else:
+                if not future.detached:
+                    return result
+            self._rejoin()
+
+    def forget(self, key):
+        """Detach the call in flight for `key`: new and waiting callers load afresh."""
+        with self.lock:
+            future = self.in_flight.pop(key, None)
+            if future is not None:
+                future.detached = True
+
+    def stats(self):
+        with self.lock:
+            return {"calls": self.calls, "shared": self.shared, "reloads": self.reloads,
+                    "in_flight": len(self.in_flight)}
@@ -0,0 +1,244 @@
+"""
+Synthetic candidate cohorts for mock mode
+
+Generates large, deterministic candidate lists for a Test A -> Test B
+pair so the MCP tools can be load-tested offline at 10k-1M candidates.
+A cohort is shaped by:
+
+- a score distribution: "uniform", "normal:<mean>:<stdev>" or
+  "bimodal:<low mean>:<high mean>:<stdev>" (percentages, clamped to 0-100)
+- a status mix: weights per HackerRank attempt status, e.g.
+  "2=0.85,1=0.1,-1=0.05"; only completed attempts (status 2) are scored
+- a missing-field rate: chance each of email, full_name and
+  percentage_score is absent from a candidate
+- a Test A/B overlap ratio: fraction of Test B candidates who also took
+  Test A (same email)
+
+Candidates are generated lazily in fixed-size blocks, each from its own
+seeded RNG, so the same seed always gives the same cohort, any candidate
+can be read without generating the ones before it, and iterating holds
+one block in memory at a time.
+"""
+
+import os
+import random
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+
+# Synthetic Test A candidates in mock mode (0 = use the hand-written mock data)
+MOCK_COHORT_SIZE = int(os.getenv("MOCK_COHORT_SIZE", "0"))
+# Test B candidates (default: a quarter of MOCK_COHORT_SIZE)
+MOCK_COHORT_TEST_B_SIZE = int(os.getenv("MOCK_COHORT_TEST_B_SIZE", "-1"))
+MOCK_COHORT_SEED = int(os.getenv("MOCK_COHORT_SEED", "0"))
+MOCK_SCORE_DISTRIBUTION = os.getenv("MOCK_SCORE_DISTRIBUTION", "normal:65:15")
+MOCK_STATUS_MIX = os.getenv("MOCK_STATUS_MIX", "2=0.85,1=0.1,-1=0.05")
+MOCK_MISSING_FIELD_RATE = float(os.getenv("MOCK_MISSING_FIELD_RATE", "0.01"))
+MOCK_OVERLAP_RATIO = float(os.getenv("MOCK_OVERLAP_RATIO", "0.9"))
+
+# Candidates generated per RNG block
+BLOCK_SIZE = 1024
+
+COMPLETED = 2
+COHORT_START = datetime(2024, 1, 15, tzinfo=timezone.utc)
+COHORT_SPAN_SECONDS = 30 * 24 * 3600
+
+FIRST_NAMES = ("Alice", "Bob", "Charlie", "Diana", "Ethan", "Fiona", "George", "Hannah",
+               "Ivan", "Julia", "Kevin", "Laura", "Mohan", "Nina", "Oscar", "Priya")
+LAST_NAMES = ("Anderson", "Brown", "Chen", "Davis", "Evans", "Garcia", "Hughes", "Ito",
+              "Jones", "Khan", "Lopez", "Miller", "Nguyen", "Okafor", "Patel", "Rossi")
+
+
+# ===========================================================
+# DISTRIBUTIONS
+# ===========================================================
+
+def parse_score_distribution(spec):
+    """Parse a score distribution spec into a function rng -> score.
+
+    Raises ValueError for an unknown or malformed spec.
+    """
+    name, *params = spec.strip().split(":")
+    try:
+        params = [float(p) for p in params]
+    except ValueError:
+        raise ValueError(f"Non-numeric parameter in score distribution {spec!r}")
+
+    if name == "uniform" and not params:
+        return lambda rng: rng.uniform(0, 100)
+    if name == "normal" and len(params) == 2:
+        mean, stdev = params
+        return lambda rng: rng.gauss(mean, stdev)
+    if name == "bimodal" and len(params) == 3:
+        low, high, stdev = params
+        return lambda rng: rng.gauss(high if rng.random() < 0.5 else low, stdev)
+    raise ValueError(
+        f"Unknown score distribution {spec!r}; expected uniform, "
+        f"normal:<mean>:<stdev> or bimodal:<low>:<high>:<stdev>"
+    )
+
+
+def parse_status_mix(spec):
+    """Parse "status=weight,..." into ([statuses], [weights])."""
+    statuses, weights = [], []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        status, sep, weight = part.partition("=")
+        if not sep:
+            raise ValueError(f"Expected status=weight in status mix, got {part!r}")
+        statuses.append(int(status))
+        weights.append(float(weight))
+    if not statuses or sum(weights) <= 0:
+        raise ValueError(f"Status mix {spec!r} has no positive weights")
+    return statuses, weights
+
+
+# ===========================================================
+# COHORTS
+# ===========================================================
+
+class SyntheticCohort:
+    """Deterministic synthetic candidates for a Test A -> Test B pair.
+
+    Args:
+        test_a_id: Screening test id
+        test_b_id: Next-round test id
+        size: Test A candidates
+        test_b_size: Test B candidates (default: size // 4)
+        seed: Seed; the same arguments always give the same candidates
+        score_distribution: Score distribution spec (see module docstring)
+        status_mix: Status mix spec or {status: weight} dict
+        missing_field_rate: Chance each optional field is missing
+        overlap_ratio: Fraction of Test B candidates who also took Test A
+    """
+
+    def __init__(self, test_a_id, test_b_id, size, test_b_size=None, seed=0,
+                 score_distribution="normal:65:15", status_mix="2=0.85,1=0.1,-1=0.05",
+                 missing_field_rate=0.0, overlap_ratio=0.9):
+        if not 0 <= missing_field_rate <= 1 or not 0 <= overlap_ratio <= 1:
+            raise ValueError("missing_field_rate and overlap_ratio must be between 0 and 1")
+        self.test_a_id = test_a_id
+        self.test_b_id = test_b_id
+        self.sizes = {
+            test_a_id: size,
+            test_b_id: size // 4 if test_b_size is None or test_b_size < 0 else test_b_size,
+        }
+        self.seed = seed
+        self.draw_score = parse_score_distribution(score_distribution)
+        if isinstance(status_mix, dict):
+            self.statuses, self.status_weights = list(status_mix), list(status_mix.values())
+        else:
+            self.statuses, self.status_weights = parse_status_mix(status_mix)
+        self.missing_field_rate = missing_field_rate
+        # The first `overlap` Test B candidates are Test A candidates, spread
+        # evenly over Test A; the rest only took Test B
+        self.overlap = min(round(overlap_ratio * self.sizes[test_b_id]), size)
+
+    @property
+    def test_ids(self):
+        return tuple(self.sizes)
+
+    def size(self, test_id):
+        """Candidates generated for `test_id` (0 for other tests)."""
+        return self.sizes.get(test_id, 0)
+
+    def candidates(self, test_id):
+        """Lazy, indexable sequence of the candidates for `test_id`."""
+        return SyntheticCandidates(self, test_id)
+
+    def identity(self, test_id, index):
+        """(person number, email domain) behind candidate `index` of a test."""
+        if test_id == self.test_b_id:
+            if index < self.overlap:
+                return index * self.sizes[self.test_a_id] // self.overlap, "example.com"
+            return index, "testb.example.com"
+        return index, "example.com"
+
+    def block(self, test_id, number):
+        """Generate candidates [number * BLOCK_SIZE, ...) of a test."""
+        rng = random.Random(f"{self.seed}:{test_id}:{number}")
+        start = number * BLOCK_SIZE
+        stop = min(start + BLOCK_SIZE, self.size(test_id))
+        return [self._candidate(rng, test_id, i) for i in range(start, stop)]
+
+    def _candidate(self, rng, test_id, index):
+        person, domain = self.identity(test_id, index)
+        first = FIRST_NAMES[person % len(FIRST_NAMES)]
+        last = LAST_NAMES[(person // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        status = rng.choices(self.statuses, self.status_weights)[0]
+        candidate = {
+            "id": f"{test_id}-{index}",
+            "email": f"{first.lower()}.{last.lower()}{person}@{domain}",
+            "full_name": f"{first} {last}",
+            "name": f"{first} {last}",
+            "test_id": test_id,
+            "status": status,
+        }
+        if status == COMPLETED:
+            score = round(min(100.0, max(0.0, self.draw_score(rng))), 1)
+            candidate["percentage_score"] = score
+            candidate["score"] = score
+            completed = COHORT_START + timedelta(seconds=rng.randrange(COHORT_SPAN_SECONDS))
+            candidate["completed_at"] = completed.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if self.missing_field_rate:
+            for field in ("email", "full_name", "percentage_score"):
+                if rng.random() < self.missing_field_rate:
+                    candidate.pop(field, None)
+        return candidate
+
+
+class SyntheticCandidates(Sequence):
+    """Read-only list view of one test's synthetic candidates.
+
+    Supports len(), indexing, slicing and iteration like a list, but only
+    generates (and caches) one block at a time.
+    """
+
+    def __init__(self, cohort, test_id):
+        self.cohort = cohort
+        self.test_id = test_id
+        self.length = cohort.size(test_id)
+        self._cached = (None, None)
+
+    def __len__(self):
+        return self.length
+
+    def _block(self, number):
+        if self._cached[0] != number:
+            self._cached = (number, self.cohort.block(self.test_id, number))
+        return self._cached[1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("candidate index out of range")
+        return self._block(index // BLOCK_SIZE)[index % BLOCK_SIZE]
+
+    def __iter__(self):
+        for number in range(-(-self.length // BLOCK_SIZE)):
+            yield from self.cohort.block(self.test_id, number)
+
+    def __repr__(self):
+        return f"SyntheticCandidates(test_id={self.test_id}, len={self.length})"
+
+
+def cohort_from_env(test_a_id, test_b_id):
+    """SyntheticCohort configured from MOCK_* settings, or None when MOCK_COHORT_SIZE is 0."""
+    if MOCK_COHORT_SIZE <= 0:
+        return None
+    return SyntheticCohort(
+        test_a_id, test_b_id, MOCK_COHORT_SIZE,
+        test_b_size=MOCK_COHORT_TEST_B_SIZE,
+        seed=MOCK_COHORT_SEED,
+        score_distribution=MOCK_SCORE_DISTRIBUTION,
+        status_mix=MOCK_STATUS_MIX,
+        missing_field_rate=MOCK_MISSING_FIELD_RATE,
+        overlap_ratio=MOCK_OVERLAP_RATIO,
+    )
@@ -286,3 +286,65 @@ def mock_api_response_paginated():
     
     return [response_page1, response_page2]
 
+
+
+@pytest.fixture
+def response():
+    """Fixture for a factory of minimal HTTP responses: response(status_code, headers, text)"""
+    def make(status_code, headers=None, text=""):
+        return Mock(status_code=status_code, headers=headers or {}, text=text)
+    return make
+
+
+@pytest.fixture
+def fake_hackerrank_server():
+    """Fixture for the benchmarks' fake HackerRank v3 server on localhost
+
+    Serves only the candidates set in `server.candidates[test_id]`; see
+    FakeHackerRankServer for `status_overrides`, `transient_failures` and
+    `request_log`.
+    """
+    from benchmarks.fake_server import FakeHackerRankServer
+    with FakeHackerRankServer(candidate_count=0) as server:
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def clear_candidate_cache():
+    """Start every test with an empty MCP candidate cache and no score aggregates"""
+    import mcp_server
+    mcp_server.CANDIDATE_CACHE.clear()
+    mcp_server.SCORE_AGGREGATES.clear()
+    yield
+    mcp_server.CANDIDATE_CACHE.clear()
+    mcp_server.SCORE_AGGREGATES.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_session():
+    """Build the shared HackerRank session afresh (through make_session) per test"""
+    import new_agent
+    new_agent.reset_shared_session()
+    yield
+    new_agent.reset_shared_session()
+
+
+@pytest.fixture(autouse=True)
+def reset_resilience():
+    """Start every test with a closed circuit and empty API metrics"""
+    import resilience
+    resilience.reset()
+    yield
+    resilience.reset()
+
+
+@pytest.fixture
+def smtp_sink():
+    """Fixture for a local SMTP sink recording every message it accepts
+
+    Yields an email_delivery.SMTPSink; add addresses to `sink.refuse` to
+    have them rejected with 550.
+    """
+    from email_delivery import SMTPSink
+    with SMTPSink() as sink:
+        yield sink
@@ -0,0 +1,138 @@
+"""
+Unit tests for async_client.py
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+
+import async_client
+import new_agent
+import resilience
+
+
+def make_candidates(count):
+    return [
+        {"email": f"user{i}@example.com", "full_name": f"User {i}", "percentage_score": i % 100}
+        for i in range(count)
+    ]
+
+
+async def fetch_all(test_id, **kwargs):
+    async with async_client.make_async_client() as client:
+        return await async_client.get_all_candidates(client, test_id, **kwargs)
+
+
+async def invite(test_id, candidate):
+    async with async_client.make_async_client() as client:
+        return await async_client.invite_to_test(client, test_id, candidate)
+
+
+class TestMakeAsyncClient:
+    """Tests for make_async_client function"""
+
+    @patch('new_agent.ACCESS_TOKEN', 'test_access_token')
+    @patch('new_agent.API_TOKEN', 'test_api_token')
+    def test_auth_headers(self):
+        """Test the async client carries the same auth headers as make_session"""
+        client = async_client.make_async_client()
+
+        assert client.headers["Authorization"] == "Bearer test_access_token"
+        assert client.headers["X-Auth-Token"] == "test_api_token"
+        asyncio.run(client.aclose())
+
+    @patch('new_agent.ACCESS_TOKEN', '')
+    def test_unset_token_sends_bare_bearer(self):
+        """Test an unset access token sends no trailing whitespace"""
+        client = async_client.make_async_client()
+
+        assert client.headers["Authorization"] == "Bearer"
+        asyncio.run(client.aclose())
+
+
+class TestAsyncGetAllCandidates:
+    """Tests for async get_all_candidates against the fake server"""
+
+    @pytest.mark.parametrize("count", [0, 1, 50, 51, 260])
+    def test_serial_fetch(self, fake_hackerrank_server, count):
+        """Test paging through every candidate serially"""
+        fake_hackerrank_server.candidates[42] = make_candidates(count)
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(fetch_all(42, max_concurrency=1, compact=False))
+
+        assert result == make_candidates(count)
+
+    @pytest.mark.parametrize("count", [1, 50, 51, 260])
+    def test_concurrent_fetch_keeps_order(self, fake_hackerrank_server, count):
+        """Test concurrent page fetches return pages in offset order"""
+        fake_hackerrank_server.candidates[42] = make_candidates(count)
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(fetch_all(42, max_concurrency=4, compact=False))
+
+        assert result == make_candidates(count)
+
+    def test_compact_matches_sync_client(self, fake_hackerrank_server):
+        """Test compact=True returns what new_agent.get_all_candidates does"""
+        fake_hackerrank_server.candidates[42] = make_candidates(120)
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(fetch_all(42, compact=True))
+            session = new_agent.make_session()
+            expected = new_agent.get_all_candidates(session, 42, compact=True)
+            session.close()
+
+        assert [c.to_dict() for c in result] == [c.to_dict() for c in expected]
+
+    @patch('resilience.API_RETRY_BASE_SECONDS', 0.01)
+    def test_transient_errors_retried(self, fake_hackerrank_server):
+        """Test 5xx pages are retried through the shared resilience policy"""
+        fake_hackerrank_server.candidates[42] = make_candidates(60)
+        fake_hackerrank_server.transient_failures["/tests/42/candidates"] = [502, 503]
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(fetch_all(42, max_concurrency=1, compact=False))
+
+        assert result == make_candidates(60)
+        assert resilience.api_health()["endpoints"]["GET /tests/{id}/candidates"]["retries"] == 2
+
+    def test_fetch_failure(self, fake_hackerrank_server):
+        """Test non-200 responses raise HackerRankAPIError like the sync helper"""
+        fake_hackerrank_server.status_overrides["/tests/42/candidates"] = 401
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            with pytest.raises(resilience.HackerRankAPIError) as excinfo:
+                asyncio.run(fetch_all(42))
+
+        assert excinfo.value.status_code == 401
+
+
+class TestAsyncInviteToTest:
+    """Tests for async invite_to_test"""
+
+    def test_invite_returns_response(self, fake_hackerrank_server):
+        """Test an invite is posted once and its response returned"""
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            res = asyncio.run(invite(7, {"email": "a@example.com", "name": "Alice"}))
+
+        assert res.status_code == 201
+        assert res.json()["email"] == "a@example.com"
+        assert fake_hackerrank_server.invites == 1
+
+    def test_invite_not_retried(self, fake_hackerrank_server):
+        """Test a failed invite POST is not repeated"""
+        fake_hackerrank_server.status_overrides["/tests/7/invites"] = 503
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            res = asyncio.run(invite(7, {"email": "a@example.com"}))
+
+        assert res.status_code == 503
+        assert fake_hackerrank_server.request_log == [("POST", "/tests/7/invites")]
+
+    def test_invite_no_email(self, fake_hackerrank_server):
+        """Test candidates without email are skipped"""
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            res = asyncio.run(invite(7, {"name": "No Email"}))
+
+        assert res is None
+        assert fake_hackerrank_server.requests == 0
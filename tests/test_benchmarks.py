@@ -0,0 +1,107 @@
+"""
+Unit tests for the benchmark harness (benchmarks/)
+"""
+import new_agent
+from benchmarks import bench
+from benchmarks.fake_server import FakeHackerRankServer, make_candidates
+
+
+class TestFakeHackerRankServer:
+    """Tests for FakeHackerRankServer"""
+
+    def test_serves_all_pages(self):
+        """Test that get_all_candidates pages through every served candidate"""
+        with FakeHackerRankServer(candidate_count=120) as server:
+            with bench.patched(new_agent, BASE_URL=server.base_url):
+                session = new_agent.make_session()
+                serial = new_agent.get_all_candidates(session, 7, max_workers=1)
+                parallel = new_agent.get_all_candidates(session, 7, max_workers=4)
+                session.close()
+
+        assert serial == make_candidates(7, 120)
+        assert parallel == serial
+        assert server.requests == 6
+
+    def test_page_size_caps_limit(self):
+        """Test that the server never returns more than page_size candidates"""
+        with FakeHackerRankServer(candidate_count=30, page_size=10) as server:
+            with bench.patched(new_agent, BASE_URL=server.base_url):
+                session = new_agent.make_session()
+                page = new_agent.get_candidates_page(session, 1, 0)
+                session.close()
+
+        assert len(page["data"]) == 10
+        assert page["total"] == 30
+        assert page["next"]
+
+    def test_counts_invites_and_injected_errors(self):
+        """Test that invites are counted and error_rate=1 fails every request"""
+        with FakeHackerRankServer() as server:
+            with bench.patched(new_agent, BASE_URL=server.base_url):
+                session = new_agent.make_session()
+                res = new_agent.invite_to_test(session, 2, {"email": "a@example.com"})
+                server.error_rate = 1.0
+                failed = new_agent.invite_to_test(session, 2, {"email": "b@example.com"})
+                session.close()
+
+        assert res.status_code == 201
+        assert failed.status_code == 503
+        assert server.invites == 1
+        assert server.errors == 1
+
+
+class TestCompareResults:
+    """Tests for baseline comparison"""
+
+    def test_flags_regressions_in_both_directions(self):
+        """Test that lower throughput and higher latency beyond tolerance regress"""
+        baseline = {"fetch": {"pages_per_sec": 100.0, "p99_ms": 10.0, "pages": 100}}
+        results = {"fetch": {"pages_per_sec": 70.0, "p99_ms": 11.0, "pages": 50}}
+
+        rows = {r["metric"]: r for r in bench.compare_results(results, baseline, tolerance=0.2)}
+
+        assert rows["pages_per_sec"]["regression"] is True
+        assert rows["p99_ms"]["regression"] is False
+        assert "pages" not in rows
+
+    def test_ignores_scenarios_missing_from_baseline(self):
+        """Test that new scenarios are reported without comparison"""
+        assert bench.compare_results({"new": {"pages_per_sec": 1.0}}, {}) == []
+
+    def test_save_baseline_merges(self, tmp_path):
+        """Test that saving a subset of scenarios keeps the others"""
+        path = str(tmp_path / "baseline.json")
+        bench.save_baseline({"a": {"seconds": 1.0}}, path)
+        bench.save_baseline({"b": {"seconds": 2.0}}, path)
+
+        assert bench.load_baseline(path) == {"a": {"seconds": 1.0}, "b": {"seconds": 2.0}}
+
+
+class TestMedianMetrics:
+    """Tests for combining repeated scenario runs"""
+
+    def test_median_per_metric(self):
+        """Test numeric metrics take their median and others the first run's value"""
+        runs = [
+            {"pages_per_sec": 100.0, "p99_ms": 30.0, "skipped": "no"},
+            {"pages_per_sec": 40.0, "p99_ms": 10.0, "skipped": "no"},
+            {"pages_per_sec": 90.0, "p99_ms": 12.0, "skipped": "no"},
+        ]
+
+        assert bench.median_metrics(runs) == {"pages_per_sec": 90.0, "p99_ms": 12.0, "skipped": "no"}
+
+    def test_missing_metric_not_averaged(self):
+        """Test a metric absent from some run keeps the first run's value"""
+        assert bench.median_metrics([{"peak_rss_kb": 10}, {"peak_rss_kb": None}]) == {"peak_rss_kb": 10}
+
+    def test_integer_counts_stay_integers(self):
+        """Test integer metrics take a run's value rather than an average of two"""
+        assert bench.median_metrics([{"pages": 4}, {"pages": 5}]) == {"pages": 4}
+
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    samples = list(range(1, 101))
+    assert bench.percentile(samples, 50) == 50
+    assert bench.percentile(samples, 99) == 99
+    assert bench.percentile([], 50) is None
@@ -0,0 +1,129 @@
+"""
+Unit tests for calendar_client.py
+"""
+from unittest.mock import Mock, patch
+
+import calendar_client
+from calendar_client import CalendarClient, build_meet_event, meet_link
+
+
+class FakeBatch:
+    """Batch request that answers each insert from FakeService.respond"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append(len(self.requests))
+        for request_id, body in self.requests:
+            response, error = self.service.respond(body)
+            if response is None and error is None:
+                continue  # the batch response had no part for this request
+            self.callback(request_id, response, error)
+
+
+class FakeService:
+    """Minimal calendar v3 service supporting batched event inserts"""
+
+    def __init__(self):
+        self.batches = []
+
+    def respond(self, body):
+        email = body["attendees"][0]["email"]
+        if email.startswith("bad"):
+            return None, Exception("forbidden")
+        if email.startswith("lost"):
+            return None, None
+        return {"id": f"evt-{email}", "conferenceData": {"entryPoints": [{"uri": f"https://meet/{email}"}]}}, None
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def events(self):
+        return Mock(insert=lambda **kwargs: kwargs["body"])
+
+
+def make_client(creds=None):
+    client = object.__new__(CalendarClient)
+    client.lock = calendar_client.threading.Lock()
+    client.creds = creds or Mock(valid=True)
+    client.service = FakeService()
+    client._request = Mock()
+    client.token_path = "unused"
+    return client
+
+
+def make_events(emails):
+    return [build_meet_event("Interview", "desc", "2024-01-20T14:00:00", "2024-01-20T15:00:00",
+                             email, email, request_id=f"meet-{email}") for email in emails]
+
+
+class TestInsertEvents:
+    """Tests for CalendarClient.insert_events"""
+
+    def test_results_in_input_order(self):
+        """Test each event gets its created event or error, in order"""
+        client = make_client()
+        results = client.insert_events(make_events(["a@x.com", "bad@x.com", "c@x.com"]))
+
+        assert results[0][0]["id"] == "evt-a@x.com"
+        assert results[1][0] is None and str(results[1][1]) == "forbidden"
+        assert meet_link(results[2][0]) == "https://meet/c@x.com"
+
+    def test_unanswered_request_reported_as_error(self):
+        """Test an insert the batch never answered gets an error instead of (None, None)"""
+        client = make_client()
+        results = client.insert_events(make_events(["a@x.com", "lost@x.com"]))
+
+        assert results[0][0]["id"] == "evt-a@x.com"
+        assert results[1][0] is None and str(results[1][1]) == "no batch response"
+
+    @patch('calendar_client.CALENDAR_BATCH_SIZE', 2)
+    def test_batches_requests(self):
+        """Test inserts are grouped into batches of CALENDAR_BATCH_SIZE"""
+        client = make_client()
+        client.insert_events(make_events([f"u{i}@x.com" for i in range(5)]))
+
+        assert client.service.batches == [2, 2, 1]
+
+    def test_refreshes_only_expired_credentials(self):
+        """Test credentials are refreshed once they stop being valid"""
+        creds = Mock(valid=True, refresh_token="r")
+        client = make_client(creds)
+        client._save_credentials = Mock()
+
+        client.insert_events(make_events(["a@x.com"]))
+        creds.refresh.assert_not_called()
+
+        creds.valid = False
+        client.insert_events(make_events(["a@x.com"]))
+        creds.refresh.assert_called_once()
+        client._save_credentials.assert_called_once_with(creds)
+
+
+class TestSharedClient:
+    """Tests for the process-wide calendar client"""
+
+    def test_built_once(self):
+        """Test get_calendar_client reuses one client until reset"""
+        calendar_client.reset_calendar_client()
+        with patch('calendar_client.CalendarClient') as mock_client:
+            first = calendar_client.get_calendar_client()
+            second = calendar_client.get_calendar_client()
+            calendar_client.reset_calendar_client()
+            third = calendar_client.get_calendar_client()
+        calendar_client.reset_calendar_client()
+
+        assert first is second
+        assert mock_client.call_count == 2
+        assert third is mock_client.return_value
+
+
+def test_meet_link_missing():
+    """Test meet_link without conference data"""
+    assert meet_link({"id": "1"}) is None
@@ -0,0 +1,226 @@
+"""
+Unit tests for candidate_store.py
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+import candidate_store
+import new_agent
+
+
+class FakeAPI:
+    """Serves self.candidates[test_id] page by page and records offsets"""
+    
+    def __init__(self):
+        self.candidates = {}
+        self.offsets = []
+    
+    def get_page(self, session, test_id, offset=0):
+        self.offsets.append(offset)
+        rows = self.candidates.get(test_id, [])
+        return {
+            "data": [dict(c) for c in rows[offset:offset + new_agent.LIMIT]],
+            "next": "more" if offset + new_agent.LIMIT < len(rows) else None,
+        }
+
+
+def attempt(i, score=50, completed=True):
+    return {
+        "id": i,
+        "email": f"user{i}@example.com",
+        "percentage_score": score,
+        "completed_at": "2024-01-15T10:00:00Z" if completed else None,
+    }
+
+
+@pytest.fixture
+def api():
+    fake = FakeAPI()
+    with patch('new_agent.get_candidates_page', side_effect=fake.get_page):
+        yield fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = candidate_store.CandidateStore(str(tmp_path / "candidates.db"))
+    yield store
+    store.close()
+
+
+class TestCandidateStoreSync:
+    """Tests for CandidateStore.sync"""
+    
+    def test_initial_sync_stores_everything_in_order(self, api, store):
+        """Test the first sync downloads every page"""
+        api.candidates[1] = [attempt(i) for i in range(120)]
+        
+        changed = store.sync(Mock(), 1)
+        
+        assert changed == 120
+        assert api.offsets == [0, 50, 100]
+        assert store.candidates(1) == api.candidates[1]
+    
+    def test_delta_sync_starts_at_high_water(self, api, store):
+        """Test re-syncs only fetch from the last page onwards"""
+        api.candidates[1] = [attempt(i) for i in range(120)]
+        store.sync(Mock(), 1)
+        api.offsets.clear()
+        
+        api.candidates[1] += [attempt(i) for i in range(120, 180)]
+        changed = store.sync(Mock(), 1)
+        
+        assert api.offsets == [100, 150]
+        assert changed == 60
+        assert store.count(1) == 180
+        assert [c["id"] for c in store.candidates(1)] == list(range(180))
+    
+    def test_delta_sync_revisits_incomplete_attempts(self, api, store):
+        """Test attempts without completed_at are re-checked on later syncs"""
+        api.candidates[1] = [attempt(i) for i in range(120)]
+        api.candidates[1][60] = attempt(60, score=0, completed=False)
+        store.sync(Mock(), 1)
+        api.offsets.clear()
+        
+        api.candidates[1][60] = attempt(60, score=91)
+        changed = store.sync(Mock(), 1)
+        
+        assert api.offsets == [50, 100]
+        assert changed == 1
+        assert store.candidates(1)[60]["percentage_score"] == 91
+    
+    def test_permanently_open_attempt_does_not_force_full_resync(self, api, store):
+        """Test an attempt that never completes on page 0 is outside the re-check window"""
+        api.candidates[1] = [attempt(i) for i in range(20 * new_agent.LIMIT)]
+        api.candidates[1][0] = attempt(0, score=0, completed=False)
+        store.sync(Mock(), 1)
+        api.offsets.clear()
+        
+        with patch('candidate_store.CANDIDATE_STORE_RECHECK_PAGES', 2):
+            store.sync(Mock(), 1)
+        
+        high_water = 19 * new_agent.LIMIT
+        assert api.offsets == [high_water]
+    
+    def test_id_less_attempts_sharing_an_email_kept_apart(self, api, store):
+        """Test two id-less attempts by the same email are stored as two rows"""
+        api.candidates[1] = [
+            {"email": "same@example.com", "percentage_score": 40, "completed_at": "x"},
+            {"email": "same@example.com", "percentage_score": 90, "completed_at": "y"},
+        ]
+        store.sync(Mock(), 1)
+        
+        assert [c["percentage_score"] for c in store.candidates(1)] == [40, 90]
+    
+    def test_unchanged_resync_reports_no_changes(self, api, store):
+        """Test that an unchanged test upserts nothing"""
+        api.candidates[1] = [attempt(i) for i in range(10)]
+        store.sync(Mock(), 1)
+        
+        assert store.sync(Mock(), 1) == 0
+    
+    def test_tests_are_isolated(self, api, store):
+        """Test that candidates are stored per test"""
+        api.candidates[1] = [attempt(i) for i in range(3)]
+        api.candidates[2] = [attempt(i) for i in range(5)]
+        store.sync(Mock(), 1)
+        store.sync(Mock(), 2)
+        
+        assert store.count(1) == 3
+        assert store.count(2) == 5
+    
+    def test_store_persists_across_instances(self, api, tmp_path):
+        """Test that a reopened store keeps synced data"""
+        path = str(tmp_path / "candidates.db")
+        api.candidates[1] = [attempt(i) for i in range(7)]
+        first = candidate_store.CandidateStore(path)
+        first.sync(Mock(), 1)
+        first.close()
+        
+        second = candidate_store.CandidateStore(path)
+        assert second.candidates(1) == api.candidates[1]
+        second.close()
+
+
+class TestCandidateStoreGetCandidates:
+    """Tests for CandidateStore.get_candidates staleness handling"""
+    
+    def test_fresh_store_skips_network(self, api, store):
+        """Test that data younger than max_age is served from disk"""
+        api.candidates[1] = [attempt(i) for i in range(3)]
+        store.get_candidates(Mock(), 1, max_age=60)
+        api.offsets.clear()
+        
+        result = store.get_candidates(Mock(), 1, max_age=60)
+        
+        assert len(result) == 3
+        assert api.offsets == []
+    
+    def test_stale_store_syncs(self, api, store):
+        """Test that stale data triggers a delta sync"""
+        api.candidates[1] = [attempt(i) for i in range(3)]
+        store.get_candidates(Mock(), 1, max_age=60)
+        api.offsets.clear()
+        
+        store.get_candidates(Mock(), 1, max_age=0)
+        
+        assert api.offsets == [0]
+
+
+class TestCandidateStoreScores:
+    """Tests for reading scores without decoding candidates"""
+    
+    def test_scores_follow_extract_score(self, api, store):
+        """Test stored scores fall back to score, then 0, like extract_score"""
+        api.candidates[1] = [
+            attempt(0, score=80),
+            {"id": 1, "percentage_score": None, "score": 40},
+            {"id": 2, "percentage_score": "n/a"},
+        ]
+        
+        store.refresh(Mock(), 1, max_age=60)
+        
+        assert store.scores(1) == [80, 40, 0]
+
+
+class TestCandidateStoreAggregates:
+    """Tests for score aggregates kept current by syncs"""
+    
+    def test_delta_sync_updates_aggregate_in_place(self, api, store):
+        """Test re-synced attempts update the aggregate without rebuilding it"""
+        api.candidates[1] = [attempt(i, score=0, completed=False) for i in range(3)]
+        aggregate = store.get_aggregate(Mock(), 1, max_age=60)
+        assert (aggregate.attempts, aggregate.scored) == (3, 0)
+        
+        api.candidates[1][1] = attempt(1, score=90)
+        api.candidates[1].append(attempt(3, score=70))
+        
+        with patch.object(store, 'scores', side_effect=AssertionError("re-read")):
+            updated = store.get_aggregate(Mock(), 1, max_age=0)
+        
+        assert updated is aggregate
+        assert (aggregate.attempts, aggregate.scored) == (4, 2)
+        assert aggregate.summary()["mean"] == 80
+
+
+    def test_removed_maximum_rebuilt_exactly(self, api, store):
+        """Test a re-synced attempt that held the max score leaves an exact max"""
+        api.candidates[1] = [attempt(0, score=90.1), attempt(1, score=90.2),
+                             attempt(2, score=90.4, completed=False)]
+        store.get_aggregate(Mock(), 1, max_age=60)
+        
+        api.candidates[1][2] = attempt(2, score=50)
+        aggregate = store.get_aggregate(Mock(), 1, max_age=0)
+        
+        assert not aggregate.dirty
+        assert aggregate.summary()["max"] == 90.2
+        assert store.peek_aggregate(1) is aggregate
+        assert store.peek_aggregate(2) is None
+
+
+class TestDefaultStore:
+    """Tests for get_default_store"""
+    
+    @patch('candidate_store.CANDIDATE_STORE_PATH', '')
+    def test_disabled_without_path(self):
+        """Test that no store is used when CANDIDATE_STORE_PATH is unset"""
+        assert candidate_store.get_default_store() is None
@@ -0,0 +1,89 @@
+"""
+Unit tests for email_delivery.py
+"""
+import email
+import socket
+
+import email_delivery
+from email_delivery import SMTPPool, build_message, send_bulk
+
+
+def make_pool(sink, **kwargs):
+    return SMTPPool(host=sink.host, port=sink.port, username="", use_tls=False, **kwargs)
+
+
+def make_messages(count, prefix="user"):
+    return [build_message(f"{prefix}{i}@example.com", "Subject", f"Body {i}", sender="hr@example.com")
+            for i in range(count)]
+
+
+class TestSMTPPool:
+    """Tests for SMTPPool against a local SMTP sink"""
+
+    def test_reuses_connections(self, smtp_sink):
+        """Test many messages share the pool's persistent connections"""
+        pool = make_pool(smtp_sink, size=2)
+        results = send_bulk(pool, make_messages(20))
+        pool.close()
+
+        assert [r["status"] for r in results] == ["sent"] * 20
+        assert len(smtp_sink.messages) == 20
+        assert pool.connections_opened <= 2
+        assert smtp_sink.connections <= 2
+
+    def test_per_recipient_failures(self, smtp_sink):
+        """Test a refused recipient fails alone and the connection keeps working"""
+        smtp_sink.refuse.add("user1@example.com")
+        pool = make_pool(smtp_sink, size=1)
+        results = send_bulk(pool, make_messages(3))
+        pool.close()
+
+        assert [r["status"] for r in results] == ["sent", "failed", "sent"]
+        assert "user1@example.com" in results[1]["error"]
+        assert pool.connections_opened == 1
+
+    def test_reconnects_after_max_messages(self, smtp_sink):
+        """Test connections are recycled after max_messages"""
+        pool = make_pool(smtp_sink, size=1, max_messages=2)
+        send_bulk(pool, make_messages(5))
+        pool.close()
+
+        assert pool.connections_opened == 3
+
+    def test_reconnects_dropped_connection(self, smtp_sink):
+        """Test a connection closed by the server is reopened transparently"""
+        pool = make_pool(smtp_sink, size=1)
+        pool.send(make_messages(1)[0])
+        pool.idle.queue[0].sock.shutdown(socket.SHUT_RDWR)
+        pool.send(make_messages(1, "again")[0])
+        pool.close()
+
+        assert len(smtp_sink.messages) == 2
+        assert pool.connections_opened == 2
+
+    def test_message_content(self, smtp_sink):
+        """Test the delivered message has the right headers and body"""
+        pool = make_pool(smtp_sink)
+        pool.send(build_message("a@example.com", "Welcome", "Hello A", sender="hr@example.com"))
+        pool.close()
+
+        _, recipients, raw = smtp_sink.messages[0]
+        message = email.message_from_bytes(raw)
+        assert recipients == ["a@example.com"]
+        assert message["Subject"] == "Welcome"
+        assert message.get_payload().strip() == "Hello A"
+
+
+class TestSharedPool:
+    """Tests for the process-wide SMTP pool"""
+
+    def test_built_once(self, monkeypatch):
+        """Test get_smtp_pool reuses one pool until reset"""
+        monkeypatch.setattr(email_delivery, "SMTP_HOST", "smtp.example.com")
+        email_delivery.reset_smtp_pool()
+        pool = email_delivery.get_smtp_pool()
+
+        assert email_delivery.get_smtp_pool() is pool
+        email_delivery.reset_smtp_pool()
+        assert email_delivery.get_smtp_pool() is not pool
+        email_delivery.reset_smtp_pool()
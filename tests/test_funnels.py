@@ -0,0 +1,156 @@
+"""
+Unit tests for funnels.py
+"""
+import json
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+
+import funnels
+
+
+def candidates(prefix, scores):
+    return [{"email": f"{prefix}{i}@example.com", "percentage_score": s} for i, s in enumerate(scores)]
+
+
+class TestLoadFunnels:
+    """Tests for funnel config loading"""
+
+    def test_defaults_filled_in(self, tmp_path):
+        """Test names and pass scores default when omitted"""
+        path = tmp_path / "funnels.json"
+        path.write_text(json.dumps({"funnels": [{"test_a_id": 1, "test_b_id": 2}]}))
+
+        config = funnels.load_funnels(str(path))
+
+        funnel = config["funnels"][0]
+        assert funnel["name"] == "1->2"
+        assert funnel["test_a_pass_score"] == funnels.new_agent.TEST_A_PASS_SCORE
+        assert config["concurrency"] == funnels.FUNNEL_CONCURRENCY
+
+    def test_bare_list_accepted(self):
+        """Test a plain list of funnels is a valid config"""
+        config = funnels.normalize_config([{"name": "x", "test_a_id": 1, "test_b_id": 2}])
+
+        assert config["funnels"][0]["name"] == "x"
+
+    @pytest.mark.parametrize("config", [{}, {"funnels": []}, {"funnels": [{"test_a_id": 1}]}])
+    def test_invalid_config(self, config):
+        """Test malformed configs are rejected"""
+        with pytest.raises(ValueError):
+            funnels.normalize_config(config)
+
+
+class TestRunFunnels:
+    """Tests for run_funnels"""
+
+    def make_invite(self, delay=0.0):
+        invited = []
+        lock = threading.Lock()
+
+        def invite(test_id, candidate):
+            time.sleep(delay)
+            with lock:
+                invited.append((test_id, candidate["email"]))
+            return Mock(status_code=201)
+
+        invite.invited = invited
+        return invite
+
+    def test_shared_tests_fetched_once(self):
+        """Test a test read by several funnels is fetched once"""
+        data = {1: candidates("a", [90, 50]), 2: [], 3: []}
+        fetched = []
+
+        def fetch(test_id):
+            fetched.append(test_id)
+            return data[test_id]
+
+        config = {"invite_rate_per_sec": 0, "funnels": [
+            {"test_a_id": 1, "test_b_id": 2},
+            {"test_a_id": 1, "test_b_id": 3},
+        ]}
+        report = funnels.run_funnels(config, fetch=fetch, invite=self.make_invite())
+
+        assert sorted(fetched) == [1, 2, 3]
+        assert report["tests_fetched"] == 3
+        assert report["fetches_shared"] == 1
+        assert report["totals"]["invited"] == 2
+
+    def test_candidate_invited_once_per_test_b(self):
+        """Test funnels feeding the same Test B never invite a candidate twice"""
+        data = {
+            1: candidates("a", [90, 90]),
+            2: candidates("a", [90]),
+            3: [{"email": "a0@example.com", "percentage_score": None}],
+        }
+        invite = self.make_invite()
+        config = {"invite_rate_per_sec": 0, "funnels": [
+            {"test_a_id": 1, "test_b_id": 3},
+            {"test_a_id": 2, "test_b_id": 3},
+        ]}
+
+        report = funnels.run_funnels(config, fetch=data.__getitem__, invite=invite)
+
+        assert invite.invited == [(3, "a1@example.com")]
+        assert report["totals"]["already_on_roster"] == 2
+
+    def test_failed_funnel_reported(self):
+        """Test one funnel failing does not stop the others"""
+        def fetch(test_id):
+            if test_id == 9:
+                raise Exception("Failed: 500")
+            return candidates("a", [90]) if test_id == 1 else []
+
+        config = {"invite_rate_per_sec": 0, "funnels": [
+            {"name": "ok", "test_a_id": 1, "test_b_id": 2},
+            {"name": "broken", "test_a_id": 9, "test_b_id": 2},
+        ]}
+        report = funnels.run_funnels(config, fetch=fetch, invite=self.make_invite())
+
+        assert report["funnels"][0]["invited"] == 1
+        assert report["funnels"][1]["error"] == "Failed: 500"
+        assert report["totals"] == {
+            "funnels": 2, "succeeded": 1, "failed": 1, "passed_a": 1, "invited": 1,
+            "invite_failed": 0, "passed_b": 0, "recruiter_ready_count": 0, "already_on_roster": 0,
+        }
+
+    def test_invite_concurrency_shared(self):
+        """Test in-flight invites across all funnels stay within the global budget"""
+        in_flight = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def invite(test_id, candidate):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return Mock(status_code=201)
+
+        data = {i: candidates(f"t{i}-", [90] * 6) for i in range(1, 5)}
+        data.update({i: [] for i in range(11, 15)})
+        config = {"invite_rate_per_sec": 0, "invite_concurrency": 2, "concurrency": 4, "funnels": [
+            {"test_a_id": i, "test_b_id": 10 + i} for i in range(1, 5)
+        ]}
+
+        report = funnels.run_funnels(config, fetch=data.__getitem__, invite=invite)
+
+        assert report["totals"]["invited"] == 24
+        assert peak[0] <= 2
+
+    def test_recruiter_ready_joined_to_test_a(self):
+        """Test Test B passers are listed with their Test A score"""
+        data = {1: candidates("a", [80]), 2: candidates("a", [95])}
+
+        report = funnels.run_funnels(
+            {"invite_rate_per_sec": 0, "funnels": [{"test_a_id": 1, "test_b_id": 2}]},
+            fetch=data.__getitem__, invite=self.make_invite()
+        )
+
+        assert report["funnels"][0]["recruiter_ready_candidates"] == [
+            {"email": "a0@example.com", "name": None, "score": 95, "test_a_score": 80}
+        ]
@@ -0,0 +1,231 @@
+"""
+Unit tests for invite_engine.py
+"""
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import invite_engine
+
+
+class TestParseRetryAfter:
+    """Tests for parse_retry_after function"""
+    
+    def test_seconds(self):
+        """Test numeric Retry-After values"""
+        assert invite_engine.parse_retry_after("3") == 3.0
+    
+    def test_http_date(self):
+        """Test HTTP-date Retry-After values"""
+        import email.utils
+        value = email.utils.formatdate(time.time() + 10, usegmt=True)
+        assert 8 <= invite_engine.parse_retry_after(value) <= 10
+    
+    def test_missing_or_invalid(self):
+        """Test missing and unparseable values"""
+        assert invite_engine.parse_retry_after(None) is None
+        assert invite_engine.parse_retry_after("soon") is None
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket class"""
+    
+    def test_rate_limits_calls(self):
+        """Test that acquire paces callers to the configured rate"""
+        bucket = invite_engine.TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        assert elapsed >= 0.18
+    
+    def test_unlimited_rate(self):
+        """Test that a zero rate never blocks"""
+        bucket = invite_engine.TokenBucket(rate=0)
+        for _ in range(1000):
+            bucket.acquire()
+    
+    def test_throttle_halves_rate_and_recover_restores(self):
+        """Test AIMD adaptation"""
+        bucket = invite_engine.TokenBucket(rate=10)
+        bucket.throttle(0)
+        assert bucket.rate == 5
+        for _ in range(100):
+            bucket.recover()
+        assert bucket.rate == 10
+    
+    def test_throttle_pauses_callers(self):
+        """Test that throttle blocks acquire for the given delay"""
+        bucket = invite_engine.TokenBucket(rate=1000)
+        bucket.throttle(0.1)
+        start = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+    
+    def test_throttle_pauses_unlimited_callers(self):
+        """Test that a zero-rate bucket still waits out a throttle and stays unlimited"""
+        bucket = invite_engine.TokenBucket(rate=0)
+        bucket.throttle(0.1)
+        start = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+        assert bucket.rate == 0
+
+
+class TestBulkInvite:
+    """Tests for bulk_invite function"""
+    
+    def test_all_invited(self, response):
+        """Test report when every invite succeeds"""
+        candidates = [{"email": f"user{i}@example.com"} for i in range(20)]
+        invite_fn = Mock(return_value=response(201))
+        
+        report = invite_engine.bulk_invite(invite_fn, candidates, concurrency=4, rate=0)
+        
+        assert report["total"] == 20
+        assert report["invited"] == 20
+        assert report["failed"] == 0
+        assert [r["email"] for r in report["results"]] == [c["email"] for c in candidates]
+        assert invite_fn.call_count == 20
+    
+    def test_failures_and_skips_reported(self, response):
+        """Test that errors, rejections and skipped candidates are reported"""
+        def invite_fn(candidate):
+            if not candidate.get("email"):
+                return None
+            if candidate["email"] == "bad@example.com":
+                return response(400, text="Bad Request")
+            if candidate["email"] == "boom@example.com":
+                raise Exception("connection reset")
+            return response(200)
+        
+        candidates = [
+            {"email": "ok@example.com"},
+            {"email": "bad@example.com"},
+            {"email": "boom@example.com"},
+            {"name": "No Email"},
+        ]
+        report = invite_engine.bulk_invite(invite_fn, candidates, rate=0)
+        
+        statuses = [r["status"] for r in report["results"]]
+        assert statuses == ["invited", "failed", "failed", "skipped"]
+        assert report["results"][1]["error"] == "Bad Request"
+        assert report["results"][2]["error"] == "connection reset"
+        assert report["invited"] == 1
+        assert report["failed"] == 2
+        assert report["skipped"] == 1
+    
+    def test_retries_on_429_with_retry_after(self, response):
+        """Test that 429 responses are retried after Retry-After"""
+        calls = []
+        
+        def invite_fn(candidate):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return response(429, headers={"Retry-After": "0.1"})
+            return response(201)
+        
+        report = invite_engine.bulk_invite(invite_fn, [{"email": "a@example.com"}], rate=100)
+        
+        assert report["invited"] == 1
+        assert report["throttled"] == 1
+        assert report["results"][0]["attempts"] == 2
+        assert calls[1] - calls[0] >= 0.09
+    
+    def test_retry_after_honoured_at_unlimited_rate(self, response):
+        """Test that rate=0 still waits Retry-After between 429 retries"""
+        calls = []
+        
+        def invite_fn(candidate):
+            calls.append(time.monotonic())
+            if len(calls) < 3:
+                return response(429, headers={"Retry-After": "0.1"})
+            return response(201)
+        
+        report = invite_engine.bulk_invite(invite_fn, [{"email": "a@example.com"}], rate=0)
+        
+        assert report["invited"] == 1
+        assert report["results"][0]["attempts"] == 3
+        assert calls[1] - calls[0] >= 0.09
+        assert calls[2] - calls[1] >= 0.09
+    
+    @patch('invite_engine.backoff_delay', return_value=0)
+    def test_gives_up_after_max_retries(self, mock_delay, response):
+        """Test that persistent 429s end as failures"""
+        invite_fn = Mock(return_value=response(429, text="Too Many Requests"))
+        
+        report = invite_engine.bulk_invite(
+            invite_fn, [{"email": "a@example.com"}], rate=100, max_retries=2
+        )
+        
+        assert report["failed"] == 1
+        assert report["results"][0]["attempts"] == 3
+        assert invite_fn.call_count == 3
+    
+    def test_concurrency_bound(self, response):
+        """Test that no more than `concurrency` invites run at once"""
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+        
+        def invite_fn(candidate):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return response(201)
+        
+        candidates = [{"email": f"user{i}@example.com"} for i in range(30)]
+        invite_engine.bulk_invite(invite_fn, candidates, concurrency=3, rate=0)
+        
+        assert peak[0] <= 3
+
+
+class TestBackoffDelay:
+    """Tests for backoff_delay function"""
+    
+    def test_prefers_retry_after(self):
+        """Test that Retry-After overrides exponential backoff"""
+        assert invite_engine.backoff_delay(3, retry_after=2.0) == 2.0
+    
+    def test_exponential_growth_is_capped(self):
+        """Test jittered exponential backoff stays under the cap"""
+        assert invite_engine.backoff_delay(1) <= invite_engine.BACKOFF_BASE_SECONDS
+        assert invite_engine.backoff_delay(50) <= invite_engine.BACKOFF_MAX_SECONDS
+
+
+class TestIterBulkInvite:
+    """Tests for the streaming iter_bulk_invite generator"""
+    
+    def test_consumes_input_lazily(self, response):
+        """Test that only a bounded window of candidates is pulled ahead"""
+        pulled = [0]
+        
+        def candidates():
+            for i in range(1000):
+                pulled[0] += 1
+                yield {"email": f"user{i}@example.com"}
+        
+        stream = invite_engine.iter_bulk_invite(
+            Mock(return_value=response(201)), candidates(), concurrency=2, rate=0
+        )
+        first = next(stream)
+        
+        assert first["status"] == "invited"
+        assert pulled[0] <= 4
+        stream.close()
+    
+    def test_yields_in_input_order(self, response):
+        """Test results come back in input order despite concurrency"""
+        import random
+        
+        def invite_fn(candidate):
+            time.sleep(random.uniform(0, 0.005))
+            return response(201)
+        
+        candidates = [{"email": f"user{i}@example.com"} for i in range(50)]
+        results = list(invite_engine.iter_bulk_invite(invite_fn, candidates, concurrency=5, rate=0))
+        
+        assert [r["email"] for r in results] == [c["email"] for c in candidates]
@@ -0,0 +1,148 @@
+"""
+Unit tests for jobs.py (background jobs with progress polling)
+"""
+import threading
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture
+def manager():
+    manager = jobs.JobManager(workers=2, history=100)
+    yield manager
+    manager.shutdown(wait=True)
+
+
+class TestJobManager:
+    """Tests for JobManager"""
+    
+    def test_submit_returns_before_job_runs(self, manager):
+        """Test submit returns a queued or running job while the call is blocked"""
+        release = threading.Event()
+        job = manager.submit("demo", lambda: release.wait(5) and {"ok": True})
+        
+        assert job.status in (jobs.QUEUED, jobs.RUNNING)
+        assert manager.get(job.id) is job
+        release.set()
+        assert manager.wait(job.id, timeout=5)
+        assert job.status == jobs.SUCCEEDED
+        assert job.snapshot(include_result=True)["result"] == {"ok": True}
+    
+    def test_progress_reported_from_inside_job(self, manager):
+        """Test stage and counters set by the running code show up in the snapshot"""
+        def work():
+            jobs.set_stage("fetch")
+            jobs.advance(pages_fetched=1)
+            jobs.advance(pages_fetched=2, candidates_fetched=100)
+            return "done"
+        
+        job = manager.submit("demo", work)
+        manager.wait(job.id, timeout=5)
+        
+        snapshot = job.snapshot()
+        assert snapshot["progress"] == {"pages_fetched": 3, "candidates_fetched": 100}
+        assert snapshot["stage"] == "done"
+        assert "result" not in snapshot
+    
+    def test_helpers_are_noops_outside_a_job(self):
+        """Test progress helpers do nothing when not running as a job"""
+        assert jobs.current_job() is None
+        jobs.set_stage("x")
+        jobs.advance(pages_fetched=1)
+        jobs.check_cancelled()
+    
+    def test_cancel_running_job(self, manager):
+        """Test a running job stops at its next check_cancelled"""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def work():
+            started.set()
+            release.wait(5)
+            jobs.check_cancelled()
+            return "finished anyway"
+        
+        job = manager.submit("demo", work)
+        assert started.wait(5)
+        manager.cancel(job.id)
+        assert job.snapshot()["cancel_requested"]
+        release.set()
+        manager.wait(job.id, timeout=5)
+        
+        assert job.status == jobs.CANCELLED
+        assert job.result is None
+    
+    def test_cancel_queued_job_never_starts(self):
+        """Test a job cancelled while queued does not run"""
+        manager = jobs.JobManager(workers=1)
+        release = threading.Event()
+        ran = []
+        try:
+            blocker = manager.submit("demo", release.wait, 5)
+            queued = manager.submit("demo", lambda: ran.append(True))
+            manager.cancel(queued.id)
+            release.set()
+            assert manager.wait(queued.id, timeout=5)
+        finally:
+            manager.shutdown(wait=True)
+        
+        assert blocker.status == jobs.SUCCEEDED
+        assert queued.status == jobs.CANCELLED
+        assert ran == []
+    
+    def test_exception_and_error_result_mark_job_failed(self, manager):
+        """Test a raised exception or an {"error": ...} result fails the job"""
+        def boom():
+            raise RuntimeError("boom")
+        
+        raised = manager.submit("demo", boom)
+        returned = manager.submit("demo", lambda: {"error": "bad test id"})
+        manager.wait(raised.id, timeout=5)
+        manager.wait(returned.id, timeout=5)
+        
+        assert raised.status == jobs.FAILED
+        assert raised.error == "boom"
+        assert returned.status == jobs.FAILED
+        assert returned.snapshot(include_result=True)["result"] == {"error": "bad test id"}
+    
+    def test_finished_jobs_pruned_beyond_history(self):
+        """Test only the newest JOB_HISTORY finished jobs are kept"""
+        manager = jobs.JobManager(workers=1, history=2)
+        try:
+            submitted = []
+            for i in range(4):
+                job = manager.submit("demo", lambda i=i: i)
+                manager.wait(job.id, timeout=5)
+                submitted.append(job)
+            latest = manager.submit("demo", lambda: "latest")
+            manager.wait(latest.id, timeout=5)
+        finally:
+            manager.shutdown(wait=True)
+        
+        kept = [job.id for job in manager.list()]
+        assert submitted[0].id not in kept
+        assert latest.id in kept
+        assert manager.get("missing") is None
+    
+    def test_cancel_unknown_job(self, manager):
+        """Test cancelling an unknown ID returns None"""
+        assert manager.cancel("nope") is None
+    
+    def test_same_key_reuses_active_job(self, manager):
+        """Test a second submit with the key of a queued or running job returns that job"""
+        release = threading.Event()
+        first = manager.submit("demo", release.wait, 5, job_key=("pair", 1, 2))
+        
+        again = manager.submit("demo", release.wait, 5, job_key=("pair", 1, 2))
+        other = manager.submit("demo", lambda: "other", job_key=("pair", 1, 3))
+        
+        assert again is first
+        assert other is not first
+        assert manager.active(("pair", 1, 2)) is first
+        release.set()
+        manager.wait(first.id, timeout=5)
+        manager.wait(other.id, timeout=5)
+        assert manager.active(("pair", 1, 2)) is None
+        assert manager.submit("demo", lambda: "rerun", job_key=("pair", 1, 2)) is not first
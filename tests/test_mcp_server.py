@@ -2,7 +2,7 @@
 Unit tests for mcp_server.py
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 import json
 import os
 
@@ -67,6 +67,30 @@ class TestSendEmailToCandidates:
         assert len(result["successful"]) == 1
 
 
+    def test_send_email_over_smtp(self, smtp_sink):
+        """Test real delivery through the SMTP pool when SMTP_HOST is set"""
+        import email_delivery
+        smtp_sink.refuse.add("bob@example.com")
+        candidates = [
+            {"email": "alice@example.com", "name": "Alice", "score": 85},
+            {"email": "bob@example.com", "name": "Bob", "score": 90}
+        ]
+        
+        email_delivery.reset_smtp_pool()
+        with patch.object(email_delivery, 'SMTP_HOST', smtp_sink.host), \
+                patch.object(email_delivery, 'SMTP_PORT', smtp_sink.port), \
+                patch.object(email_delivery, 'SMTP_USE_TLS', False), \
+                patch.object(email_delivery, 'SMTP_USERNAME', ''), \
+                patch.object(email_delivery, 'EMAIL_FROM', 'hr@example.com'):
+            result = mcp_server.send_email_to_candidates(candidates, email_template="Hi {name}: {score}%")
+        email_delivery.reset_smtp_pool()
+        
+        assert result["emails_sent"] == 1
+        assert result["successful"][0]["email"] == "alice@example.com"
+        assert result["failed"][0]["email"] == "bob@example.com"
+        assert b"Hi Alice: 85%" in smtp_sink.messages[0][2]
+
+
 class TestGetTestCandidates:
     """Tests for get_test_candidates MCP tool"""
     
@@ -166,6 +190,7 @@ class TestInviteCandidatesToTest:
         """Test successful invitation of candidates"""
         mock_session = Mock()
         mock_make_session.return_value = mock_session
+        mock_invite.return_value = Mock(status_code=201)
         
         emails = ["alice@example.com", "bob@example.com"]
         result = mcp_server.invite_candidates_to_test(12345, emails)
@@ -188,6 +213,7 @@ class TestInviteCandidatesToTest:
         def side_effect(session, test_id, candidate):
             if candidate["email"] == "bob@example.com":
                 raise Exception("Invalid email")
+            return Mock(status_code=201)
         
         mock_invite.side_effect = side_effect
         
@@ -200,6 +226,51 @@ class TestInviteCandidatesToTest:
         assert result["failed"][0]["email"] == "bob@example.com"
         assert "error" in result["failed"][0]
     
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.invite_to_test')
+    def test_invite_candidates_rejected_by_api(self, mock_invite, mock_make_session):
+        """Test that non-2xx invite responses are reported as failures"""
+        mock_make_session.return_value = Mock()
+        mock_invite.return_value = Mock(status_code=400, text="Bad Request")
+        
+        result = mcp_server.invite_candidates_to_test(12345, ["alice@example.com"])
+        
+        assert result["total_invited"] == 0
+        assert result["failed"] == [{"email": "alice@example.com", "error": "Bad Request"}]
+        assert result["results"][0]["status_code"] == 400
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    @patch('mcp_server.new_agent.invite_to_test')
+    def test_invite_candidates_skips_roster(self, mock_invite, mock_get_all, mock_make_session):
+        """Test candidates already on the roster are not invited again"""
+        mock_get_all.return_value = [{"email": "Alice@Example.com", "percentage_score": None}]
+        mock_invite.return_value = Mock(status_code=201)
+        
+        emails = ["alice@example.com", "bob@example.com", "bob@example.com"]
+        result = mcp_server.invite_candidates_to_test(12345, emails)
+        
+        assert result["successful"] == ["bob@example.com"]
+        assert result["already_invited"] == ["alice@example.com", "bob@example.com"]
+        assert result["roster_checked"] is True
+        assert mock_invite.call_count == 1
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    @patch('mcp_server.new_agent.invite_to_test')
+    def test_invite_candidates_roster_unavailable(self, mock_invite, mock_get_all, mock_make_session):
+        """Test invites still go out when the roster cannot be read"""
+        mock_get_all.side_effect = Exception("Failed: 503")
+        mock_invite.return_value = Mock(status_code=201)
+        
+        result = mcp_server.invite_candidates_to_test(12345, ["alice@example.com"])
+        
+        assert result["total_invited"] == 1
+        assert result["roster_checked"] is False
+    
     @patch('mcp_server.new_agent.make_session')
     @patch('mcp_server.new_agent.invite_to_test')
     def test_invite_candidates_empty_list(self, mock_invite, mock_make_session):
@@ -257,6 +328,7 @@ class TestRunScreeningPipeline:
         
         mock_get_all.side_effect = [candidates_a, candidates_b]
         mock_filter.side_effect = [passed_a, passed_b]
+        mock_invite.return_value = Mock(status_code=201)
         mock_extract_score.side_effect = lambda c: c.get("percentage_score", 0)
         mock_send_email.return_value = {
             "emails_sent": 1,
@@ -273,7 +345,10 @@ class TestRunScreeningPipeline:
         assert result["test_b"]["id"] == 200
         assert result["test_b"]["total_candidates"] == 1
         assert result["test_b"]["passed_count"] == 1
-        assert result["invited_to_test_b"] == 1
+        # Alice is already on the Test B roster, so she is not invited again
+        assert result["invited_to_test_b"] == 0
+        assert result["invite_results"]["already_on_roster"] == ["alice@example.com"]
+        mock_invite.assert_not_called()
         assert result["recruiter_ready_count"] == 1
         assert len(result["recruiter_ready_candidates"]) == 1
         assert result["recruiter_ready_candidates"][0]["email"] == "alice@example.com"
@@ -329,6 +404,61 @@ class TestRunScreeningPipeline:
             assert "test_b" in result
             assert "emails_sent" in result
     
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_candidates_page')
+    @patch('mcp_server.new_agent.invite_to_test')
+    @patch('mcp_server.send_email_to_candidates')
+    @patch('mcp_server.send_google_meet_invites_to_top_candidates')
+    def test_run_screening_pipeline_resumes_from_journal(self, mock_meet, mock_send_email,
+                                                         mock_invite, mock_get_page,
+                                                         mock_make_session, tmp_path):
+        """Test a failed run is resumed without re-inviting or re-emailing"""
+        candidates = {
+            100: [{"email": "alice@example.com", "percentage_score": 85}],
+            200: [{"email": "bob@example.com", "percentage_score": 90}],
+        }
+        mock_get_page.side_effect = lambda session, test_id, offset=0: {
+            "data": candidates[test_id], "next": None
+        }
+        mock_invite.return_value = Mock(status_code=201)
+        mock_send_email.return_value = {
+            "emails_sent": 1, "successful": [{"email": "bob@example.com"}], "failed": []
+        }
+        mock_meet.side_effect = Exception("Calendar down")
+        journal_path = str(tmp_path / "screening.jsonl")
+        
+        with patch('mcp_server.screening_journal_path', return_value=journal_path):
+            first = mcp_server.run_screening_pipeline(100, 200)
+            assert "error" in first
+            
+            mock_meet.side_effect = None
+            mock_meet.return_value = {"invites_sent": 1, "successful": [], "failed": []}
+            second = mcp_server.run_screening_pipeline(100, 200)
+        
+        assert second["resumed"] is True
+        assert mock_invite.call_count == 1
+        assert mock_send_email.call_args_list[1][0][0] == []
+        assert mock_get_page.call_count == 2
+    
+    def test_build_recruiter_ready_joins_normalised_emails(self):
+        """Test the Test A score join ignores email case and whitespace"""
+        candidates_a = [
+            {"email": "alice@example.com", "percentage_score": 85},
+            {"email": "carol@example.com", "percentage_score": 70},
+        ]
+        passed_b = [
+            {"email": "Alice@Example.com ", "full_name": "Alice", "percentage_score": 90},
+            {"email": "dave@example.com", "name": "Dave", "percentage_score": 88},
+        ]
+        
+        ready = mcp_server.build_recruiter_ready(passed_b, candidates_a)
+        
+        assert ready[0]["test_a_score"] == 85
+        assert ready[0]["name"] == "Alice"
+        assert ready[1]["test_a_score"] is None
+        assert ready[1]["score"] == 88
+    
     @patch('mcp_server.new_agent.make_session')
     def test_run_screening_pipeline_error_handling(self, mock_make_session):
         """Test error handling in pipeline"""
@@ -342,6 +472,99 @@ class TestRunScreeningPipeline:
         # If it occurred during execution, pipeline may still return partial results
 
 
+class TestRunScreeningFunnels:
+    """Tests for run_screening_funnels MCP tool"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_mock_funnels(self):
+        """Test mock mode screens every funnel from mock data"""
+        result = mcp_server.run_screening_funnels(funnels=[
+            {"name": "strict", "test_a_id": 356098, "test_b_id": 2263157, "test_b_pass_score": 95},
+            {"name": "lenient", "test_a_id": 356098, "test_b_id": 2263157, "test_b_pass_score": 80},
+        ])
+        
+        assert result["mock_data"] is True
+        assert [f["name"] for f in result["funnels"]] == ["strict", "lenient"]
+        assert result["tests_fetched"] == 2
+        # Mock Test A passers not on the Test B roster are invited once across both funnels
+        assert result["totals"]["invited"] == 1
+        assert result["funnels"][0]["recruiter_ready_count"] == 3
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_mock_invites_not_rate_limited(self):
+        """Test mock funnels do not pace fake invites through the invite rate limit"""
+        import funnels
+        with patch('funnels.TokenBucket', wraps=funnels.TokenBucket) as mock_bucket:
+            mcp_server.run_screening_funnels(funnels=[
+                {"test_a_id": 356098, "test_b_id": 2263157}
+            ])
+        
+        assert mock_bucket.call_args[0][0] == 0
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    @patch('mcp_server.new_agent.invite_to_test')
+    def test_real_funnels_share_cache(self, mock_invite, mock_get_all, mock_make_session, tmp_path):
+        """Test funnels read through the candidate cache and invalidate invited tests"""
+        mock_get_all.side_effect = lambda session, test_id: (
+            [{"email": "a@example.com", "percentage_score": 90}] if test_id == 1 else []
+        )
+        mock_invite.return_value = Mock(status_code=201)
+        config = tmp_path / "funnels.json"
+        config.write_text(json.dumps({"funnels": [{"test_a_id": 1, "test_b_id": 2}]}))
+        
+        result = mcp_server.run_screening_funnels(config_path=str(config))
+        
+        assert result["totals"]["invited"] == 1
+        assert mock_invite.call_args[0][1] == 2
+        assert mcp_server.CANDIDATE_CACHE.get(2) is None
+    
+    def test_missing_config(self, tmp_path):
+        """Test a missing config file is reported as an error"""
+        result = mcp_server.run_screening_funnels(config_path=str(tmp_path / "missing.json"))
+        
+        assert "error" in result
+
+
+class TestSendGoogleMeetInvites:
+    """Tests for send_google_meet_invites_to_top_candidates MCP tool"""
+    
+    CANDIDATES = [
+        {"email": "a@example.com", "name": "A", "score": 90},
+        {"email": "b@example.com", "name": "B", "score": 80},
+        {"name": "No Email", "score": 99},
+    ]
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.calendar_client.get_calendar_client')
+    def test_real_mode_inserts_in_one_call(self, mock_get_client):
+        """Test real mode reuses the shared client and inserts all events at once"""
+        client = mock_get_client.return_value
+        client.insert_events.side_effect = lambda events: [
+            ({"id": f"evt{i}", "htmlLink": "html", "conferenceData": {"entryPoints": [{"uri": "meet"}]}}, None)
+            if i == 0 else (None, Exception("quota"))
+            for i, _ in enumerate(events)
+        ]
+        
+        result = mcp_server.send_google_meet_invites_to_top_candidates(self.CANDIDATES, top_n=3)
+        
+        client.insert_events.assert_called_once()
+        assert len(client.insert_events.call_args[0][0]) == 2
+        assert result["invites_sent"] == 1
+        assert result["successful"][0]["meet_link"] == "meet"
+        assert {f.get("email") for f in result["failed"]} == {None, "b@example.com"}
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.calendar_client.get_calendar_client', side_effect=ImportError)
+    def test_fallback_without_google_libraries(self, mock_get_client):
+        """Test the placeholder fallback when the Google libraries are missing"""
+        result = mcp_server.send_google_meet_invites_to_top_candidates(self.CANDIDATES[:2], top_n=2)
+        
+        assert result["invites_sent"] == 2
+        assert all(not s["invite_sent"] for s in result["successful"])
+
+
 class TestGetCandidateScores:
     """Tests for get_candidate_scores MCP tool"""
     
@@ -410,6 +633,22 @@ class TestGetCandidateScores:
             assert result["filtered_count"] == 0
             assert len(result["candidates"]) == 0
     
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_get_candidate_scores_summary_and_sweep(self, mock_get_all, mock_make_session):
+        """Test score statistics and multi-threshold pass counts"""
+        mock_get_all.return_value = [
+            {"email": f"user{s}@example.com", "percentage_score": s} for s in (50, 70, 80, 90)
+        ]
+        
+        result = mcp_server.get_candidate_scores(12345, thresholds=[60, 80])
+        
+        assert result["score_summary"]["mean"] == 72.5
+        assert result["score_summary"]["min"] == 50
+        assert result["score_summary"]["max"] == 90
+        assert result["pass_counts"] == {"60": 3, "80": 2}
+    
     @patch('mcp_server.USE_MOCK_DATA', False)
     @patch('mcp_server.new_agent.make_session')
     def test_get_candidate_scores_error_handling(self, mock_make_session):
@@ -422,6 +661,291 @@ class TestGetCandidateScores:
         assert "Score Error" in result["error"]
 
 
+class TestGetTopCandidates:
+    """Tests for get_top_candidates MCP tool"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_single_test(self):
+        """Test ranking one test's candidates"""
+        result = mcp_server.get_top_candidates([356098], top_n=3)
+        
+        scores = sorted((c["percentage_score"] for c in mcp_server.get_mock_candidates(356098)), reverse=True)
+        assert [c["score"] for c in result["candidates"]] == scores[:3]
+        assert [c["rank"] for c in result["candidates"]] == [1, 2, 3]
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_across_tests(self):
+        """Test ranking across tests joins candidates by email"""
+        result = mcp_server.get_top_candidates([356098, 2263157], top_n=50, combine="max")
+        
+        emails = [c["email"] for c in result["candidates"]]
+        assert len(emails) == len(set(emails))
+        assert result["combine"] == "max"
+        assert all(set(c["scores"]) <= {"356098", "2263157"} for c in result["candidates"])
+    
+    def test_requires_test_ids(self):
+        """Test an empty test list is an error"""
+        assert "error" in mcp_server.get_top_candidates([])
+
+
+class TestConcurrentTools:
+    """Tests for blocking tools served off the event loop"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    def test_slow_tool_does_not_stall_quick_one(self):
+        """Test a quick call finishes while a slow call for another test is still running"""
+        import asyncio
+        import threading
+        release = threading.Event()
+        
+        def fake_fetch(test_id, session=None):
+            if test_id == 1:
+                release.wait(5)
+            return [{"email": "a@example.com", "percentage_score": 90}]
+        
+        async def scenario():
+            slow = asyncio.ensure_future(mcp_server.mcp.call_tool("get_test_candidates", {"test_id": 1}))
+            quick = await asyncio.wait_for(
+                mcp_server.mcp.call_tool("get_candidate_scores", {"test_id": 2}), timeout=2
+            )
+            finished_first = not slow.done()
+            release.set()
+            await slow
+            return quick, finished_first
+        
+        with patch('mcp_server.fetch_candidates', side_effect=fake_fetch), \
+             patch('mcp_server.prefetch_candidates', AsyncMock()):
+            quick, finished_first = asyncio.run(scenario())
+        
+        assert finished_first
+        assert "a@example.com" in str(quick)
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_tool_awaits_async_download(self, mock_get_all, fake_hackerrank_server):
+        """Test a tool call downloads its test with the async client before running off the loop"""
+        import asyncio
+        fake_hackerrank_server.candidates[3] = [
+            {"email": f"c{i}@example.com", "percentage_score": 50 + i} for i in range(60)
+        ]
+        
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(mcp_server.mcp.call_tool("get_test_candidates", {"test_id": 3}))
+        
+        mock_get_all.assert_not_called()
+        assert '"total_candidates": 60' in str(result)
+        assert len(mcp_server.CANDIDATE_CACHE.peek(3)) == 60
+        assert mcp_server.SCORE_AGGREGATES.peek(3).scored == 60
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_failed_prefetch_falls_back_to_tool(self, mock_get_all, fake_hackerrank_server):
+        """Test a failed async download leaves the tool to fetch the test itself"""
+        import asyncio
+        fake_hackerrank_server.status_overrides["/tests/3/candidates"] = 403
+        mock_get_all.return_value = [{"email": "a@example.com", "percentage_score": 90}]
+        
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = asyncio.run(mcp_server.mcp.call_tool("get_test_candidates", {"test_id": 3}))
+        
+        mock_get_all.assert_called_once()
+        assert "a@example.com" in str(result)
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    def test_stats_only_scores_skip_prefetch(self):
+        """Test statistics-only score calls download nothing up front"""
+        import asyncio
+        with patch('mcp_server.prefetch_candidates', AsyncMock()) as mock_prefetch:
+            asyncio.run(mcp_server.prefetch_scores(5, include_candidates=False))
+            asyncio.run(mcp_server.prefetch_scores(5))
+        
+        mock_prefetch.assert_awaited_once_with(5)
+    
+    def test_direct_calls_stay_synchronous(self):
+        """Test tools registered off the loop are still plain functions in Python"""
+        import inspect
+        assert not inspect.iscoroutinefunction(mcp_server.get_test_candidates)
+        assert not inspect.iscoroutinefunction(mcp_server.run_screening_pipeline)
+
+
+class TestFetchCandidates:
+    """Tests for the shared fetch_candidates helper"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.candidate_store.get_default_store')
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_reads_from_store_when_configured(self, mock_get_all, mock_make_session,
+                                              mock_get_store):
+        """Test that a configured candidate store replaces the full download"""
+        store = Mock()
+        store.get_candidates.return_value = [{"email": "a@example.com"}]
+        mock_get_store.return_value = store
+        
+        result = mcp_server.get_candidate_scores(12345)
+        
+        assert result["total_candidates"] == 1
+        store.get_candidates.assert_called_once_with(mock_make_session.return_value, 12345)
+        mock_get_all.assert_not_called()
+
+
+class TestCompactRecords:
+    """Tests that MCP tools accept compact CandidateRecord objects"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_tools_accept_records(self, mock_get_all, mock_make_session):
+        """Test get_test_candidates and get_candidate_scores with records"""
+        mock_get_all.return_value = [
+            mcp_server.new_agent.CandidateRecord(email="a@example.com", full_name="A",
+                                                 percentage_score=85, status=2),
+            mcp_server.new_agent.CandidateRecord(email="b@example.com", name="B", score=40),
+        ]
+        
+        passed = mcp_server.get_test_candidates(12345, 70.0)
+        scores = mcp_server.get_candidate_scores(12345, "b@example.com")
+        resource = json.loads(mcp_server.get_test_candidates_resource("12345"))
+        
+        assert passed["passed_candidates"] == [{"email": "a@example.com", "name": "A", "score": 85}]
+        assert scores["candidates"][0]["name"] == "B"
+        assert scores["candidates"][0]["score"] == 40
+        assert resource["candidate_count"] == 2
+
+
+class TestSharedSession:
+    """Tests that MCP tools share one pooled session"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.CANDIDATE_CACHE.ttl', 0)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_tools_reuse_session(self, mock_get_all, mock_make_session):
+        """Test consecutive tool calls do not build new sessions"""
+        mock_get_all.return_value = []
+        
+        mcp_server.get_test_candidates(1)
+        mcp_server.get_candidate_scores(2)
+        mcp_server.get_test_candidates_resource("3")
+        
+        mock_make_session.assert_called_once()
+        sessions = {c[0][0] for c in mock_get_all.call_args_list}
+        assert sessions == {mock_make_session.return_value}
+
+
+class TestCandidateCache:
+    """Tests for the shared candidate cache used by MCP reads"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_repeat_reads_hit_cache(self, mock_get_all, mock_make_session):
+        """Test back-to-back tool calls for a test download it once"""
+        mock_get_all.return_value = [{"email": "a@example.com", "percentage_score": 80}]
+        before = mcp_server.get_cache_stats()
+        
+        mcp_server.get_test_candidates(12345, 70.0)
+        mcp_server.get_candidate_scores(12345)
+        mcp_server.get_test_candidates_resource("12345")
+        
+        mock_get_all.assert_called_once()
+        stats = mcp_server.get_cache_stats()
+        assert stats["hits"] - before["hits"] == 2
+        assert stats["misses"] - before["misses"] == 1
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.invite_to_test')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_invites_invalidate_test(self, mock_get_all, mock_invite, mock_make_session):
+        """Test inviting to a test drops its cached candidates"""
+        mock_get_all.return_value = []
+        mock_invite.return_value = Mock(status_code=201)
+        
+        before = mcp_server.get_cache_stats()["invalidations"]
+        
+        mcp_server.get_candidate_scores(12345)
+        mcp_server.invite_candidates_to_test(12345, ["a@example.com"])
+        mcp_server.get_candidate_scores(12345)
+        
+        assert mock_get_all.call_count == 2
+        assert mcp_server.get_cache_stats()["invalidations"] - before == 1
+
+
+class TestCoalescedFetches:
+    """Tests for single-flight candidate downloads"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_concurrent_tool_calls_share_download(self, mock_get_all, mock_make_session):
+        """Test simultaneous calls for one test download it once, even with the cache off"""
+        import time
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from single_flight import SingleFlight
+        from ttl_cache import TTLCache
+        release = threading.Event()
+        
+        def slow_fetch(session, test_id):
+            release.wait(5)
+            return [{"email": "a@example.com", "percentage_score": 80}]
+        
+        mock_get_all.side_effect = slow_fetch
+        
+        with patch('mcp_server.CANDIDATE_CACHE', TTLCache(ttl=0)), \
+                patch('mcp_server.CANDIDATE_FETCHES', SingleFlight()):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(mcp_server.get_test_candidates, 12345, 70.0) for _ in range(4)]
+                while mcp_server.CANDIDATE_FETCHES.stats()["shared"] < 3:
+                    time.sleep(0.001)
+                release.set()
+                results = [f.result() for f in futures]
+        
+        mock_get_all.assert_called_once()
+        assert all(r["passed_count"] == 1 for r in results)
+
+
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_invalidate_during_coalesced_fetch(self, mock_get_all, mock_make_session):
+        """Test an invalidation mid-download re-loads for waiters and caches nothing stale"""
+        import time
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from single_flight import SingleFlight
+        release = threading.Event()
+        calls = []
+        
+        def fetch(session, test_id):
+            calls.append(test_id)
+            if len(calls) == 1:
+                release.wait(5)
+                return [{"email": "before@example.com", "percentage_score": 80}]
+            return [{"email": "after@example.com", "percentage_score": 80}]
+        
+        mock_get_all.side_effect = fetch
+        
+        with patch('mcp_server.CANDIDATE_FETCHES', SingleFlight()):
+            executor = ThreadPoolExecutor(max_workers=2)
+            owner = executor.submit(mcp_server.fetch_candidates, 2263157)
+            while mcp_server.CANDIDATE_FETCHES.stats()["in_flight"] < 1:
+                time.sleep(0.001)
+            waiter = executor.submit(mcp_server.fetch_candidates, 2263157)
+            while mcp_server.CANDIDATE_FETCHES.stats()["shared"] < 1:
+                time.sleep(0.001)
+            mcp_server.invalidate_candidates(2263157)
+            release.set()
+            owner.result(5)
+            waited = waiter.result(5)
+            executor.shutdown()
+            
+            assert [c["email"] for c in waited] == ["after@example.com"]
+            assert mcp_server.CANDIDATE_CACHE.peek(2263157) is None
+            assert [c["email"] for c in mcp_server.fetch_candidates(2263157)] == ["after@example.com"]
+
+
 class TestMCPResources:
     """Tests for MCP resource endpoints"""
     
@@ -528,3 +1052,291 @@ class TestMCPAvailability:
         # This is more of a structural test
         pass
 
+
+
+class TestListAllTests:
+    """Tests for list_all_tests MCP tool"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_list_all_tests_mock_statistics(self):
+        """Test mock mode statistics come from the score column"""
+        result = mcp_server.list_all_tests()
+        
+        tests = {t["id"]: t for t in result["tests"]}
+        test_a = tests[356098]
+        scores = [c["percentage_score"] for c in mcp_server.get_mock_candidates(356098)]
+        assert test_a["candidate_count"] == len(scores)
+        assert test_a["average_score"] == round(sum(scores) / len(scores), 2)
+        assert test_a["min_score"] == min(scores)
+        assert test_a["max_score"] == max(scores)
+        assert sum(test_a["score_histogram"]["counts"]) == len(scores)
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch.dict('os.environ', {'TEST_A_ID': '100', 'TEST_B_ID': '200'})
+    @patch('mcp_server.new_agent.make_session')
+    @patch('mcp_server.new_agent.iter_candidate_pages')
+    def test_list_all_tests_ignores_unscored_attempts(self, mock_pages, mock_make_session):
+        """Test real mode statistics skip attempts without a score"""
+        mock_pages.side_effect = lambda session, test_id: iter([
+            (0, [{"email": "a@example.com", "percentage_score": 80},
+                 {"email": "b@example.com", "percentage_score": None}]),
+            (50, [{"email": "c@example.com", "percentage_score": 60}]),
+        ])
+        
+        result = mcp_server.list_all_tests()
+        
+        assert result["total_tests"] == 2
+        assert result["tests"][0]["candidate_count"] == 3
+        assert result["tests"][0]["average_score"] == 70
+        assert result["tests"][0]["min_score"] == 60
+        assert result["tests"][0]["stats_source"] == "api"
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch.dict('os.environ', {'LIST_TEST_IDS': '1, 2, 3, 2'})
+    def test_configured_tests_fetched_concurrently(self):
+        """Test every configured test is fetched at the same time, in listed order"""
+        import threading
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def fake_pages(session, test_id):
+            barrier.wait()  # only passes once all three tests are in flight
+            yield 0, [{"email": f"{test_id}@example.com", "percentage_score": 10 * test_id}]
+        
+        with patch('mcp_server.new_agent.iter_candidate_pages', side_effect=fake_pages):
+            result = mcp_server.list_all_tests()
+        
+        assert [t["id"] for t in result["tests"]] == [1, 2, 3]
+        assert [t["max_score"] for t in result["tests"]] == [10, 20, 30]
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch.dict('os.environ', {'LIST_TEST_IDS': '1,2'})
+    @patch('mcp_server.new_agent.iter_candidate_pages')
+    def test_cached_test_not_refetched(self, mock_pages):
+        """Test a test already in the candidate cache is summarised from it"""
+        mcp_server.CANDIDATE_CACHE.set(1, [{"email": "a@example.com", "percentage_score": 90}])
+        mock_pages.side_effect = RuntimeError("down")
+        
+        result = mcp_server.list_all_tests()
+        
+        cached, failed = result["tests"]
+        assert cached["stats_source"] == "cache"
+        assert cached["average_score"] == 90
+        assert failed["candidate_count"] is None
+        assert failed["note"] == "Unable to fetch candidate data"
+        assert [c.args[1] for c in mock_pages.call_args_list] == [2]
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch.dict('os.environ', {'LIST_TEST_IDS': '7'})
+    def test_store_scores_used_when_configured(self):
+        """Test statistics come from the candidate store's aggregate when it is enabled"""
+        from score_aggregates import ScoreAggregate
+        store = Mock()
+        store.get_aggregate.return_value = ScoreAggregate.from_scores([50, 0, 100])
+        
+        with patch('mcp_server.candidate_store.get_default_store', return_value=store):
+            result = mcp_server.list_all_tests()
+        
+        test = result["tests"][0]
+        assert test["stats_source"] == "store"
+        assert test["candidate_count"] == 3
+        assert test["average_score"] == 75
+        store.candidates.assert_not_called()
+
+
+class TestScoreAggregates:
+    """Tests for running score aggregates in stats tools and prompts"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_invalidate_during_download_keeps_no_aggregate(self, mock_get_all):
+        """Test an aggregate from a download overlapping invalidate_candidates is not kept"""
+        def fetch(session, test_id):
+            mcp_server.invalidate_candidates(test_id)
+            return [{"email": "before@example.com", "percentage_score": 80}]
+        
+        mock_get_all.side_effect = fetch
+        mcp_server.fetch_candidates(5)
+        
+        assert mcp_server.CANDIDATE_CACHE.peek(5) is None
+        assert mcp_server.SCORE_AGGREGATES.peek(5) is None
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.iter_candidate_pages')
+    def test_invalidate_during_page_scan_keeps_no_aggregate(self, mock_pages):
+        """Test the api path does not keep an aggregate invalidated while it scanned"""
+        def pages(session, test_id):
+            mcp_server.invalidate_candidates(test_id)
+            yield 0, [{"email": "before@example.com", "percentage_score": 80}]
+        
+        mock_pages.side_effect = pages
+        aggregate, source = mcp_server.score_aggregate_for_test(5)
+        
+        assert (source, aggregate.scored) == ("api", 1)
+        assert mcp_server.SCORE_AGGREGATES.peek(5) is None
+    
+    def test_aggregate_ttl_bounded_by_candidate_cache(self):
+        """Test aggregates are never kept longer than the candidate lists"""
+        assert mcp_server.SCORE_AGGREGATES.ttl <= mcp_server.CANDIDATE_CACHE.ttl
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch.dict('os.environ', {'LIST_TEST_IDS': '5'})
+    @patch('mcp_server.new_agent.iter_candidate_pages')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_loaded_test_answers_stats_from_aggregate(self, mock_get_all, mock_pages):
+        """Test a test loaded once serves later statistics without touching candidates"""
+        mock_get_all.return_value = [
+            {"email": "a@example.com", "percentage_score": 80},
+            {"email": "b@example.com", "percentage_score": 60},
+        ]
+        mcp_server.fetch_candidates(5)
+        mcp_server.CANDIDATE_CACHE.clear()
+        
+        listed = mcp_server.list_all_tests()["tests"][0]
+        stats = mcp_server.get_candidate_scores(5, thresholds=[70], include_candidates=False)
+        
+        assert listed["stats_source"] == "aggregate"
+        assert listed["average_score"] == 70
+        assert stats["total_candidates"] == 2
+        assert stats["pass_counts"] == {"70": 1}
+        assert "candidates" not in stats
+        mock_pages.assert_not_called()
+        assert mock_get_all.call_count == 1
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_invalidation_drops_aggregate(self, mock_get_all):
+        """Test invalidating a test also drops its aggregate"""
+        mock_get_all.return_value = [{"email": "a@example.com", "percentage_score": 80}]
+        mcp_server.fetch_candidates(5)
+        
+        mcp_server.invalidate_candidates(5)
+        
+        assert mcp_server.peek_score_aggregate(5) is None
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    @patch('mcp_server.get_mock_candidates')
+    def test_stats_only_summary_covers_scored_attempts(self, mock_candidates):
+        """Test stats-only calls report scored attempts under their own key"""
+        mock_candidates.return_value = [
+            {"email": "a@example.com", "percentage_score": 90},
+            {"email": "b@example.com", "percentage_score": 60},
+            {"email": "c@example.com", "percentage_score": 0},
+            {"email": "d@example.com"},
+        ]
+        full = mcp_server.get_candidate_scores(356098)
+        stats = mcp_server.get_candidate_scores(356098, include_candidates=False)
+        
+        assert stats["stats_source"] == "mock"
+        assert "score_summary" not in stats
+        assert stats["total_candidates"] == full["total_candidates"] == 4
+        assert (stats["scored_count"], stats["scored_summary"]["count"]) == (2, 2)
+        assert (stats["scored_summary"]["mean"], stats["scored_summary"]["min"]) == (75, 60)
+        assert (full["score_summary"]["count"], full["score_summary"]["min"]) == (4, 0)
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    def test_prompts_include_current_statistics(self):
+        """Test prompts embed aggregate statistics when they are at hand"""
+        analyze = mcp_server.analyze_test_results(356098, 70.0)
+        summary = mcp_server.generate_recruiter_summary(356098, 2263157)
+        
+        attempts = len(mcp_server.get_mock_candidates(356098))
+        assert f"Test 356098: {attempts} attempts" in analyze
+        assert "scored at least 70" in analyze
+        assert "Test 2263157:" in summary
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    def test_prompts_skip_statistics_without_aggregate(self):
+        """Test prompts do no I/O when no aggregate is available"""
+        with patch('mcp_server.new_agent.iter_candidate_pages') as mock_pages:
+            prompt = mcp_server.analyze_test_results(12345, 70.0)
+        
+        assert "Current statistics" not in prompt
+        mock_pages.assert_not_called()
+
+
+class TestScreeningJobs:
+    """Tests for the background screening job tools"""
+    
+    @patch('mcp_server.USE_MOCK_DATA', True)
+    @patch('mcp_server.send_google_meet_invites_to_top_candidates')
+    def test_job_runs_pipeline_with_progress(self, mock_meet):
+        """Test start_screening_job returns an ID and the result is polled later"""
+        mock_meet.return_value = {"invites_sent": 1, "successful": [], "failed": []}
+        
+        started = mcp_server.start_screening_job(356098, 2263157)
+        assert started["status"] in ("queued", "running", "succeeded")
+        assert mcp_server.JOB_MANAGER.wait(started["job_id"], timeout=5)
+        
+        status = mcp_server.get_job_status(started["job_id"])
+        result = mcp_server.get_job_result(started["job_id"])
+        assert status["status"] == "succeeded"
+        assert status["progress"]["meet_invites_sent"] == 1
+        assert "result" not in status
+        assert result["result"]["mock_data"] is True
+        assert result["result"]["emails_sent"] == status["progress"]["emails_sent"]
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    @patch('mcp_server.send_email_to_candidates')
+    @patch('mcp_server.new_agent.get_all_candidates')
+    def test_cancel_stops_real_pipeline_between_pages(self, mock_get_all, mock_send_email):
+        """Test cancelling a running job stops it at the next fetched page"""
+        import threading
+        fetching = threading.Event()
+        release = threading.Event()
+        
+        def fake_get_all(session, test_id, on_page=None):
+            on_page([{"email": "a@example.com", "percentage_score": 90}])
+            fetching.set()
+            release.wait(5)
+            on_page([{"email": "b@example.com", "percentage_score": 95}])
+            return []
+        
+        mock_get_all.side_effect = fake_get_all
+        job_id = mcp_server.start_screening_job(1, 2)["job_id"]
+        assert fetching.wait(5)
+        
+        cancelled = mcp_server.cancel_job(job_id)
+        release.set()
+        assert mcp_server.JOB_MANAGER.wait(job_id, timeout=5)
+        
+        status = mcp_server.get_job_status(job_id)
+        assert cancelled["cancel_requested"]
+        assert status["status"] == "cancelled"
+        assert status["progress"]["pages_fetched"] == 2
+        assert mock_get_all.call_count == 1
+        mock_send_email.assert_not_called()
+    
+    @patch('mcp_server.USE_MOCK_DATA', False)
+    def test_one_job_per_test_pair(self):
+        """Test starting a pair that already has a running job returns that job"""
+        import threading
+        release = threading.Event()
+        
+        def slow_pipeline(**params):
+            release.wait(5)
+            return {"ok": True}
+        
+        with patch('mcp_server.run_screening_pipeline', side_effect=slow_pipeline) as mock_run:
+            first = mcp_server.start_screening_job(11, 22)
+            second = mcp_server.start_screening_job(11, 22)
+            release.set()
+            assert mcp_server.JOB_MANAGER.wait(first["job_id"], timeout=5)
+        
+        assert second["job_id"] == first["job_id"]
+        assert first["already_running"] is False
+        assert second["already_running"] is True
+        assert mock_run.call_count == 1
+    
+    def test_unknown_job(self):
+        """Test status, result and cancel of an unknown job ID return an error"""
+        assert "error" in mcp_server.get_job_status("missing")
+        assert "error" in mcp_server.get_job_result("missing")
+        assert "error" in mcp_server.cancel_job("missing")
+    
+    def test_list_jobs(self):
+        """Test list_jobs includes submitted jobs"""
+        with patch('mcp_server.run_screening_pipeline', return_value={"ok": True}):
+            job_id = mcp_server.start_screening_job(1, 2)["job_id"]
+        mcp_server.JOB_MANAGER.wait(job_id, timeout=5)
+        
+        assert job_id in [job["job_id"] for job in mcp_server.list_jobs()["jobs"]]
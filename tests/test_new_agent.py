@@ -1,6 +1,7 @@
 """
 Unit tests for new_agent.py
 """
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import new_agent
@@ -97,6 +98,62 @@ class TestFilterPassed:
         assert all(c["test_id"] == 356098 for c in passed)
 
 
+class TestCandidateRecord:
+    """Tests for the compact CandidateRecord representation"""
+    
+    def test_projection_drops_unused_fields(self, mock_candidates_list):
+        """Test only pipeline fields are kept"""
+        record = new_agent.CandidateRecord.from_dict(mock_candidates_list[0])
+        
+        assert record.get("email") == "alice@example.com"
+        assert record.get("test_id") is None
+        assert not hasattr(record, "__dict__")
+        assert record.to_dict() == {
+            "email": "alice@example.com",
+            "full_name": "Alice Wonderland",
+            "name": "Alice Wonderland",
+            "percentage_score": 85,
+            "score": 85,
+            "status": 2,
+            "completed_at": "2024-01-15T10:30:00Z",
+        }
+    
+    def test_dict_read_api(self):
+        """Test get, [] and in behave like the raw dict"""
+        record = new_agent.CandidateRecord(email="a@example.com", score=70)
+        
+        assert record["email"] == "a@example.com"
+        assert record.get("full_name", "Candidate") == "Candidate"
+        assert "score" in record
+        assert "percentage_score" not in record
+        with pytest.raises(KeyError):
+            record["test_id"]
+    
+    def test_extract_score_and_filter_accept_records(self, mock_candidates_with_various_scores):
+        """Test scoring helpers treat records like dicts"""
+        records = new_agent.compact_candidates(mock_candidates_with_various_scores)
+        
+        assert [new_agent.extract_score(r) for r in records] == [
+            new_agent.extract_score(c) for c in mock_candidates_with_various_scores
+        ]
+        passed = new_agent.filter_passed(records, 70)
+        assert [r["email"] for r in passed] == [
+            c["email"] for c in new_agent.filter_passed(mock_candidates_with_various_scores, 70)
+        ]
+    
+    @pytest.mark.parametrize("max_workers", [1, 3])
+    @patch('new_agent.get_candidates_page')
+    def test_get_all_candidates_compact(self, mock_get_page, max_workers):
+        """Test get_all_candidates can project pages at parse time"""
+        mock_get_page.side_effect = TestGetAllCandidatesParallel.make_pages(120, total=120)
+        
+        result = new_agent.get_all_candidates(Mock(), 12345, max_workers=max_workers, compact=True)
+        
+        assert len(result) == 120
+        assert all(isinstance(c, new_agent.CandidateRecord) for c in result)
+        assert result[5].get("email") == "user5@example.com"
+
+
 class TestGetCandidatesPage:
     """Tests for get_candidates_page function"""
     
@@ -208,6 +265,257 @@ class TestGetAllCandidates:
         assert len(result) == 0
 
 
+class TestGetAllCandidatesParallel:
+    """Tests for the concurrent page fetching mode"""
+    
+    @staticmethod
+    def make_pages(count, total=None):
+        """Build a fake get_candidates_page serving `count` candidates"""
+        def get_page(session, test_id, offset=0):
+            batch = [
+                {"email": f"user{i}@example.com", "percentage_score": i % 100}
+                for i in range(offset, min(offset + new_agent.LIMIT, count))
+            ]
+            data = {"data": batch, "next": "more" if offset + new_agent.LIMIT < count else None}
+            if total is not None:
+                data["total"] = total
+            return data
+        return get_page
+    
+    @pytest.mark.parametrize("count", [0, 1, 50, 51, 499, 500, 1234])
+    def test_parallel_matches_serial_with_total(self, count):
+        """Test parallel fetch returns the serial result when total is reported"""
+        with patch('new_agent.get_candidates_page', side_effect=self.make_pages(count, total=count)):
+            serial = new_agent.get_all_candidates(Mock(), 12345, max_workers=1)
+            parallel = new_agent.get_all_candidates(Mock(), 12345, max_workers=4)
+        
+        assert parallel == serial
+        assert len(parallel) == count
+    
+    @pytest.mark.parametrize("count", [1, 50, 51, 499, 1234])
+    def test_parallel_matches_serial_without_total(self, count):
+        """Test probing ahead when the API does not report a total"""
+        with patch('new_agent.get_candidates_page', side_effect=self.make_pages(count)):
+            serial = new_agent.get_all_candidates(Mock(), 12345, max_workers=1)
+            parallel = new_agent.get_all_candidates(Mock(), 12345, max_workers=3)
+        
+        assert parallel == serial
+    
+    def test_parallel_stale_total(self):
+        """Test that a stale (too small) total still fetches every page"""
+        with patch('new_agent.get_candidates_page', side_effect=self.make_pages(300, total=120)):
+            result = new_agent.get_all_candidates(Mock(), 12345, max_workers=4)
+        
+        assert [c["email"] for c in result] == [f"user{i}@example.com" for i in range(300)]
+    
+    def test_parallel_overstated_total(self):
+        """Test that the walk stops at the first page without next"""
+        get_page = Mock(side_effect=self.make_pages(120, total=5000))
+        with patch('new_agent.get_candidates_page', get_page):
+            result = new_agent.get_all_candidates(Mock(), 12345, max_workers=2)
+        
+        assert len(result) == 120
+        assert get_page.call_count < 100
+    
+    def test_parallel_propagates_errors(self):
+        """Test that a failed page fetch raises like the serial path"""
+        pages = self.make_pages(500, total=500)
+        
+        def get_page(session, test_id, offset=0):
+            if offset == 200:
+                raise Exception("Failed: boom")
+            return pages(session, test_id, offset)
+        
+        with patch('new_agent.get_candidates_page', side_effect=get_page):
+            with pytest.raises(Exception, match="boom"):
+                new_agent.get_all_candidates(Mock(), 12345, max_workers=4)
+    
+    @patch('new_agent.FETCH_WORKERS', 4)
+    @patch('new_agent.get_all_candidates_parallel')
+    def test_default_workers_from_config(self, mock_parallel):
+        """Test that FETCH_WORKERS enables parallel mode by default"""
+        mock_parallel.return_value = []
+        session = Mock()
+        
+        new_agent.get_all_candidates(session, 12345)
+        
+        mock_parallel.assert_called_once_with(session, 12345, 4, False, None)
+
+
+class TestIterCandidates:
+    """Tests for the streaming candidate API"""
+    
+    @patch('new_agent.get_candidates_page')
+    def test_pages_fetched_lazily(self, mock_get_page):
+        """Test that the next page is only requested once the previous is consumed"""
+        mock_get_page.side_effect = [
+            {"data": [{"email": "a@example.com"}, {"email": "b@example.com"}], "next": "more"},
+            {"data": [{"email": "c@example.com"}], "next": None},
+        ]
+        
+        stream = new_agent.iter_candidates(Mock(), 12345)
+        assert next(stream)["email"] == "a@example.com"
+        assert mock_get_page.call_count == 1
+        
+        assert [c["email"] for c in stream] == ["b@example.com", "c@example.com"]
+        assert mock_get_page.call_count == 2
+        assert mock_get_page.call_args_list[1][0][2] == new_agent.LIMIT
+    
+    @patch('new_agent.get_candidates_page')
+    def test_iter_candidate_pages_start_offset(self, mock_get_page):
+        """Test paging can resume from a later offset"""
+        mock_get_page.return_value = {"data": [{"email": "x@example.com"}], "next": None}
+        
+        pages = list(new_agent.iter_candidate_pages(Mock(), 12345, start_offset=150))
+        
+        assert pages == [(150, [{"email": "x@example.com"}])]
+    
+    def test_iter_passed_matches_filter_passed(self, mock_candidates_with_various_scores):
+        """Test the streaming filter yields what filter_passed returns"""
+        streamed = list(new_agent.iter_passed(iter(mock_candidates_with_various_scores), 70))
+        
+        assert streamed == new_agent.filter_passed(mock_candidates_with_various_scores, 70)
+
+
+class TestPrefetcher:
+    """Tests for the background page Prefetcher"""
+    
+    @staticmethod
+    def wait_for(condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+    
+    def test_fetches_ahead_of_consumer(self):
+        """Test the producer runs ahead up to the queue depth while the consumer waits"""
+        produced = []
+        
+        def pages():
+            for i in range(10):
+                produced.append(i)
+                yield i
+        
+        prefetcher = new_agent.Prefetcher(pages(), depth=3)
+        
+        # Nothing consumed yet: 3 queued plus one blocked on the full queue
+        assert self.wait_for(lambda: len(produced) == 4)
+        time.sleep(0.05)
+        assert len(produced) == 4
+        assert list(prefetcher) == list(range(10))
+    
+    def test_producer_error_raised_in_order(self):
+        """Test a failure is raised only after the items before it"""
+        def pages():
+            yield 1
+            yield 2
+            raise Exception("Failed: 502")
+        
+        prefetcher = new_agent.Prefetcher(pages(), depth=2)
+        
+        assert next(prefetcher) == 1
+        assert next(prefetcher) == 2
+        with pytest.raises(Exception, match="502"):
+            next(prefetcher)
+    
+    def test_close_stops_producer(self):
+        """Test close() stops fetching further pages"""
+        produced = []
+        
+        def pages():
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        
+        prefetcher = new_agent.Prefetcher(pages(), depth=2)
+        assert next(prefetcher) == 0
+        prefetcher.close()
+        
+        prefetcher.thread.join(timeout=2)
+        assert not prefetcher.thread.is_alive()
+        assert len(produced) < 10
+    
+    def test_zero_depth_is_lazy(self):
+        """Test depth 0 iterates in the caller without a thread"""
+        produced = []
+        
+        def pages():
+            for i in range(3):
+                produced.append(i)
+                yield i
+        
+        prefetcher = new_agent.Prefetcher(pages(), depth=0)
+        
+        assert produced == []
+        assert list(prefetcher) == [0, 1, 2]
+    
+    @patch('invite_engine.INVITE_CONCURRENCY', 1)
+    @patch('new_agent.send_recruiter_invite')
+    @patch('new_agent.invite_to_test')
+    @patch('new_agent.make_session')
+    @patch('new_agent.get_candidates_page')
+    def test_run_pipeline_invites_while_paginating(self, mock_get_page, mock_make_session,
+                                                  mock_invite, mock_recruiter):
+        """Test Test A pages keep being fetched while earlier invites are in flight"""
+        events = []
+        pages_a = 3
+        
+        def get_page(session, test_id, offset=0):
+            if test_id == new_agent.TEST_B_ID:
+                return {"data": [], "next": None}
+            page = offset // new_agent.LIMIT
+            events.append(("fetch", page))
+            return {
+                "data": [{"email": f"p{page}@example.com", "percentage_score": 90}],
+                "next": "more" if page < pages_a - 1 else None,
+            }
+        
+        def invite(session, test_id, candidate):
+            # The first invite is slow; later pages must not wait for it
+            if candidate["email"] == "p0@example.com":
+                assert self.wait_for(lambda: ("fetch", pages_a - 1) in events)
+            events.append(("invite", candidate["email"]))
+            return Mock(status_code=201)
+        
+        mock_get_page.side_effect = get_page
+        mock_invite.side_effect = invite
+        
+        counts = new_agent.run_pipeline()
+        
+        assert counts["invite_invited"] == pages_a
+        assert events.index(("fetch", pages_a - 1)) < events.index(("invite", "p0@example.com"))
+
+
+class TestRunPipeline:
+    """Tests for the streaming run_pipeline"""
+    
+    @patch('new_agent.send_recruiter_invite')
+    @patch('new_agent.invite_to_test')
+    @patch('new_agent.make_session')
+    @patch('new_agent.get_candidates_page')
+    def test_run_pipeline_counts(self, mock_get_page, mock_make_session, mock_invite,
+                                 mock_recruiter):
+        """Test the stream invites Test A passers and notifies Test B passers"""
+        pages = {
+            new_agent.TEST_A_ID: [{"email": "a@example.com", "percentage_score": 90},
+                                  {"email": "b@example.com", "percentage_score": 10}],
+            new_agent.TEST_B_ID: [{"email": "c@example.com", "percentage_score": 95}],
+        }
+        mock_get_page.side_effect = lambda session, test_id, offset=0: {
+            "data": pages[test_id], "next": None
+        }
+        mock_invite.return_value = Mock(status_code=201)
+        
+        counts = new_agent.run_pipeline()
+        
+        assert counts["test_a"] == 2
+        assert counts["passed_a"] == 1
+        assert counts["invite_invited"] == 1
+        assert counts["passed_b"] == 1
+        mock_invite.assert_called_once()
+        mock_recruiter.assert_called_once_with(pages[new_agent.TEST_B_ID][0])
+
+
 class TestInviteToTest:
     """Tests for invite_to_test function"""
     
@@ -268,6 +576,17 @@ class TestInviteToTest:
         # Should not raise, just log error
         mock_session.post.assert_called_once()
     
+    def test_invite_returns_response(self):
+        """Test that the HTTP response is returned for result reporting"""
+        mock_response = Mock()
+        mock_response.status_code = 429
+        session = Mock()
+        session.post.return_value = mock_response
+        
+        result = new_agent.invite_to_test(session, 12345, {"email": "test@example.com"})
+        
+        assert result is mock_response
+    
     def test_invite_no_email(self, mock_candidate_no_email):
         """Test invitation when candidate has no email"""
         session = Mock()
@@ -314,6 +633,53 @@ class TestInviteToTest:
         assert call_args[1]["json"]["name"] == "Candidate"
 
 
+class TestJoinByEmail:
+    """Tests for email normalisation and cross-test joins"""
+    
+    def test_normalize_email(self):
+        """Test case and whitespace are ignored"""
+        assert new_agent.normalize_email("  Alice@Example.COM ") == "alice@example.com"
+        assert new_agent.normalize_email("") is None
+        assert new_agent.normalize_email(None) is None
+    
+    def test_index_keeps_first_attempt(self):
+        """Test that the first attempt for an email wins, like the old next() scan"""
+        candidates = [
+            {"email": "a@example.com", "percentage_score": 10},
+            {"email": "A@example.com", "percentage_score": 90},
+            {"percentage_score": 50},
+        ]
+        index = new_agent.index_by_email(candidates)
+        
+        assert list(index) == ["a@example.com"]
+        assert index["a@example.com"]["percentage_score"] == 10
+    
+    def test_join_two_tests(self):
+        """Test joining Test B passers to Test A attempts"""
+        test_a = [{"email": "alice@example.com", "percentage_score": 85}]
+        test_b = [
+            {"email": " ALICE@example.com", "percentage_score": 90},
+            {"email": "bob@example.com", "percentage_score": 95},
+        ]
+        
+        joined = new_agent.join_by_email(test_b, test_a)
+        
+        assert joined[0] == (test_b[0], [test_a[0]])
+        assert joined[1] == (test_b[1], [None])
+    
+    def test_join_many_tests(self):
+        """Test joining against any number of tests"""
+        primary = [{"email": "a@example.com"}, {"email": None}]
+        t1 = [{"email": "a@example.com", "score": 1}]
+        t2 = [{"email": "b@example.com", "score": 2}]
+        t3 = [{"email": "A@EXAMPLE.COM", "score": 3}]
+        
+        joined = new_agent.join_by_email(primary, t1, t2, t3)
+        
+        assert joined[0][1] == [t1[0], None, t3[0]]
+        assert joined[1][1] == [None, None, None]
+
+
 class TestSendRecruiterInvite:
     """Tests for send_recruiter_invite function"""
     
@@ -357,3 +723,83 @@ class TestMakeSession:
         assert call_args["Accept"] == "application/json"
         assert call_args["Content-Type"] == "application/json"
 
+
+    def test_make_session_mounts_pooled_adapter(self):
+        """Test that sessions get a keep-alive pool with a connection cap and connection retries"""
+        session = new_agent.make_session(pool_maxsize=7, max_retries=2)
+        adapter = session.get_adapter("https://www.hackerrank.com")
+        
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_block is True
+        assert adapter.max_retries.total == 2
+        # HTTP statuses are retried by resilience.send, not twice in the transport
+        assert not adapter.max_retries.status_forcelist
+        assert "POST" not in adapter.max_retries.allowed_methods
+        session.close()
+
+
+class TestSharedSession:
+    """Tests for the process-wide pooled session"""
+    
+    @patch('new_agent.make_session')
+    def test_shared_session_is_reused(self, mock_make_session):
+        """Test that get_shared_session builds one session and reuses it"""
+        first = new_agent.get_shared_session()
+        second = new_agent.get_shared_session()
+        
+        assert first is second
+        mock_make_session.assert_called_once()
+    
+    @patch('new_agent.make_session')
+    def test_reset_closes_session(self, mock_make_session):
+        """Test that reset closes the pooled session and a new one is built"""
+        mock_make_session.side_effect = [Mock(), Mock()]
+        first = new_agent.get_shared_session()
+        
+        new_agent.reset_shared_session()
+        second = new_agent.get_shared_session()
+        
+        first.close.assert_called_once()
+        assert second is not first
+
+
+class TestRosterDedup:
+    """Tests for skipping invites to candidates already on the Test B roster"""
+    
+    def test_exclude_roster(self):
+        """Test candidates on the roster, and repeat attempts, are skipped"""
+        roster = new_agent.roster_emails([{"email": "A@example.com"}, {"email": None}])
+        skipped = []
+        
+        kept = list(new_agent.exclude_roster(
+            [{"email": " a@example.com"}, {"email": "b@example.com"}, {"email": "B@example.com"}],
+            roster, on_skip=skipped.append
+        ))
+        
+        assert kept == [{"email": "b@example.com"}]
+        assert skipped == [{"email": " a@example.com"}, {"email": "B@example.com"}]
+        assert roster == {"a@example.com", "b@example.com"}
+    
+    @patch('new_agent.send_recruiter_invite')
+    @patch('new_agent.invite_to_test')
+    @patch('new_agent.make_session')
+    @patch('new_agent.get_candidates_page')
+    def test_run_pipeline_skips_roster(self, mock_get_page, mock_make_session, mock_invite,
+                                       mock_recruiter):
+        """Test run_pipeline only invites Test A passers missing from Test B"""
+        pages = {
+            new_agent.TEST_A_ID: [{"email": "a@example.com", "percentage_score": 90},
+                                  {"email": "b@example.com", "percentage_score": 90}],
+            new_agent.TEST_B_ID: [{"email": "A@example.com", "percentage_score": None}],
+        }
+        mock_get_page.side_effect = lambda session, test_id, offset=0: {
+            "data": pages[test_id], "next": None
+        }
+        mock_invite.return_value = Mock(status_code=201)
+        
+        counts = new_agent.run_pipeline()
+        
+        assert counts["skipped_on_roster"] == 1
+        assert counts["invite_invited"] == 1
+        assert mock_invite.call_args[0][2]["email"] == "b@example.com"
+        mock_recruiter.assert_not_called()
@@ -0,0 +1,183 @@
+"""
+Unit tests for pipeline_journal.py and resumable pipeline runs
+"""
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+import new_agent
+import pipeline_journal
+from pipeline_journal import PipelineJournal
+
+
+def fake_pages(pages):
+    """fetch_pages callable serving `pages` (list of batches) from a start offset"""
+    calls = []
+    
+    def fetch(start):
+        calls.append(start)
+        for offset in range(start, len(pages) * 10, 10):
+            yield offset, pages[offset // 10]
+    
+    fetch.calls = calls
+    return fetch
+
+
+class TestPipelineJournal:
+    """Tests for PipelineJournal class"""
+    
+    def test_outcomes_survive_reopen(self, tmp_path):
+        """Test recorded outcomes are replayed by a new journal"""
+        path = str(tmp_path / "run.jsonl")
+        journal = PipelineJournal(path)
+        journal.record("invited", 2, "Alice@Example.com")
+        journal.mark_done("fetch_a")
+        journal.close()
+        
+        reopened = PipelineJournal(path)
+        assert reopened.resumed
+        assert reopened.has("invited", 2, "alice@example.com")
+        assert not reopened.has("invited", 3, "alice@example.com")
+        assert not reopened.has("emailed", 2, "alice@example.com")
+        assert reopened.is_done("fetch_a")
+        reopened.close()
+    
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        """Test a partially written final event does not break resume"""
+        path = str(tmp_path / "run.jsonl")
+        journal = PipelineJournal(path)
+        journal.record("invited", 2, "a@example.com")
+        journal.close()
+        with open(path, "a") as f:
+            f.write('{"type": "invited", "test_')
+        
+        reopened = PipelineJournal(path)
+        assert reopened.has("invited", 2, "a@example.com")
+        reopened.close()
+    
+    def test_records_after_torn_line_survive_second_crash(self, tmp_path):
+        """Test a record appended after a torn line is still there after another crash"""
+        path = str(tmp_path / "run.jsonl")
+        journal = PipelineJournal(path)
+        journal.record("invited", 2, "a@example.com")
+        journal.close()
+        with open(path, "a") as f:
+            f.write('{"type": "invited", "test_')
+        
+        resumed = PipelineJournal(path)
+        resumed.record("invited", 2, "b@example.com")
+        resumed.close()
+        with open(path, "a") as f:
+            f.write('{"type": "emailed", "te')
+        
+        reopened = PipelineJournal(path)
+        assert reopened.has("invited", 2, "a@example.com")
+        assert reopened.has("invited", 2, "b@example.com")
+        reopened.close()
+    
+    def test_unterminated_last_record_is_kept(self, tmp_path):
+        """Test a complete record missing its newline is replayed and not merged with the next"""
+        path = str(tmp_path / "run.jsonl")
+        with open(path, "w") as f:
+            f.write('{"type": "invited", "test_id": 2, "email": "a@example.com"}')
+        
+        journal = PipelineJournal(path)
+        journal.record("invited", 2, "b@example.com")
+        journal.close()
+        
+        reopened = PipelineJournal(path)
+        assert reopened.has("invited", 2, "a@example.com")
+        assert reopened.has("invited", 2, "b@example.com")
+        reopened.close()
+    
+    def test_checkpointed_pages_resume_after_last_page(self, tmp_path):
+        """Test journaled pages are replayed and fetching resumes after them"""
+        path = str(tmp_path / "run.jsonl")
+        pages = [[{"email": "a"}], [{"email": "b"}], [{"email": "c"}]]
+        
+        journal = PipelineJournal(path)
+        stream = journal.checkpointed_pages(1, fake_pages(pages), 10)
+        next(stream)
+        next(stream)
+        journal.close()  # crash after two pages
+        
+        resumed = PipelineJournal(path)
+        fetch = fake_pages(pages)
+        result = list(resumed.checkpointed_pages(1, fetch, 10))
+        
+        assert [batch for _, batch in result] == pages
+        assert fetch.calls == [20]
+        resumed.close()
+    
+    def test_completed_fetch_is_not_repeated(self, tmp_path):
+        """Test a fully journaled test is served without any API call"""
+        path = str(tmp_path / "run.jsonl")
+        pages = [[{"email": "a"}], [{"email": "b"}]]
+        journal = PipelineJournal(path)
+        list(journal.checkpointed_pages(1, fake_pages(pages), 10))
+        journal.close()
+        
+        resumed = PipelineJournal(path)
+        fetch = fake_pages(pages)
+        assert [b for _, b in resumed.checkpointed_pages(1, fetch, 10)] == pages
+        assert fetch.calls == []
+        resumed.close()
+    
+    def test_finish_removes_journal(self, tmp_path):
+        """Test a completed run starts the next one fresh"""
+        path = str(tmp_path / "run.jsonl")
+        journal = PipelineJournal(path)
+        journal.record("invited", 2, "a@example.com")
+        journal.finish()
+        
+        assert not os.path.exists(path)
+    
+    def test_disabled_without_path(self):
+        """Test journaling is off when no path is configured"""
+        assert pipeline_journal.open_journal("") is None
+
+
+class TestResumableRunPipeline:
+    """Tests for resuming new_agent.run_pipeline from its journal"""
+    
+    @patch('new_agent.send_recruiter_invite')
+    @patch('new_agent.invite_to_test')
+    @patch('new_agent.make_session')
+    @patch('new_agent.get_candidates_page')
+    def test_rerun_skips_fetched_pages_and_invites(self, mock_get_page, mock_make_session,
+                                                    mock_invite, mock_recruiter, tmp_path):
+        """Test a crash mid-way through Test A resumes without refetching or re-inviting"""
+        path = str(tmp_path / "pipeline.jsonl")
+        page_a1 = [{"email": f"a{i}@example.com", "percentage_score": 90} for i in range(3)]
+        page_a2 = [{"email": f"b{i}@example.com", "percentage_score": 90} for i in range(2)]
+        test_b = [{"email": "x@example.com", "percentage_score": 95}]
+        fail_a2 = [True]
+        
+        def get_page(session, test_id, offset=0):
+            if test_id == new_agent.TEST_B_ID:
+                return {"data": test_b, "next": None}
+            if offset == 0:
+                return {"data": page_a1, "next": "more"}
+            if fail_a2[0]:
+                raise Exception("Failed: 502")
+            return {"data": page_a2, "next": None}
+        
+        mock_get_page.side_effect = get_page
+        mock_invite.return_value = Mock(status_code=201)
+        
+        with pytest.raises(Exception, match="502"):
+            new_agent.run_pipeline(journal_path=path)
+        assert mock_invite.call_count == 3
+        assert os.path.exists(path)
+        
+        fail_a2[0] = False
+        mock_get_page.reset_mock()
+        counts = new_agent.run_pipeline(journal_path=path)
+        
+        assert mock_invite.call_count == 5
+        invited = [c[0][2]["email"] for c in mock_invite.call_args_list[3:]]
+        assert invited == ["b0@example.com", "b1@example.com"]
+        fetched = [(c[0][1], c[0][2]) for c in mock_get_page.call_args_list]
+        assert fetched == [(new_agent.TEST_A_ID, new_agent.LIMIT)]
+        mock_recruiter.assert_called_once()
+        assert not os.path.exists(path)
@@ -0,0 +1,252 @@
+"""
+Unit tests for resilience.py
+"""
+import time
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+import new_agent
+import resilience
+
+
+class TestInFlightLimiter:
+    """Tests for the process-wide in-flight request cap"""
+
+    def test_caps_concurrent_requests(self, response):
+        """Test no more than the limit of requests run at once through send()"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def slow_get(url, **kwargs):
+            time.sleep(0.02)
+            return response(200)
+
+        session = Mock(get=slow_get)
+        with patch.object(resilience, 'API_IN_FLIGHT', resilience.InFlightLimiter(2)) as limiter:
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                list(executor.map(lambda _: resilience.send(session, "get", "GET /x", "u"), range(12)))
+
+            assert limiter.stats() == {"limit": 2, "in_flight": 0, "peak": 2}
+
+    def test_unlimited(self):
+        """Test a limit of 0 never blocks"""
+        limiter = resilience.InFlightLimiter(0)
+        with limiter, limiter:
+            assert limiter.stats()["in_flight"] == 2
+
+    def test_async_waits_for_slot_held_by_thread(self):
+        """Test coroutines share the cap with threads and wait without blocking the loop"""
+        limiter = resilience.InFlightLimiter(1)
+
+        async def scenario():
+            async def acquire():
+                async with limiter:
+                    return limiter.stats()["in_flight"]
+
+            with limiter:
+                waiting = asyncio.ensure_future(acquire())
+                await asyncio.sleep(0.02)
+                assert not waiting.done()
+            return await waiting
+
+        assert asyncio.run(scenario()) == 1
+        assert limiter.stats() == {"limit": 1, "in_flight": 0, "peak": 1}
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker class"""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the circuit and calls fail fast"""
+        breaker = resilience.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(resilience.CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets_failures(self):
+        """Test a success in between keeps the circuit closed"""
+        breaker = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_one_trial(self):
+        """Test one trial call goes out after the reset timeout"""
+        breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.state == "half_open"
+        breaker.before_call()
+        with pytest.raises(resilience.CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        """Test a failed trial call opens the circuit again"""
+        breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+
+class TestSend:
+    """Tests for send function"""
+
+    @patch('resilience.time.sleep')
+    def test_retries_transient_statuses(self, mock_sleep, response):
+        """Test 502s are retried until the call succeeds"""
+        session = Mock()
+        session.get.side_effect = [response(502), response(502), response(200)]
+
+        res = resilience.send(session, "get", "GET /x", "http://api/x")
+
+        assert res.status_code == 200
+        assert session.get.call_count == 3
+        assert mock_sleep.call_count == 2
+        metrics = resilience.api_health()["endpoints"]["GET /x"]
+        assert metrics["requests"] == 3
+        assert metrics["retries"] == 2
+        assert metrics["failures"] == 0
+        assert metrics["statuses"] == {"502": 2, "200": 1}
+
+    @patch('resilience.time.sleep')
+    def test_client_errors_not_retried(self, mock_sleep, response):
+        """Test 4xx responses are returned without retrying"""
+        session = Mock()
+        session.get.return_value = response(404)
+
+        res = resilience.send(session, "get", "GET /x", "http://api/x")
+
+        assert res.status_code == 404
+        assert session.get.call_count == 1
+        mock_sleep.assert_not_called()
+        assert resilience.api_health()["endpoints"]["GET /x"]["failures"] == 1
+
+    @patch('resilience.time.sleep')
+    def test_honours_retry_after(self, mock_sleep, response):
+        """Test 429 waits for the server's Retry-After"""
+        session = Mock()
+        session.get.side_effect = [response(429, {"Retry-After": "2"}), response(200)]
+
+        resilience.send(session, "get", "GET /x", "http://api/x")
+
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch('resilience.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep, response):
+        """Test the last response is returned once retries run out"""
+        session = Mock()
+        session.get.return_value = response(503)
+
+        with patch.object(resilience, 'API_BREAKER', resilience.CircuitBreaker(failure_threshold=0)):
+            res = resilience.send(session, "get", "GET /x", "http://api/x", max_retries=2)
+
+        assert res.status_code == 503
+        assert session.get.call_count == 3
+
+    @patch('resilience.time.sleep')
+    def test_no_retry_statuses(self, mock_sleep, response):
+        """Test calls with retry_statuses=() are sent once"""
+        session = Mock()
+        session.post.return_value = response(502)
+
+        res = resilience.send(session, "post", "POST /x", "http://api/x", retry_statuses=())
+
+        assert res.status_code == 502
+        assert session.post.call_count == 1
+
+    @patch('resilience.time.sleep')
+    def test_open_circuit_fails_fast(self, mock_sleep, response):
+        """Test an outage opens the circuit and later calls never reach the API"""
+        session = Mock()
+        session.get.return_value = response(503)
+        breaker = resilience.CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+        with patch.object(resilience, 'API_BREAKER', breaker):
+            with pytest.raises(resilience.CircuitOpenError):
+                resilience.send(session, "get", "GET /x", "http://api/x", max_retries=5)
+            assert session.get.call_count == 3
+
+            with pytest.raises(resilience.CircuitOpenError):
+                resilience.send(session, "get", "GET /x", "http://api/x")
+            assert session.get.call_count == 3
+
+        assert resilience.api_health()["endpoints"]["GET /x"]["short_circuited"] == 2
+
+
+class TestSendAsync:
+    """Tests for send_async function"""
+
+    @patch('resilience.asyncio.sleep', new_callable=AsyncMock)
+    def test_retries_share_policy_and_metrics(self, mock_sleep, response):
+        """Test send_async retries like send() and records into the same metrics"""
+        client = Mock()
+        client.get = AsyncMock(side_effect=[response(502), response(200)])
+
+        res = asyncio.run(resilience.send_async(client, "get", "GET /x", "http://api/x"))
+
+        assert res.status_code == 200
+        assert client.get.await_count == 2
+        assert mock_sleep.await_count == 1
+        assert resilience.api_health()["endpoints"]["GET /x"]["retries"] == 1
+
+    def test_open_circuit_fails_fast(self):
+        """Test send_async raises CircuitOpenError while the shared circuit is open"""
+        client = Mock()
+        client.get = AsyncMock()
+        with patch.object(resilience, 'API_BREAKER', resilience.CircuitBreaker(1, 60)) as breaker:
+            breaker.record_failure()
+            with pytest.raises(resilience.CircuitOpenError):
+                asyncio.run(resilience.send_async(client, "get", "GET /x", "u"))
+
+        client.get.assert_not_awaited()
+
+
+class TestFetchResilience:
+    """End-to-end tests against the fake HackerRank server"""
+
+    @patch('resilience.API_RETRY_BASE_SECONDS', 0.01)
+    def test_transient_errors_do_not_restart_fetch(self, fake_hackerrank_server):
+        """Test a 502 mid-pagination is retried for that page only"""
+        fake_hackerrank_server.candidates[7] = [
+            {"email": f"c{i}@example.com", "percentage_score": i} for i in range(120)
+        ]
+        fake_hackerrank_server.transient_failures["/tests/7/candidates"] = [502, 503]
+        session = new_agent.make_session()
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            result = new_agent.get_all_candidates(session, 7, max_workers=1)
+
+        session.close()
+        assert len(result) == 120
+        gets = [r for r in fake_hackerrank_server.request_log if r[0] == "GET"]
+        assert len(gets) == 5
+        assert resilience.api_health()["endpoints"]["GET /tests/{id}/candidates"]["retries"] == 2
+
+    def test_errors_raise_api_error(self, fake_hackerrank_server):
+        """Test non-retryable failures raise HackerRankAPIError with the status"""
+        fake_hackerrank_server.status_overrides["/tests/7/candidates"] = 403
+        session = new_agent.make_session()
+
+        with patch('new_agent.BASE_URL', fake_hackerrank_server.base_url):
+            with pytest.raises(resilience.HackerRankAPIError) as excinfo:
+                new_agent.get_candidates_page(session, 7)
+
+        session.close()
+        assert excinfo.value.status_code == 403
+        assert fake_hackerrank_server.requests == 1
@@ -0,0 +1,100 @@
+"""
+Unit tests for score_aggregates.py
+"""
+import random
+
+import pytest
+
+from scoring import ScoreColumn
+from score_aggregates import QuantileSketch, ScoreAggregate
+
+
+class TestScoreAggregate:
+    """Tests for ScoreAggregate class"""
+    
+    def test_summary_matches_score_column_for_whole_scores(self):
+        """Test whole-number scores give the same summary as a ScoreColumn of the scored attempts"""
+        rng = random.Random(7)
+        scores = [rng.randint(0, 100) for _ in range(500)]
+        
+        aggregate = ScoreAggregate.from_scores(scores)
+        
+        assert aggregate.summary() == ScoreColumn(s for s in scores if s > 0).summary()
+        assert aggregate.attempts == 500
+        assert aggregate.scored == sum(1 for s in scores if s > 0)
+    
+    def test_pass_counts_exact_at_configured_thresholds(self):
+        """Test configured thresholds are counted exactly, others from the sketch"""
+        aggregate = ScoreAggregate.from_scores([69.9, 70, 75, 80, 0], thresholds=[70, 80])
+        
+        assert aggregate.count_at_least(70) == 3
+        assert aggregate.count_at_least(80) == 1
+        assert aggregate.count_at_least(75) == 2
+        assert aggregate.count_at_least(0) == 5
+        assert aggregate.snapshot()["pass_counts"] == {"70": 3, "80": 1}
+    
+    def test_replace_updates_every_statistic(self):
+        """Test a re-synced attempt moves from unscored to scored"""
+        aggregate = ScoreAggregate.from_scores([0, 60, 90], thresholds=[70])
+        aggregate.replace(0, 85)
+        
+        expected = ScoreAggregate.from_scores([85, 60, 90], thresholds=[70])
+        assert aggregate.summary() == expected.summary()
+        assert aggregate.count_at_least(70) == 2
+        assert aggregate.attempts == 3
+    
+    def test_removing_extremes_updates_min_and_max(self):
+        """Test min and max follow removals of the current extremes"""
+        aggregate = ScoreAggregate.from_scores([40, 60, 90])
+        aggregate.remove(40)
+        aggregate.remove(90)
+        
+        summary = aggregate.summary()
+        assert (summary["min"], summary["max"], summary["count"]) == (60, 60, 1)
+        assert aggregate.dirty
+        aggregate.remove(60)
+        assert aggregate.summary()["count"] == 0
+    
+    def test_removing_inner_score_keeps_bounds_exact(self):
+        """Test removals that do not touch min or max leave the aggregate clean"""
+        aggregate = ScoreAggregate.from_scores([40, 60, 90])
+        aggregate.replace(60, 70)
+        
+        assert not aggregate.dirty
+        assert (aggregate.summary()["min"], aggregate.summary()["max"]) == (40, 90)
+    
+    def test_percentiles_within_resolution_for_fractional_scores(self):
+        """Test approximate percentiles stay within one sketch bucket of the exact ones"""
+        rng = random.Random(3)
+        scores = [round(rng.uniform(1, 100), 3) for _ in range(2000)]
+        
+        approximate = ScoreAggregate.from_scores(scores, resolution=0.5).summary()["percentiles"]
+        exact = ScoreColumn(scores).summary()["percentiles"]
+        
+        for name, value in exact.items():
+            assert approximate[name] == pytest.approx(value, abs=0.5)
+    
+    def test_out_of_range_scores_clamp_to_end_bins(self):
+        """Test the fixed histogram keeps scores above 100 in its last bin"""
+        aggregate = ScoreAggregate.from_scores([100, 120, 5])
+        
+        assert aggregate.summary()["histogram"]["counts"] == [1] + [0] * 8 + [2]
+
+
+class TestQuantileSketch:
+    """Tests for QuantileSketch class"""
+    
+    def test_remove_drops_empty_buckets(self):
+        """Test memory follows distinct buckets, not additions"""
+        sketch = QuantileSketch(resolution=1)
+        for _ in range(1000):
+            sketch.add(50)
+        sketch.add(70)
+        sketch.remove(70)
+        
+        assert len(sketch.buckets) == 1
+        assert sketch.quantile(90) == 50
+    
+    def test_empty_sketch(self):
+        """Test an empty sketch has no quantiles"""
+        assert QuantileSketch().quantile(50) is None
@@ -0,0 +1,59 @@
+"""
+Unit tests for scoring.py
+"""
+
+from scoring import ScoreColumn, as_number
+
+
+class TestScoreColumn:
+    """Tests for ScoreColumn class"""
+    
+    def test_sweep_matches_individual_filters(self):
+        """Test a multi-threshold sweep agrees with per-threshold filtering"""
+        scores = [55, 60, 65, 70, 70, 85, 90, 95, 98]
+        column = ScoreColumn(scores)
+        thresholds = [0, 60, 70, 70.5, 95, 99]
+        
+        assert column.sweep(thresholds) == {
+            t: len([s for s in scores if s >= t]) for t in thresholds
+        }
+    
+    def test_summary(self):
+        """Test mean, min, max and percentiles"""
+        column = ScoreColumn([10, 20, 30, 40, 50])
+        summary = column.summary(percentiles=(0, 50, 100, 25))
+        
+        assert summary["count"] == 5
+        assert summary["mean"] == 30
+        assert summary["min"] == 10
+        assert summary["max"] == 50
+        assert summary["percentiles"] == {"p0": 10, "p50": 30, "p100": 50, "p25": 20}
+    
+    def test_percentile_interpolates(self):
+        """Test linear interpolation between ranks"""
+        assert ScoreColumn([0, 10]).percentile(25) == 2.5
+    
+    def test_histogram_counts_every_score(self):
+        """Test histogram bins cover the range including the top edge"""
+        column = ScoreColumn([0, 5, 10, 55, 99.9, 100])
+        histogram = column.histogram(bins=10)
+        
+        assert sum(histogram["counts"]) == 6
+        assert histogram["counts"][0] == 2
+        assert histogram["counts"][1] == 1
+        assert histogram["counts"][-1] == 2
+        assert histogram["edges"][0] == 0
+        assert histogram["edges"][-1] == 100
+    
+    def test_empty_summary(self):
+        """Test statistics of an empty column"""
+        summary = ScoreColumn().summary()
+        
+        assert summary["count"] == 0
+        assert summary["mean"] is None
+        assert ScoreColumn().percentile(50) is None
+    
+    def test_as_number(self):
+        """Test whole floats are reported as ints"""
+        assert as_number(85.0) == 85 and isinstance(as_number(85.0), int)
+        assert as_number(85.5) == 85.5
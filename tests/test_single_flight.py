@@ -0,0 +1,168 @@
+"""
+Unit tests for single_flight.py
+"""
+import time
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from single_flight import SingleFlight
+
+
+def start_callers(flight, key, loader, callers):
+    """Submit `callers` concurrent flight.do calls and wait until all have joined."""
+    executor = ThreadPoolExecutor(max_workers=callers)
+    futures = [executor.submit(flight.do, key, loader) for _ in range(callers)]
+    executor.shutdown(wait=False)
+    while flight.stats()["calls"] < callers:
+        time.sleep(0.001)
+    return futures
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight class"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test callers arriving while a load is in flight get its result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return ["result"]
+
+        futures = start_callers(flight, "k", loader, 4)
+        release.set()
+
+        results = [f.result() for f in futures]
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.stats() == {"calls": 4, "shared": 3, "reloads": 0, "in_flight": 0}
+
+    def test_exceptions_are_shared(self):
+        """Test every waiting caller sees the loader's exception"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def loader():
+            release.wait(5)
+            raise ValueError("boom")
+
+        futures = start_callers(flight, "k", loader, 3)
+        release.set()
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    def test_waiters_on_forgotten_call_load_again(self):
+        """Test callers that joined a call later forgotten re-load instead of taking its result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "stale"
+            return "fresh"
+
+        owner = start_callers(flight, "k", loader, 1)[0]
+        waiters = start_callers(flight, "k", loader, 2)
+        while flight.stats()["shared"] < 2:
+            time.sleep(0.001)
+        flight.forget("k")
+        release.set()
+
+        assert owner.result(5) == "stale"
+        assert [f.result(5) for f in waiters] == ["fresh", "fresh"]
+        assert flight.stats()["reloads"] == 2
+
+    def test_no_memoization(self):
+        """Test sequential calls each run the loader"""
+        flight = SingleFlight()
+        calls = []
+
+        flight.do("k", lambda: calls.append(1))
+        flight.do("k", lambda: calls.append(1))
+
+        assert len(calls) == 2
+
+    def test_keys_are_independent(self):
+        """Test different keys never share a call"""
+        flight = SingleFlight()
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+
+    def test_forget_starts_new_load(self):
+        """Test a forgotten key does not join the call already in flight"""
+        flight = SingleFlight()
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "stale"
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            first = executor.submit(flight.do, "k", slow)
+            started.wait(5)
+            flight.forget("k")
+            assert flight.do("k", lambda: "fresh") == "fresh"
+            release.set()
+            assert first.result() == "stale"
+
+    def test_async_and_thread_callers_share_one_call(self):
+        """Test do_async joins a load started by do() and vice versa"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+
+        async def async_loader():
+            calls.append(1)
+            return "async"
+
+        futures = start_callers(flight, "k", loader, 1)
+
+        async def scenario():
+            waiting = asyncio.ensure_future(flight.do_async("k", async_loader))
+            while flight.stats()["shared"] < 1:
+                await asyncio.sleep(0.001)
+            release.set()
+            return await waiting
+
+        assert asyncio.run(scenario()) == "shared"
+        assert futures[0].result() == "shared"
+        assert len(calls) == 1
+
+    def test_cancelled_async_waiter_keeps_shared_call(self):
+        """Test cancelling one coroutine waiting on a call does not cancel it for the others"""
+        flight = SingleFlight()
+
+        async def scenario():
+            release = asyncio.Event()
+
+            async def loader():
+                await release.wait()
+                return "result"
+
+            owner = asyncio.ensure_future(flight.do_async("k", loader))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flight.do_async("k", loader))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return await owner, waiter.cancelled()
+
+        assert asyncio.run(scenario()) == ("result", True)
@@ -0,0 +1,119 @@
+"""
+Unit tests for synthetic_cohort.py
+"""
+import pytest
+from unittest.mock import patch
+
+import mcp_server
+import synthetic_cohort
+from synthetic_cohort import SyntheticCohort, parse_score_distribution, parse_status_mix
+
+
+def make_cohort(**kwargs):
+    options = {"test_a_id": 1, "test_b_id": 2, "size": 3000, "seed": 7}
+    options.update(kwargs)
+    return SyntheticCohort(**options)
+
+
+class TestSyntheticCohort:
+    """Tests for SyntheticCohort class"""
+
+    def test_deterministic_for_seed(self):
+        """Test that the same seed gives the same candidates and a new seed differs"""
+        assert list(make_cohort().candidates(1)) == list(make_cohort().candidates(1))
+        assert list(make_cohort().candidates(1)) != list(make_cohort(seed=8).candidates(1))
+
+    def test_sizes(self):
+        """Test Test A and Test B sizes, with Test B defaulting to a quarter"""
+        cohort = make_cohort()
+        assert len(cohort.candidates(1)) == 3000
+        assert len(cohort.candidates(2)) == 750
+        assert len(make_cohort(test_b_size=10).candidates(2)) == 10
+        assert cohort.size(99) == 0
+
+    def test_random_access_matches_iteration(self):
+        """Test that indexing and slicing match iterating"""
+        candidates = make_cohort().candidates(1)
+        listed = list(candidates)
+
+        assert candidates[0] == listed[0]
+        assert candidates[2500] == listed[2500]
+        assert candidates[-1] == listed[-1]
+        assert candidates[1020:1030] == listed[1020:1030]
+        with pytest.raises(IndexError):
+            candidates[3000]
+
+    def test_overlap_ratio(self):
+        """Test that the overlap ratio of Test B candidates also took Test A"""
+        cohort = make_cohort(test_b_size=1000, overlap_ratio=0.3, missing_field_rate=0)
+        emails_a = {c["email"] for c in cohort.candidates(1)}
+        emails_b = [c["email"] for c in cohort.candidates(2)]
+
+        assert sum(1 for e in emails_b if e in emails_a) == 300
+        assert len(set(emails_b)) == 1000
+
+    def test_status_mix_and_scoring(self):
+        """Test that only completed attempts are scored and statuses follow the mix"""
+        cohort = make_cohort(size=5000, status_mix={2: 0.8, -1: 0.2}, missing_field_rate=0)
+        candidates = list(cohort.candidates(1))
+        completed = [c for c in candidates if c["status"] == 2]
+
+        assert {c["status"] for c in candidates} == {2, -1}
+        assert 0.75 < len(completed) / len(candidates) < 0.85
+        assert all(0 <= c["percentage_score"] <= 100 for c in completed)
+        assert not any("percentage_score" in c for c in candidates if c["status"] != 2)
+
+    def test_missing_field_rate(self):
+        """Test that fields go missing at roughly the configured rate"""
+        candidates = list(make_cohort(size=5000, missing_field_rate=0.1).candidates(1))
+        missing = sum(1 for c in candidates if "email" not in c)
+
+        assert 400 < missing < 600
+
+    def test_score_distribution(self):
+        """Test that a normal distribution centres on its mean"""
+        cohort = make_cohort(size=5000, score_distribution="normal:40:5", status_mix="2=1")
+        scores = [c["percentage_score"] for c in cohort.candidates(1)]
+
+        assert 39 < sum(scores) / len(scores) < 41
+
+
+class TestParsing:
+    """Tests for distribution and status mix specs"""
+
+    @pytest.mark.parametrize("spec", ["uniform", "normal:65:15", "bimodal:40:80:10"])
+    def test_valid_score_distributions(self, spec):
+        """Test that every supported distribution parses"""
+        assert callable(parse_score_distribution(spec))
+
+    @pytest.mark.parametrize("spec", ["gamma", "normal:65", "normal:a:b"])
+    def test_invalid_score_distributions(self, spec):
+        """Test that unknown or malformed specs raise ValueError"""
+        with pytest.raises(ValueError):
+            parse_score_distribution(spec)
+
+    def test_status_mix(self):
+        """Test status mix parsing"""
+        assert parse_status_mix("2=0.9,-1=0.1") == ([2, -1], [0.9, 0.1])
+        with pytest.raises(ValueError):
+            parse_status_mix("2")
+
+
+class TestMockModeIntegration:
+    """Tests for the synthetic cohort in mcp_server mock mode"""
+
+    def test_disabled_by_default(self):
+        """Test that no cohort is built when MOCK_COHORT_SIZE is 0"""
+        with patch.object(synthetic_cohort, "MOCK_COHORT_SIZE", 0):
+            assert synthetic_cohort.cohort_from_env(1, 2) is None
+
+    def test_mock_candidates_and_tests_use_cohort(self):
+        """Test that get_mock_candidates and get_mock_tests serve the cohort"""
+        cohort = SyntheticCohort(356098, 2263157, size=2000, test_b_size=400)
+        with patch.object(mcp_server, "MOCK_COHORT", cohort):
+            assert len(mcp_server.get_mock_candidates(356098)) == 2000
+            assert len(mcp_server.get_mock_candidates(2263157)) == 400
+            counts = {t["id"]: t["candidate_count"] for t in mcp_server.get_mock_tests()}
+
+        assert counts == {356098: 2000, 2263157: 400}
+        assert mcp_server.MOCK_TESTS_INFO[356098]["candidate_count"] == 12
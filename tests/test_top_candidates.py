@@ -0,0 +1,85 @@
+"""
+Unit tests for top_candidates.py
+"""
+import random
+import pytest
+
+from top_candidates import combine_across_tests, rank_key, top_across_tests, top_n
+
+
+class TestTopN:
+    """Tests for top_n function"""
+
+    def test_matches_full_sort(self):
+        """Test that heap selection returns the same top N as sorting everything"""
+        rng = random.Random(3)
+        candidates = [{"email": f"u{i}@example.com", "percentage_score": rng.randint(0, 100)}
+                      for i in range(500)]
+
+        assert top_n(candidates, 5) == sorted(candidates, key=rank_key)[:5]
+
+    def test_tie_breaking(self):
+        """Test ties break on Test A score, then earliest completion, then input order"""
+        candidates = [
+            {"email": "late@example.com", "score": 90, "test_a_score": 80, "completed_at": "2024-01-02T00:00:00Z"},
+            {"email": "early@example.com", "score": 90, "test_a_score": 80, "completed_at": "2024-01-01T00:00:00Z"},
+            {"email": "best_a@example.com", "score": 90, "test_a_score": 95},
+            {"email": "first@example.com", "score": 85},
+            {"email": "second@example.com", "score": 85},
+        ]
+
+        ranked = [c["email"] for c in top_n(candidates, 5)]
+
+        assert ranked == ["best_a@example.com", "early@example.com", "late@example.com",
+                          "first@example.com", "second@example.com"]
+
+    def test_streaming_input(self):
+        """Test that a generator is accepted"""
+        stream = ({"email": f"u{i}@example.com", "percentage_score": i} for i in range(100))
+
+        assert [c["percentage_score"] for c in top_n(stream, 3)] == [99, 98, 97]
+
+    def test_n_larger_than_input_and_zero(self):
+        """Test edge sizes"""
+        candidates = [{"score": 1}, {"score": 2}]
+        assert top_n(candidates, 10) == [{"score": 2}, {"score": 1}]
+        assert top_n(candidates, 0) == []
+
+
+class TestAcrossTests:
+    """Tests for ranking across several tests"""
+
+    TESTS = {
+        1: [
+            {"email": "Alice@example.com", "full_name": "Alice", "percentage_score": 90},
+            {"email": "bob@example.com", "full_name": "Bob", "percentage_score": 60},
+            {"full_name": "No Email", "percentage_score": 100},
+        ],
+        2: [
+            {"email": "alice@example.com", "percentage_score": 70},
+            {"email": "bob@example.com", "percentage_score": 100},
+            {"email": "carol@example.com", "full_name": "Carol", "percentage_score": 75},
+        ],
+    }
+
+    def test_combine_mean(self):
+        """Test that scores are joined by email and averaged over tests taken"""
+        merged = {e["email"]: e for e in combine_across_tests(self.TESTS)}
+
+        assert merged["Alice@example.com"]["score"] == 80
+        assert merged["Alice@example.com"]["scores"] == {1: 90, 2: 70}
+        assert merged["Alice@example.com"]["test_a_score"] == 90
+        assert merged["carol@example.com"]["test_a_score"] is None
+        assert len(merged) == 3
+
+    def test_ranking_methods(self):
+        """Test mean, max and sum rankings"""
+        assert [e["email"] for e in top_across_tests(self.TESTS, 3, "mean")] == \
+            ["Alice@example.com", "bob@example.com", "carol@example.com"]
+        assert [e["email"] for e in top_across_tests(self.TESTS, 1, "max")] == ["bob@example.com"]
+        assert [e["score"] for e in top_across_tests(self.TESTS, 3, "sum")] == [160, 160, 75]
+
+    def test_unknown_combine(self):
+        """Test that an unknown combine method raises ValueError"""
+        with pytest.raises(ValueError):
+            combine_across_tests(self.TESTS, "median")
@@ -0,0 +1,124 @@
+"""
+Unit tests for ttl_cache.py
+"""
+import time
+from unittest.mock import Mock
+
+from ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache class"""
+    
+    def test_hit_and_miss_counts(self):
+        """Test hits and misses are counted"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+    
+    def test_peek_does_not_count_or_refresh(self):
+        """Test peek reads live entries without touching stats or LRU order"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        
+        assert cache.peek("a") == 1
+        assert cache.peek("missing", "default") == "default"
+        cache.set("c", 3)
+        
+        assert cache.peek("a") is None
+        assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+    
+    def test_entries_expire(self):
+        """Test entries are dropped after the TTL"""
+        cache = TTLCache(maxsize=4, ttl=0.05)
+        cache.set("a", 1)
+        time.sleep(0.06)
+        
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+    
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+    
+    def test_get_or_load_calls_loader_once(self):
+        """Test the loader only runs on a miss"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        loader = Mock(return_value=[1, 2, 3])
+        
+        assert cache.get_or_load(7, loader) == [1, 2, 3]
+        assert cache.get_or_load(7, loader) == [1, 2, 3]
+        loader.assert_called_once()
+    
+    def test_disabled_cache_always_loads(self):
+        """Test that ttl=0 disables caching"""
+        cache = TTLCache(maxsize=4, ttl=0)
+        loader = Mock(return_value="x")
+        
+        cache.get_or_load(7, loader)
+        cache.get_or_load(7, loader)
+        
+        assert loader.call_count == 2
+        assert cache.stats()["size"] == 0
+    
+    def test_invalidate(self):
+        """Test explicit invalidation"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+        
+        assert cache.get("a") is None
+        assert cache.stats()["invalidations"] == 1
+    
+    def test_invalidate_during_load_skips_caching(self):
+        """Test a load overlapping an invalidation is returned but not cached"""
+        import threading
+        cache = TTLCache(maxsize=4, ttl=60)
+        loading = threading.Event()
+        release = threading.Event()
+        results = []
+        
+        def slow_loader():
+            loading.set()
+            release.wait(5)
+            return "before invite"
+        
+        worker = threading.Thread(target=lambda: results.append(cache.get_or_load("b", slow_loader)))
+        worker.start()
+        assert loading.wait(5)
+        cache.invalidate("b")
+        release.set()
+        worker.join(5)
+        
+        assert results == ["before invite"]
+        assert cache.peek("b") is None
+        assert cache.get_or_load("b", lambda: "after invite") == "after invite"
+        assert cache.peek("b") == "after invite"
+    
+    def test_set_if_generation(self):
+        """Test set_if_generation caches only while the key's generation is unchanged"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        generation = cache.generation("a")
+        cache.invalidate("a")
+        
+        assert not cache.set_if_generation("a", 1, generation)
+        assert cache.peek("a") is None
+        assert cache.set_if_generation("a", 2, cache.generation("a"))
+        assert cache.peek("a") == 2
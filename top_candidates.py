@@ -0,0 +1,104 @@
+"""
+Top-N candidate selection
+
+Picks the best `n` candidates with a bounded heap (heapq.nsmallest) in
+O(len * log n) time and O(n) memory, instead of sorting the whole list to
+keep a handful. Input can be any iterable, including a stream of pages.
+
+Candidates rank by score (highest first), then Test A score (highest
+first), then completion time (earliest first); candidates still tied keep
+their input order.
+"""
+
+import heapq
+
+from new_agent import extract_score, normalize_email
+
+COMBINE_METHODS = ("mean", "max", "sum")
+
+# Sorts after any ISO-8601 timestamp, so candidates without one rank last
+NO_TIMESTAMP = "~"
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def candidate_score(candidate):
+    """Score used for ranking: `score` when set, else the extracted API score."""
+    return candidate.get("score") or extract_score(candidate) or 0
+
+
+def rank_key(candidate):
+    """Ascending sort key that puts the best candidate first."""
+    test_a_score = _number(candidate.get("test_a_score"))
+    completed_at = candidate.get("completed_at")
+    return (
+        -candidate_score(candidate),
+        -test_a_score if test_a_score is not None else float("inf"),
+        completed_at if isinstance(completed_at, str) and completed_at else NO_TIMESTAMP,
+    )
+
+
+def top_n(candidates, n, key=rank_key):
+    """The `n` best candidates of an iterable, best first (stable on ties)."""
+    if n <= 0:
+        return []
+    return heapq.nsmallest(n, candidates, key=key)
+
+
+def combine_across_tests(tests, combine="mean"):
+    """Merge candidates of several tests into one entry per email.
+
+    Args:
+        tests: Mapping of test_id -> iterable of candidates; the first test
+            is treated as Test A for tie-breaking
+        combine: How per-test scores become one score: "mean" of the tests
+            taken, "max", or "sum" (tests not taken count as 0)
+
+    Returns:
+        List of {"email", "name", "score", "test_a_score", "completed_at",
+        "scores": {test_id: score}} in first-seen order. Candidates without
+        an email cannot be matched across tests and are left out.
+    """
+    if combine not in COMBINE_METHODS:
+        raise ValueError(f"combine must be one of {', '.join(COMBINE_METHODS)}, got {combine!r}")
+
+    test_ids = list(tests)
+    merged = {}
+    for test_id in test_ids:
+        for c in tests[test_id]:
+            email = normalize_email(c.get("email"))
+            if email is None:
+                continue
+            entry = merged.get(email)
+            if entry is None:
+                entry = merged[email] = {
+                    "email": c.get("email"),
+                    "name": c.get("full_name") or c.get("name"),
+                    "scores": {},
+                    "completed_at": None,
+                }
+            score = candidate_score(c)
+            # Repeat attempts on one test keep the best score
+            if score >= entry["scores"].get(test_id, float("-inf")):
+                entry["scores"][test_id] = score
+            completed_at = c.get("completed_at")
+            if isinstance(completed_at, str) and (entry["completed_at"] is None or completed_at > entry["completed_at"]):
+                entry["completed_at"] = completed_at
+
+    for entry in merged.values():
+        scores = entry["scores"]
+        if combine == "mean":
+            entry["score"] = round(sum(scores.values()) / len(scores), 2)
+        elif combine == "max":
+            entry["score"] = max(scores.values())
+        else:
+            entry["score"] = sum(scores.values())
+        entry["test_a_score"] = scores.get(test_ids[0])
+    return list(merged.values())
+
+
+def top_across_tests(tests, n, combine="mean"):
+    """The `n` best candidates over several tests, joined by email."""
+    return top_n(combine_across_tests(tests, combine), n)
@@ -0,0 +1,129 @@
+"""
+In-process TTL/LRU cache
+
+A small thread-safe cache used by the MCP server to answer repeated reads
+for the same test without re-downloading it. Entries expire after `ttl`
+seconds and the least recently used entry is evicted beyond `maxsize`.
+A load that overlaps an invalidation of its key is returned but not
+cached, so invalidating during a download never leaves the old data in
+the cache.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe mapping with per-entry TTL and an LRU size bound."""
+
+    def __init__(self, maxsize=32, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()   # key -> (expires_at, value)
+        self.generations = {}          # key -> invalidation count
+        self.epoch = 0                 # clear() count
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key, default=None):
+        """Return a live entry (refreshing its LRU position) or `default`."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """Return a live entry without counting a lookup or refreshing its LRU position."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return default
+            return entry[1]
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss.
+
+        The loaded value is not cached if `key` was invalidated (or the
+        cache cleared) while `loader()` ran.
+        """
+        if not self.enabled:
+            return loader()
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            generation = self.generation(key)
+            value = loader()
+            self.set_if_generation(key, value, generation)
+        return value
+
+    def generation(self, key):
+        """Changes whenever `key` is invalidated or the cache is cleared."""
+        with self.lock:
+            return self.epoch, self.generations.get(key, 0)
+
+    def set_if_generation(self, key, value, generation):
+        """Cache `value` unless `key` changed generation since `generation()` was read.
+
+        Returns True if the value was cached.
+        """
+        with self.lock:
+            if self.generation(key) != generation:
+                return False
+            self.set(key, value)
+            return True
+
+    def invalidate(self, key):
+        with self.lock:
+            self.generations[key] = self.generations.get(key, 0) + 1
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.epoch += 1
+            self.generations.clear()
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }